@@ -1,56 +1,379 @@
 import os
+import re
+import html
 import uuid
-from flask import Flask, jsonify, request
+import json
+import time
+import base64
+import signal
+from flask import Flask, g, has_request_context, jsonify, request, stream_with_context
 from flask_cors import CORS
 from dotenv import load_dotenv
-from supabase import create_client, Client
-from flask_bcrypt import Bcrypt
 import jwt
 from datetime import datetime, timedelta
 from functools import wraps
-from sqlalchemy import create_engine, text # SQLAlchemy 임포트
+from collections import namedtuple
+import click
+from sqlalchemy import text # SQLAlchemy 임포트
+from sqlalchemy.exc import IntegrityError
+import search
+from cache import create_cache
+from db import create_lazy_engine
+from replicas import create_db_router
+from passwords import PasswordHasherBusy, create_password_hasher
+from auth import TokenVerifier
+from storage import UnsupportedFileType, UploadStream, UploadTooLarge, create_storage_client
+from images import create_image_processor, is_variant_path
+from metrics import RequestMetrics, add_timing, server_timing_header, timed
+from migrate import migrate as apply_migrations, status as migration_status
+from query_plans import PLAN_CHECK_ALLOW_SEQ_SCAN, create_plan_checker
+from singleflight import create_single_flight
+from likes import create_like_writer
+from jobs import ORPHAN_BUCKETS, STORAGE_REMOVE, create_job_queue, create_job_worker, create_orphan_sweeper
+from feed import create_home_feed
+from serialization import FastJSONProvider, dumps, row_mapper, serialize_row, serialize_rows
 
 # --- 초기 설정 ---
 load_dotenv()
 app = Flask(__name__)
+app.json = FastJSONProvider(app)  # orjson 기반 JSON 인코더 (serialization.py 참고)
 app.config['SECRET_KEY'] = os.environ.get("SECRET_KEY")
-bcrypt = Bcrypt(app)
 CORS(app)
 
-# 1. (신규) SQLAlchemy 엔진 생성 (Neon DB 연결)
+# 1. (신규) SQLAlchemy 엔진 생성 (Neon DB 연결, 풀 설정은 db.py 참고)
+# 엔진은 처음 쿼리할 때 만들어집니다. (LazyEngine — 임포트/워커 부팅 시간 단축, gunicorn preload 안전)
 db_url = os.environ.get("DATABASE_URL")
-# Neon의 DB URL은 postgres://로 시작하므로, psycopg2가 인식하도록 postgresql://로 변경
-if db_url and db_url.startswith("postgres://"):
-    db_url = db_url.replace("postgres://", "postgresql://", 1)
-engine = create_engine(db_url)
+engine = create_lazy_engine(db_url, os.environ)
+pool_stats = engine.pool_stats
+# 읽기 복제본 (DATABASE_REPLICA_URLS를 설정했을 때만, replicas.py 참고)
+# 조회 API는 read_engine()으로 복제본을 사용하고, 쓰기와 그 밖의 조회는 모두 주 DB(engine)를 사용합니다.
+db_router = create_db_router(engine, os.environ)
 
-# 2. (기존) Supabase 클라이언트 (Storage 전용)
-supa_url: str = os.environ.get("SUPABASE_URL")
-supa_key: str = os.environ.get("SUPABASE_KEY")
-supabase: Client = create_client(supa_url, supa_key)
+# 2. Supabase Storage 클라이언트 (keep-alive 연결 풀, 스트리밍 업로드 — storage.py 참고, 처음 호출할 때 연결)
+storage = create_storage_client(os.environ)
+UPLOAD_MAX_BYTES = int(os.environ.get("UPLOAD_MAX_BYTES", 5 * 1024 * 1024))
+# multipart 경계/헤더 여유분을 더한 값보다 큰 요청 본문은 Werkzeug가 읽기 전에 413으로 거절합니다.
+app.config['MAX_CONTENT_LENGTH'] = UPLOAD_MAX_BYTES + 64 * 1024
 
+# 3. 응답 캐시 (게시글 목록/상세의 직렬화된 응답, cache.py 참고)
+response_cache = create_cache(os.environ)
+
+# 4. 비밀번호 해시/검증 전용 워커 풀 (passwords.py 참고)
+password_hasher = create_password_hasher(os.environ)
+
+# 5. 요청당 쿼리 수 측정
+# 엔드포인트마다 @query_budget(n)으로 허용 쿼리 수를 선언해 두고,
+# ENFORCE_QUERY_BUDGET=1(테스트/개발)이면 초과 시 AssertionError를 발생시켜 왕복 증가를 막습니다.
+# (tests/test_app.py가 DB 없이 동작을 확인하고, bench/run_suite.py --query-budget이 이 모드로 모든 라우트를 호출해 초과 시 실패합니다.)
+# 운영에서는 경고 로그만 남기며, 디버그/강제 모드에서는 X-Query-Count 헤더를 붙입니다.
+app.config['ENFORCE_QUERY_BUDGET'] = os.environ.get("ENFORCE_QUERY_BUDGET") == "1"
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        g.query_count = g.get('query_count', 0) + 1
+    if context is not None:
+        context._query_started = time.perf_counter()
+
+for _engine in db_router.engines():
+    _engine.listen("before_cursor_execute", _count_query)
+
+def query_budget(max_queries):
+    def decorator(f):
+        f.query_budget = max_queries
+        return f
+    return decorator
+
+@app.after_request
+def _check_query_budget(response):
+    view = app.view_functions.get(request.endpoint)
+    query_count = g.get('query_count', 0)
+    budget = getattr(view, 'query_budget', None)
+    if budget is not None and query_count > budget:
+        message = f"{request.endpoint}: 쿼리 {query_count}회 실행 (허용 {budget}회)"
+        if app.config['ENFORCE_QUERY_BUDGET']:
+            raise AssertionError(message)
+        app.logger.warning(message)
+    if app.debug or app.config['ENFORCE_QUERY_BUDGET']:
+        response.headers['X-Query-Count'] = str(query_count)
+    return response
+
+# 6. 요청 성능 계측 (metrics.py 참고)
+# - SQL/직렬화/Storage 시간을 구간별로 누적해 Server-Timing 헤더로 반환 (SERVER_TIMING=0이면 생략)
+# - 라우트별 히스토그램은 /metrics(Prometheus 형식)에서 조회
+# - SLOW_QUERY_MS(기본 500)를 넘는 SQL은 문장과 파라미터를 경고 로그로 남깁니다. (0이면 끔)
+request_metrics = RequestMetrics()
+SERVER_TIMING_ENABLED = os.environ.get("SERVER_TIMING", "1") == "1"
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", 500))
+SLOW_QUERY_LOG_MAX_CHARS = 2000
+_SENSITIVE_PARAM_RE = re.compile(r'password|token|secret', re.IGNORECASE)
+
+# 로그에 남기지 않을 파라미터(비밀번호 해시 등)는 가립니다.
+def _redact_params(parameters):
+    if isinstance(parameters, dict):
+        return {k: '***' if _SENSITIVE_PARAM_RE.search(str(k)) else v for k, v in parameters.items()}
+    if isinstance(parameters, (list, tuple)) and parameters and isinstance(parameters[0], dict):
+        return [_redact_params(p) for p in parameters[:3]] + (['...'] if len(parameters) > 3 else [])
+    return parameters
+
+def _time_query(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, '_query_started', None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    add_timing('db', elapsed)
+    if SLOW_QUERY_MS and elapsed * 1000 >= SLOW_QUERY_MS:
+        request_metrics.record_slow_query()
+        app.logger.warning("slow query %.1fms [%s]: %s | params=%s", elapsed * 1000,
+                           request.endpoint if has_request_context() else '-',
+                           " ".join(statement.split())[:SLOW_QUERY_LOG_MAX_CHARS],
+                           repr(_redact_params(parameters))[:SLOW_QUERY_LOG_MAX_CHARS])
+
+for _engine in db_router.engines():
+    _engine.listen("after_cursor_execute", _time_query)
+
+@app.before_request
+def _start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def _record_request_metrics(response):
+    started = g.get('request_started')
+    if started is None:
+        return response
+    total = time.perf_counter() - started
+    timings = g.get('timings', {})
+    query_count = g.get('query_count', 0)
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    request_metrics.observe_request(route, request.method, response.status_code, total, timings, query_count)
+    if SERVER_TIMING_ENABLED:
+        response.headers['Server-Timing'] = server_timing_header(total, timings, query_count)
+        response.headers['Timing-Allow-Origin'] = '*'
+    return response
+
+# 7. 쿼리 계획 검사 (PLAN_CHECK=1일 때만, 벤치마크/테스트 전용 — query_plans.py 참고)
+# 실행되는 SQL마다 EXPLAIN으로 큰 테이블의 Seq Scan 여부를 확인하고 /internal/query-plans로 보고합니다.
+plan_checker = create_plan_checker(os.environ)
+if plan_checker is not None:
+    for _engine in db_router.engines():
+        plan_checker.attach(_engine)
+
+# 8. 동시 동일 조회 합치기 (인기 글의 상세/댓글 조회, singleflight.py 참고)
+single_flight = create_single_flight(os.environ)
+
+# 9. 좋아요 쓰기 지연 (LIKE_WRITE_BEHIND=1일 때만, likes.py 참고)
+# 묶음 반영 후 바뀐 게시글의 캐시를 무효화하고 홈 피드 갱신을 표시합니다. (반영 스레드에서 실행)
+def _on_likes_flushed(post_ids):
+    invalidate_like_counts(post_ids)
+    mark_feed(post_ids=post_ids)
+
+like_writer = create_like_writer(engine, os.environ, on_flush=_on_likes_flushed, log=app.logger.warning)
+
+# 10. 백그라운드 작업 대기열 (Storage 삭제/고아 객체 정리, jobs.py 참고)
+# 요청은 DB 변경과 같은 문장에서 jobs 행만 넣고 바로 응답하며, 실행은 `flask --app app jobs-worker` 프로세스가 맡습니다.
+job_queue = create_job_queue(engine, os.environ)
+
+# 11. 홈 피드 사전 계산 (FEED_ENABLED=1일 때만, feed.py 참고)
+# 목록 API의 앞쪽 페이지는 미리 JOIN/직렬화해 둔 home_feed에서 응답합니다. 쓰기 API는 mark_feed()로 바뀐 글/작성자만
+# 표시하고, 워커별 갱신 스레드가 묶어서 반영한 뒤 관련 목록 캐시를 무효화합니다. (주기 갱신은 jobs-worker)
+home_feed = create_home_feed(engine, os.environ, on_refresh=lambda tags: invalidate_cached(*tags))
+
+def mark_feed(**changes):
+    if home_feed is not None:
+        home_feed.mark(**changes)
+
+
+# --- 인증 토큰(JWT) 관련 함수 ---
+# 검증 결과는 TokenVerifier(auth.py)가 토큰 만료 시각까지 캐싱하고,
+# 요청 안에서는 g.auth에 한 번만 계산해 두어 token_required와 선택적 인증 API가 함께 사용합니다.
+token_verifier = TokenVerifier(app.config['SECRET_KEY'], cache_size=int(os.environ.get("TOKEN_CACHE_SIZE", 10000)))
+
+# 요청 단위 인증 정보: token이 없으면 (None, None, None), 유효하지 않으면 error에 사유
+AuthContext = namedtuple('AuthContext', ['user_id', 'token', 'error'])
+
+def get_auth_context():
+    if 'auth' not in g:
+        token = None
+        parts = request.headers.get('Authorization', '').split(" ")
+        if len(parts) == 2 and parts[1]:
+            token = parts[1]
+        if not token:
+            g.auth = AuthContext(None, None, None)
+        else:
+            try:
+                g.auth = AuthContext(token_verifier.verify(token)['user_id'], token, None)
+            except Exception as e:
+                g.auth = AuthContext(None, token, str(e))
+    return g.auth
 
-# --- (기존) 인증 토큰(JWT) 관련 함수 (변경 없음) ---
 def token_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
-        token = None
-        if 'Authorization' in request.headers:
-            token = request.headers['Authorization'].split(" ")[1]
-        if not token:
+        auth = get_auth_context()
+        if not auth.token:
             return jsonify({'message': '토큰이 존재하지 않습니다.'}), 401
-        try:
-            data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=["HS256"])
-            current_user_id = data['user_id']
-        except Exception as e:
-            return jsonify({'message': '토큰이 유효하지 않습니다.', 'error': str(e)}), 401
-        return f(current_user_id, *args, **kwargs)
+        if auth.error is not None:
+            return jsonify({'message': '토큰이 유효하지 않습니다.', 'error': auth.error}), 401
+        return f(auth.user_id, *args, **kwargs)
     return decorated
 
+# 로그인이 선택 사항인 API용: 유효한 토큰이 있으면 user_id, 없거나 유효하지 않으면 None
+# (만료된 토큰을 가진 방문자도 공개 목록은 볼 수 있어야 하므로 401을 반환하지 않습니다.)
+def get_optional_user_id():
+    return get_auth_context().user_id
+
+# --- 읽기 복제본 선택 (replicas.py 참고) ---
+# 조회 API에서 사용할 엔진: 최근에 쓰기를 한 사용자, 또는 최근에 무효화된 태그(tags)를 읽는 조회는 주 DB
+def read_engine(*tags):
+    target = db_router.read_engine(get_auth_context().user_id, tags)
+    if not db_router.is_primary(target):
+        g.read_from_replica = True
+    return target
+
+# single-flight key 구분용: 주 DB에서 읽는 요청(방금 쓰기를 한 사용자)이 복제본 조회 결과에 합류하지 않도록 합니다.
+def read_source(target):
+    return 'primary' if db_router.is_primary(target) else 'replica'
+
+# 쓰기 요청이 성공하면 그 사용자의 조회를 REPLICA_STICKY_SECONDS 동안 주 DB로 보냅니다. (read-your-writes)
+@app.after_request
+def _stick_writer_to_primary(response):
+    if request.method in ('POST', 'PUT', 'DELETE') and response.status_code < 400 and 'auth' in g:
+        db_router.mark_write(g.auth.user_id)
+    return response
+
+# 업로드 이미지의 작은 파생본 URL (images.py가 아직 만들지 않았으면 원본 URL)
+IMAGE_THUMB_SQL = """COALESCE((SELECT iv.variants->>'thumb' FROM image_variants AS iv
+    WHERE iv.original_url = p.image_url), p.image_url) AS image_thumb_url"""
+AVATAR_THUMB_SQL = """COALESCE((SELECT iv.variants->>'thumb' FROM image_variants AS iv
+    WHERE iv.original_url = u.avatar_url), u.avatar_url) AS avatar_thumb_url"""
+
+# 현재 사용자가 해당 게시글(p)에 좋아요를 눌렀는지 여부 (:viewer_id가 NULL이면 항상 false)
+LIKED_BY_ME_SQL = """(:viewer_id IS NOT NULL AND EXISTS (
+    SELECT 1 FROM likes AS lv WHERE lv.user_id = :viewer_id AND lv.post_id = p.id
+)) AS liked_by_me"""
+
+# --- 게시글 목록 필드 선택(projection) ---
+# 목록 API는 ?fields=id,title,excerpt,... 로 필요한 컬럼만 조회/반환할 수 있습니다.
+# 목록 화면은 content 대신 저장된 excerpt를 쓰면 큰 본문 컬럼(TOAST)을 읽지 않습니다.
+POST_LIST_COLUMNS = {
+    'id': "p.id",
+    'created_at': "p.created_at",
+    'title': "p.title",
+    'content': "p.content",
+    'excerpt': "p.excerpt",
+    'user_id': "p.user_id",
+    'image_url': "p.image_url",
+    'image_thumb_url': IMAGE_THUMB_SQL,
+    'author_nickname': "u.nickname AS author_nickname",
+    'author_avatar_url': "u.avatar_url AS author_avatar_url",
+    'like_count': "p.like_count",
+    'liked_by_me': LIKED_BY_ME_SQL,
+}
+# fields를 지정하지 않으면 기존 응답과 같은 필드를 반환합니다.
+DEFAULT_POST_LIST_FIELDS = ('id', 'created_at', 'title', 'content', 'user_id', 'image_url',
+                            'image_thumb_url', 'author_nickname', 'like_count', 'liked_by_me')
+# 커서/캐시 태그 계산에 필요하므로 요청과 관계없이 항상 조회하는 컬럼
+REQUIRED_POST_LIST_FIELDS = ('id', 'created_at', 'user_id')
+EXCERPT_LENGTH = 100
+
+_IMG_TAG_RE = re.compile(r'<img\b[^>]*>', re.IGNORECASE)
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+# 본문 HTML에서 이미지/태그를 제거하고 앞부분 EXCERPT_LENGTH자를 잘라 목록용 미리보기를 만듭니다.
+def build_excerpt(content):
+    plain = _HTML_TAG_RE.sub(' ', _IMG_TAG_RE.sub('', content or ''))
+    plain = _WHITESPACE_RE.sub(' ', html.unescape(plain)).strip()
+    return plain[:EXCERPT_LENGTH] + "..." if len(plain) > EXCERPT_LENGTH else plain
+
+
+# ?fields= 값을 해석합니다. 알 수 없는 필드가 있으면 ValueError.
+def get_post_fields():
+    fields = request.args.get('fields')
+    if not fields:
+        return list(DEFAULT_POST_LIST_FIELDS)
+    fields = [f.strip() for f in fields.split(',') if f.strip()]
+    unknown = [f for f in fields if f not in POST_LIST_COLUMNS]
+    if unknown:
+        raise ValueError(f"알 수 없는 필드: {', '.join(unknown)}")
+    return fields
+
+
+# 요청 필드 + 필수 필드에 해당하는 SELECT 컬럼 목록을 만듭니다.
+def select_post_columns(fields, liked_by_me_sql=LIKED_BY_ME_SQL):
+    columns = dict(POST_LIST_COLUMNS, liked_by_me=liked_by_me_sql)
+    selected = dict.fromkeys(REQUIRED_POST_LIST_FIELDS + tuple(fields))
+    return ",\n        ".join(columns[f] for f in selected)
+
+
+# 필수 필드 중 요청하지 않아 응답에서 제외할 컬럼 (id는 항상 포함, serialize_rows의 drop으로 사용)
+def post_drop_fields(fields):
+    return tuple(f for f in REQUIRED_POST_LIST_FIELDS if f != 'id' and f not in fields)
+
+# --- 내부 운영용 엔드포인트 보호 ---
+# INTERNAL_API_TOKEN이 설정되어 있고 X-Internal-Token 헤더(또는 Prometheus 스크레이프용
+# Authorization: Bearer 헤더)가 일치할 때만 허용합니다.
+# (설정되지 않았으면 엔드포인트가 없는 것처럼 404를 반환)
+def internal_only(f):
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        internal_token = os.environ.get("INTERNAL_API_TOKEN")
+        provided = request.headers.get('X-Internal-Token') or request.headers.get('Authorization', '').removeprefix('Bearer ')
+        if not internal_token or provided != internal_token:
+            return jsonify({'message': 'Not Found'}), 404
+        return f(*args, **kwargs)
+    return decorated
+
+# --- 응답 캐시 헬퍼 ---
+# 이미 직렬화된 JSON 본문(bytes)으로 응답을 만듭니다.
+def json_body_response(body):
+    return app.response_class(body, mimetype='application/json')
+
+# 캐시에 저장된 JSON 응답이 있으면 그대로 반환합니다.
+def get_cached_response(cache_key):
+    body = response_cache.get(cache_key)
+    if body is None:
+        return None
+    return json_body_response(body)
+
+# 데이터를 JSON으로 직렬화하여 캐시에 저장한 뒤 응답을 반환합니다.
+def cache_json_response(cache_key, data, tags):
+    return cache_body_response(cache_key, jsonify(data).get_data(), tags)
+
+# 직렬화된 JSON 본문을 캐시에 저장한 뒤 응답을 반환합니다.
+# 복제본에서 읽은 결과가 방금 무효화된 태그를 포함하면 (아직 반영 전일 수 있으므로) 저장하지 않습니다.
+def cache_body_response(cache_key, body, tags):
+    if not (g.get('read_from_replica') and db_router.recently_written(tags)):
+        response_cache.set(cache_key, body, tags=tags)
+    return json_body_response(body)
+
+# 쓰기 API에서 응답 캐시와 single-flight 보관 결과를 함께 무효화합니다.
+# ('profiles': 작성자 닉네임/아바타가 포함된 모든 single-flight 결과)
+def invalidate_cached(*tags):
+    response_cache.invalidate_tags(*tags)
+    single_flight.invalidate_tags(*tags)
+    db_router.mark_write(tags=tags)
+
+# 좋아요 수가 바뀐 게시글: 그 글의 상세/목록 페이지와, 순서가 바뀌어 다른 페이지에도 영향을 주는 top 정렬 목록을 무효화합니다.
+# (홈 피드가 있으면 피드 갱신이 ranking별 목록 캐시를 무효화합니다. hot 정렬은 피드에만 있음)
+def invalidate_like_counts(post_ids):
+    tags = [f"post:{post_id}" for post_id in post_ids]
+    if home_feed is None:
+        tags.append('posts:list:top')
+    invalidate_cached(*tags)
+
 # --- API 엔드포인트 (SQLAlchemy로 모두 수정) ---
 
+# 비밀번호 워커 풀의 대기열이 가득 찼을 때: 잠시 후 다시 시도하도록 503을 반환합니다.
+def password_hasher_busy_response():
+    response = jsonify({'message': '요청이 많아 잠시 후 다시 시도해주세요.'})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
 # 1. 회원가입 API
+# 이메일/닉네임 중복은 users 테이블의 UNIQUE 제약조건으로 판단합니다. (INSERT 한 번)
 @app.route('/api/register', methods=['POST'])
+@query_budget(1)
 def register():
     data = request.get_json()
     email = data.get('email')
@@ -61,37 +384,38 @@ def register():
         return jsonify({'message': '이메일, 비밀번호, 닉네임을 모두 입력해주세요.'}), 400
 
     try:
-        # SQLAlchemy를 사용한 SQL 실행
+        hashed_password = password_hasher.hash(password)
         with engine.connect() as conn:
-            # 1. 이메일 중복 확인
-            email_check = conn.execute(text("SELECT id FROM users WHERE email = :email"), {"email": email}).first()
-            if email_check:
-                return jsonify({'message': '이미 사용 중인 이메일입니다.'}), 409
-
-            # 2. 닉네임 중복 확인
-            nickname_check = conn.execute(text("SELECT id FROM users WHERE nickname = :nickname"), {"nickname": nickname}).first()
-            if nickname_check:
-                return jsonify({'message': '이미 사용 중인 닉네임입니다.'}), 409
-
-            # 3. 사용자 생성
-            hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
             conn.execute(text("""
                 INSERT INTO users (email, password_hash, nickname) 
                 VALUES (:email, :password_hash, :nickname)
             """), {"email": email, "password_hash": hashed_password, "nickname": nickname})
             conn.commit() # 변경사항 저장
             
-            return jsonify({'message': '회원가입이 완료되었습니다.'}), 201
-            
+        return jsonify({'message': '회원가입이 완료되었습니다.'}), 201
+
+    except IntegrityError as e:
+        constraint = getattr(getattr(e.orig, 'diag', None), 'constraint_name', '') or ''
+        if 'email' in constraint:
+            return jsonify({'message': '이미 사용 중인 이메일입니다.'}), 409
+        if 'nickname' in constraint:
+            return jsonify({'message': '이미 사용 중인 닉네임입니다.'}), 409
+        return jsonify({'message': '회원가입 중 오류가 발생했습니다.', 'error': str(e)}), 500
+    except PasswordHasherBusy:
+        return password_hasher_busy_response()
     except Exception as e:
         return jsonify({'message': '회원가입 중 오류가 발생했습니다.', 'error': str(e)}), 500
 
 # 2. 로그인 API
+# 저장된 해시의 비용이 BCRYPT_LOG_ROUNDS와 다르면 로그인 성공 시 새 비용으로 재해시합니다.
 @app.route('/api/login', methods=['POST'])
+@query_budget(2)  # 사용자 조회 + (필요 시) 재해시 저장
 def login():
     data = request.get_json()
     email = data.get('email')
     password = data.get('password')
+    if not email or not password:
+        return jsonify({'message': '이메일과 비밀번호를 입력해주세요.'}), 400
 
     with engine.connect() as conn:
         user_result = conn.execute(text("SELECT * FROM users WHERE email = :email"), {"email": email}).first()
@@ -102,7 +426,19 @@ def login():
     # SQLAlchemy의 Row 객체를 dict로 변환
     user = user_result._asdict()
 
-    if bcrypt.check_password_hash(user['password_hash'], password):
+    try:
+        password_ok = password_hasher.verify(user['password_hash'], password)
+        if password_ok and password_hasher.needs_rehash(user['password_hash']):
+            new_hash = password_hasher.hash(password)
+            with engine.connect() as conn:
+                conn.execute(text("UPDATE users SET password_hash = :password_hash WHERE id = :id"),
+                             {"password_hash": new_hash, "id": user['id']})
+                conn.commit()
+            password_hasher.record_rehash()
+    except PasswordHasherBusy:
+        return password_hasher_busy_response()
+
+    if password_ok:
         token = jwt.encode({
             'user_id': user['id'],
             'exp': datetime.utcnow() + timedelta(hours=24)
@@ -118,163 +454,474 @@ def login():
 
     return jsonify({'message': '비밀번호가 일치하지 않습니다.'}), 401
 
-# 3. 게시글 목록 조회 API (SQL JOIN으로 RPC 대체)
+# --- 게시글 목록 페이지네이션 헬퍼 ---
+# 전체 개수는 매 요청마다 COUNT(*) OVER()로 계산하지 않고, 검색 조건별로 짧게 캐싱합니다.
+POST_COUNT_CACHE_TTL = int(os.environ.get("POST_COUNT_CACHE_TTL", 30))
+POST_COUNT_CACHE_MAX_KEYS = 1000
+_post_count_cache = {}  # {(검색 모드, 검색어): (만료 시각, 개수)}
+
+
+# 정렬 키 값 목록(예: [created_at, id])을 불투명한 커서 문자열로 변환합니다.
+def encode_cursor(*values):
+    values = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(values).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+# encode_cursor로 만든 커서를 converters(예: datetime.fromisoformat, int)로 되돌립니다.
+# 잘못된 값이면 ValueError.
+def decode_cursor(cursor, *converters):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if len(values) != len(converters):
+            raise ValueError("cursor length mismatch")
+        return tuple(convert(v) for convert, v in zip(converters, values))
+    except Exception as e:
+        raise ValueError(f"invalid cursor: {cursor}") from e
+
+
+# --- 사용자 기록/댓글 목록 페이지네이션 헬퍼 ---
+# 목록 SQL에는 {cursor_condition}, {limit_clause} 자리를 두고 (created_at, id) 내림차순으로 정렬합니다.
+# - ?cursor=(첫 페이지는 빈 값)&limit=N : keyset 페이지 ({items, next_cursor, limit})
+# - ?format=ndjson : 서버 측 커서로 한 줄에 한 행씩 스트리밍 (내보내기용, 메모리 사용량 일정)
+# - 둘 다 없으면 기존처럼 전체 목록을 반환합니다. (기존 클라이언트 호환)
+LIST_PAGE_DEFAULT_LIMIT = 20
+LIST_PAGE_MAX_LIMIT = 100
+NDJSON_FETCH_SIZE = 500
+
+
+# 요청 인자로 목록 모드를 결정합니다. 반환값: (mode, cursor, limit), mode는 'all' | 'cursor' | 'ndjson'
+def get_list_mode():
+    if request.args.get('format') == 'ndjson':
+        return 'ndjson', None, None
+    if 'cursor' not in request.args:
+        return 'all', None, None
+    try:
+        limit = int(request.args.get('limit', LIST_PAGE_DEFAULT_LIMIT))
+    except ValueError:
+        limit = LIST_PAGE_DEFAULT_LIMIT
+    return 'cursor', request.args.get('cursor') or None, min(max(limit, 1), LIST_PAGE_MAX_LIMIT)
+
+
+def render_list_query(query_sql, cursor_condition="", limit_clause=""):
+    return text(query_sql.replace("{cursor_condition}", cursor_condition)
+                         .replace("{limit_clause}", limit_clause))
+
+
+# (key_sql, id_sql) < 커서 조건으로 한 페이지(+1행)를 조회하고 (rows, next_cursor)를 반환합니다.
+# 잘못된 커서면 ValueError.
+def fetch_keyset_page(conn, query_sql, params, key_sql, id_sql, cursor, limit):
+    params = dict(params, limit=limit + 1)
+    cursor_condition = ""
+    if cursor:
+        params["cursor_key"], params["cursor_id"] = decode_cursor(cursor, datetime.fromisoformat, int)
+        cursor_condition = f"AND ({key_sql}, {id_sql}) < (:cursor_key, :cursor_id)"
+    rows = conn.execute(render_list_query(query_sql, cursor_condition, "LIMIT :limit"), params).fetchall()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return rows, next_cursor
+
+
+# 서버 측 커서(stream_results)로 NDJSON 응답을 스트리밍합니다.
+# 연결은 응답 본문을 모두 보낼 때까지 generator 안에서 유지됩니다.
+# nested/drop은 serialize_rows와 같고, tags는 read_engine에 전달합니다.
+def stream_ndjson(query_sql, params, nested=(), drop=(), tags=()):
+    target = read_engine(*tags)
+
+    def generate():
+        with target.connect() as conn:
+            result = conn.execution_options(stream_results=True, yield_per=NDJSON_FETCH_SIZE) \
+                         .execute(render_list_query(query_sql), params)
+            convert = row_mapper(tuple(result.keys()), nested, tuple(drop))
+            for row in result:
+                yield dumps(convert(row)) + b"\n"
+    return app.response_class(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+# 검색어와 검색 모드에 맞는 WHERE 조건, 바인딩 파라미터, 정렬 점수 식을 만듭니다.
+# - 'fts'(기본): posts.search_tsv GIN 인덱스를 사용하는 n-gram 전문 검색 (순위순 정렬)
+# - 'ilike': 기존 방식의 ILIKE 부분 문자열 검색 (최신순 정렬, 비교/호환용)
+# 검색어가 없으면 rank_sql은 None입니다.
+def build_post_search_filter(search_term, search_mode='fts'):
+    if not search_term:
+        return "TRUE", {}, None
+    if search_mode == 'ilike':
+        # 부분 문자열 검색은 인덱스를 쓸 수 없으므로 계획 검사에서 제외합니다.
+        return ("(p.title ILIKE :search_pattern OR p.content ILIKE :search_pattern) " + PLAN_CHECK_ALLOW_SEQ_SCAN,
+                {"search_pattern": f"%{search_term}%"}, None)
+    tsquery = search.build_query(search_term)
+    if not tsquery:
+        return "FALSE", {}, None
+    return ("p.search_tsv @@ CAST(:tsquery AS tsquery)", {"tsquery": tsquery},
+            "ts_rank_cd(p.search_tsv, CAST(:tsquery AS tsquery))::float8")
+
+
+# 게시글 전체 개수를 반환합니다.
+# - mode='exact': 검색 조건별로 POST_COUNT_CACHE_TTL초 동안 캐싱된 정확한 개수
+# - mode='estimate': 검색어가 없을 때 pg_class 통계 기반의 추정치
+def get_post_total_count(conn, search_term, search_mode='fts', mode='exact'):
+    if mode == 'estimate' and not search_term:
+        estimate = conn.execute(text(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = 'posts'::regclass"
+        )).scalar()
+        # 한 번도 ANALYZE되지 않은 테이블은 -1을 반환하므로 정확한 개수로 대체
+        if estimate is not None and estimate >= 0:
+            return estimate
+
+    now = time.monotonic()
+    cache_key = (search_mode, search_term)
+    cached = _post_count_cache.get(cache_key)
+    if cached and cached[0] > now:
+        return cached[1]
+
+    where_sql, params, _ = build_post_search_filter(search_term, search_mode)
+    # 검색어가 없으면 전체 개수이므로 테이블 전체를 읽습니다. (TTL 동안 캐싱)
+    allow_seq_scan = "" if search_term else PLAN_CHECK_ALLOW_SEQ_SCAN
+    total_count = conn.execute(text(f"SELECT COUNT(*) FROM posts AS p WHERE {where_sql} {allow_seq_scan}"),
+                               params).scalar()
+    if len(_post_count_cache) >= POST_COUNT_CACHE_MAX_KEYS:
+        _post_count_cache.clear()  # 검색어가 다양해도 메모리가 무한히 늘지 않도록 제한
+    _post_count_cache[cache_key] = (now + POST_COUNT_CACHE_TTL, total_count)
+    return total_count
+
+
+# 홈 피드 페이지의 응답 본문: 저장된 게시글 JSON 텍스트를 다시 파싱/직렬화하지 않고 그대로 이어 붙입니다.
+# (page는 cursor 모드면 None, 전체 개수는 ?total=exact|estimate 모두 home_feed_meta 값)
+def feed_page_body(feed_page, limit, page, total_mode):
+    rest = {'limit': limit, 'next_cursor': encode_cursor(*feed_page.next_key) if feed_page.next_key else None}
+    if total_mode in ('exact', 'estimate'):
+        rest['total_count'] = feed_page.post_count
+    if page is not None:
+        rest['page'] = page
+    with timed('serialize'):
+        return b'{"posts":[' + ','.join(feed_page.payloads).encode('utf-8') + b'],' + dumps(rest)[1:]
+
+
+# 3. 게시글 목록 조회 API
+# - page 모드(기본): ?page=N, Pagination.jsx 호환 (total_count 포함)
+# - cursor 모드: ?cursor=<next_cursor> (첫 페이지는 빈 값), 정렬 키 기준으로 바로 탐색
+#   total_count는 ?total=exact|estimate로 요청할 때만 포함합니다.
+# - 검색: ?search=검색어 (기본은 순위순 전문 검색, ?search_mode=ilike로 기존 ILIKE 검색)
+# - 정렬: ?sort=recent(기본, 최신순) | top(좋아요 수순) | hot(최근 좋아요 수순, FEED_HOT=1일 때만) — 검색 중에는 무시
+# - 홈 피드(FEED_ENABLED=1, feed.py 참고): 검색어 없이 피드에 있는 필드만 요청한 앞쪽 페이지는
+#   미리 JOIN/직렬화해 둔 home_feed 행을 그대로 이어 붙여 응답합니다. (전체 개수도 home_feed_meta 사용)
 @app.route('/api/posts', methods=['GET'])
+@query_budget(3)  # 목록 + (캐시되지 않은 경우) 전체 개수, 홈 피드 밖의 페이지면 + 피드 조회
 def get_posts():
-    search_term = request.args.get('search', '')
+    search_term = request.args.get('search', '').strip()
+    search_mode = request.args.get('search_mode', 'fts')
+    if search_mode not in ('fts', 'ilike'):
+        return jsonify({"message": "search_mode는 fts 또는 ilike만 가능합니다."}), 400
+    sort = 'recent' if search_term else request.args.get('sort', 'recent')
+    hot_enabled = home_feed is not None and home_feed.ranking('hot') is not None
+    if sort not in ('recent', 'top') and not (sort == 'hot' and hot_enabled):
+        return jsonify({"message": "sort는 recent, top 또는 hot(FEED_HOT=1)만 가능합니다."}), 400
+    cursor_mode = 'cursor' in request.args
     try:
         page = int(request.args.get('page', 1))
     except ValueError:
         page = 1
-    
+    page = max(page, 1)
+
     limit = 5
-    offset = (page - 1) * limit
-
-    # Supabase RPC를 복잡한 SQL 쿼리로 대체
-    query = text("""
-        WITH FilteredPosts AS (
-            SELECT
-                p.id, p.created_at, p.title, p.content, p.user_id, p.image_url,
-                u.nickname AS author_nickname,
-                COUNT(l.post_id) AS like_count,
-                COUNT(*) OVER() as total_count
-            FROM posts AS p
-            JOIN users AS u ON p.user_id = u.id
-            LEFT JOIN likes AS l ON p.id = l.post_id
-            WHERE
-                (:search_term = '' OR p.title ILIKE :search_pattern OR p.content ILIKE :search_pattern)
-            GROUP BY p.id, u.nickname
-        )
-        SELECT * FROM FilteredPosts
-        ORDER BY created_at DESC
+    offset = 0 if cursor_mode else (page - 1) * limit
+    total_mode = request.args.get('total', 'none' if cursor_mode else 'exact')
+    cursor = request.args.get('cursor')
+    viewer_id = get_optional_user_id()
+    try:
+        fields = get_post_fields()
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    # 응답 캐시는 사용자별 liked_by_me가 없는 비로그인 요청에만 사용합니다.
+    cache_key = "posts:list:" + json.dumps(
+        [search_term, search_mode, sort, cursor if cursor_mode else page, total_mode, fields], ensure_ascii=False)
+    if viewer_id is None:
+        cached = get_cached_response(cache_key)
+        if cached is not None:
+            return cached
+
+    if home_feed is not None and not search_term and home_feed.serves(fields):
+        ranking = home_feed.ranking(sort)
+        try:
+            cursor_values = decode_cursor(cursor, ranking.cursor_type, int) if cursor else None
+        except ValueError:
+            return jsonify({"message": "잘못된 커서 값입니다."}), 400
+        try:
+            with read_engine('posts:list').connect() as conn:
+                feed_page = home_feed.page(conn, sort, fields, limit, offset, cursor_values, viewer_id)
+        except Exception as e:
+            return jsonify({"message": "데이터를 불러오는 데 실패했습니다.", "details": str(e)}), 500
+        if feed_page is not None:
+            body = feed_page_body(feed_page, limit, None if cursor_mode else page, total_mode)
+            if viewer_id is not None:
+                return json_body_response(body)
+            tags = {'posts:list', f"posts:list:{sort}"}
+            tags.update(f"post:{post_id}" for post_id in feed_page.post_ids)
+            tags.update(f"user:{user_id}" for user_id in feed_page.user_ids)
+            return cache_body_response(cache_key, body, tags)
+    if sort == 'hot':
+        # hot 정렬은 피드에만 있습니다. (아직 채워지지 않았으면 rebuild-feed / jobs-worker 필요)
+        if not home_feed.serves(fields):
+            return jsonify({"message": "hot 정렬에서는 content 필드를 조회할 수 없습니다."}), 400
+        return jsonify({"message": "인기 글 피드가 아직 준비되지 않았습니다."}), 503
+
+    where_sql, params, rank_sql = build_post_search_filter(search_term, search_mode)
+    params.update({
+        "limit": limit + 1,  # 다음 페이지 존재 여부 확인용으로 1개 더 조회
+        "offset": offset,
+        "viewer_id": viewer_id
+    })
+    # 전문 검색이면 (순위, id), top이면 (좋아요 수, id), 아니면 (작성일, id) 순으로 정렬합니다. (순위는 rank 필드로 응답에 포함)
+    if rank_sql:
+        sort_sql, sort_converter = rank_sql, float
+    elif sort == 'top':
+        sort_sql, sort_converter = "p.like_count", int
+    else:
+        sort_sql, sort_converter = "p.created_at", datetime.fromisoformat
+    sort_alias = "rank" if rank_sql else "sort_key"
+
+    cursor_condition = ""
+    if cursor:
+        try:
+            params["cursor_key"], params["cursor_id"] = decode_cursor(cursor, sort_converter, int)
+        except ValueError:
+            return jsonify({"message": "잘못된 커서 값입니다."}), 400
+        cursor_condition = f"AND ({sort_sql}, p.id) < (:cursor_key, :cursor_id)"
+
+    # 한 페이지 분량의 게시글만 정렬/선택합니다. (좋아요 수는 posts.like_count 컬럼 사용)
+    query = text(f"""
+        SELECT
+            {select_post_columns(fields)},
+            {sort_sql} AS {sort_alias}
+        FROM posts AS p
+        JOIN users AS u ON p.user_id = u.id
+        WHERE {where_sql}
+            {cursor_condition}
+        ORDER BY {sort_alias} DESC, p.id DESC
         LIMIT :limit OFFSET :offset;
     """)
-    
+
     try:
-        with engine.connect() as conn:
-            result = conn.execute(query, {
-                "search_term": search_term,
-                "search_pattern": f"%{search_term}%",
-                "limit": limit,
-                "offset": offset
-            }).fetchall()
-        
-        posts_data = [row._asdict() for row in result]
-        total_count = posts_data[0]['total_count'] if posts_data else 0
-        
-        return jsonify({
+        with read_engine('posts:list', *(['posts:search'] if search_term else [])).connect() as conn:
+            result = conn.execute(query, params).fetchall()
+            total_count = None
+            if total_mode in ('exact', 'estimate'):
+                total_count = get_post_total_count(conn, search_term, search_mode, total_mode)
+
+        has_next = len(result) > limit
+        posts_data = serialize_rows(result[:limit], drop=post_drop_fields(fields) + ('sort_key',))
+        next_cursor = None
+        if has_next:
+            last = result[limit - 1]
+            next_cursor = encode_cursor(getattr(last, sort_alias), last.id)
+
+        response = {
             'posts': posts_data,
-            'total_count': total_count,
-            'page': page,
-            'limit': limit
-        })
+            'limit': limit,
+            'next_cursor': next_cursor
+        }
+        if total_count is not None:
+            response['total_count'] = total_count
+        if not cursor_mode:
+            response['page'] = page
+        if viewer_id is not None:
+            return jsonify(response)
+
+        # 게시글/작성자 태그로 묶어 두어 좋아요·수정·닉네임 변경 시 해당 페이지만 무효화합니다.
+        tags = {'posts:list', f"posts:list:{sort}"}
+        tags.update(f"post:{row.id}" for row in result[:limit])
+        tags.update(f"user:{row.user_id}" for row in result[:limit])
+        if search_term:
+            tags.add('posts:search')
+        return cache_json_response(cache_key, response, tags)
     except Exception as e:
         return jsonify({"message": "데이터를 불러오는 데 실패했습니다.", "details": str(e)}), 500
 
 # 4. 새 게시글 작성 API
 @app.route('/api/posts', methods=['POST'])
 @token_required
+@query_budget(1)
 def create_post(current_user_id):
     try:
         data = request.get_json()
         
+        # INSERT와 작성자 정보 JOIN을 한 문장으로 처리하여 상세 조회 형태 그대로 반환
         query = text("""
-            INSERT INTO posts (title, content, user_id, image_url) 
-            VALUES (:title, :content, :user_id, :image_url)
-            RETURNING id;
+            WITH inserted AS (
+                INSERT INTO posts (title, content, excerpt, user_id, image_url, search_tsv) 
+                VALUES (:title, :content, :excerpt, :user_id, :image_url, CAST(:search_document AS tsvector))
+                RETURNING id, created_at, title, content, user_id, image_url, like_count
+            )
+            SELECT i.id, i.created_at, i.title, i.content, i.user_id, i.image_url,
+                   u.nickname AS author_nickname, i.like_count
+            FROM inserted i
+            JOIN users u ON i.user_id = u.id;
         """)
         
         with engine.connect() as conn:
-            result = conn.execute(query, {
+            final_post = conn.execute(query, {
                 'title': data.get('title'),
                 'content': data.get('content'),
+                'excerpt': build_excerpt(data.get('content')),
                 'user_id': current_user_id,
-                'image_url': data.get('image_url')
+                'image_url': data.get('image_url'),
+                'search_document': search.build_document(data.get('title'), data.get('content'))
             }).first()
-            new_post_id = result[0]
             conn.commit()
+        _post_count_cache.clear()
+        invalidate_cached('posts:list')
+        mark_feed(post_ids=[final_post.id], count_delta=1)
 
-        # (상세 조회 쿼리를 재사용하여 방금 만든 게시글 정보 반환)
-        detail_query = text("""
-            SELECT p.*, u.nickname AS author_nickname, COUNT(l.post_id) AS like_count
-            FROM posts p
-            JOIN users u ON p.user_id = u.id
-            LEFT JOIN likes l ON p.id = l.post_id
-            WHERE p.id = :post_id
-            GROUP BY p.id, u.nickname
-        """)
-        with engine.connect() as conn:
-            final_post = conn.execute(detail_query, {"post_id": new_post_id}).first()
-
-        return jsonify(final_post._asdict()), 201
+        return jsonify(serialize_row(final_post)), 201
         
     except Exception as e:
         return jsonify({"message": "An error occurred", "details": str(e)}), 500
 
+# --- 인기 글 동시 조회 합치기 ---
+# 게시글 상세/댓글처럼 조회하는 사용자와 무관한 부분만 single_flight로 합치고,
+# 사용자별 값(liked_by_me)은 합친 결과와 별도로 계산합니다. (공유 결과는 복사해서 응답)
+SHARED_READ_TAGS = ('profiles',)
+POST_DETAIL_QUERY = """
+    SELECT p.id, p.created_at, p.title, p.content, p.user_id, p.image_url,
+           u.nickname AS author_nickname, p.like_count
+    FROM posts p
+    JOIN users u ON p.user_id = u.id
+    WHERE p.id = :post_id
+"""
+
+def viewer_liked_post(post_id, viewer_id):
+    if viewer_id is None:
+        return False
+    if like_writer is not None:
+        pending = like_writer.pending_like(viewer_id, post_id)
+        if pending is not None:
+            return pending
+    with read_engine(f"post:{post_id}").connect() as conn:
+        return conn.execute(text("SELECT EXISTS (SELECT 1 FROM likes WHERE user_id = :viewer_id AND post_id = :post_id)"),
+                            {"viewer_id": viewer_id, "post_id": post_id}).scalar()
+
+# 공유 게시글 dict에 사용자별 liked_by_me와 아직 반영되지 않은 좋아요 수를 더한 복사본
+def with_viewer_state(post, viewer_id):
+    like_count = post['like_count']
+    if like_writer is not None:
+        like_count += like_writer.pending_delta(post['id'])
+    return dict(post, like_count=like_count, liked_by_me=viewer_liked_post(post['id'], viewer_id))
+
+# 게시글 상세(dict)를 반환합니다. 없으면 None.
+def load_post_detail(post_id):
+    tags = (f"post:{post_id}",) + SHARED_READ_TAGS
+    target = read_engine(*tags)
+
+    def query():
+        with target.connect() as conn:
+            row = conn.execute(text(POST_DETAIL_QUERY), {"post_id": post_id}).first()
+        return serialize_row(row) if row else None
+    return single_flight.do(f"post:{post_id}:detail:{read_source(target)}", query, tags=tags)
+
 # (상세 조회) - ID로 특정 게시글 하나만 조회
 @app.route("/api/posts/<int:post_id>", methods=['GET'])
+@query_budget(2)  # 게시글 + (로그인 시) 좋아요 여부
 def get_post_by_id(post_id):
+    viewer_id = get_optional_user_id()
+    cache_key = f"posts:detail:{post_id}"
+    if viewer_id is None:
+        cached = get_cached_response(cache_key)
+        if cached is not None:
+            return cached
     try:
-        detail_query = text("""
-            SELECT p.id, p.created_at, p.title, p.content, p.user_id, p.image_url,
-                   u.nickname AS author_nickname, 
-                   COUNT(l.post_id) AS like_count
-            FROM posts p
-            JOIN users u ON p.user_id = u.id
-            LEFT JOIN likes l ON p.id = l.post_id
-            WHERE p.id = :post_id
-            GROUP BY p.id, u.nickname
-        """)
-        with engine.connect() as conn:
-            result = conn.execute(detail_query, {"post_id": post_id}).first()
+        post = load_post_detail(post_id)
+        if post is None:
+            return jsonify({'message': '게시글을 찾을 수 없습니다.'}), 404
 
-        if result:
-            return jsonify(result._asdict())
-        return jsonify({'message': '게시글을 찾을 수 없습니다.'}), 404
+        data = with_viewer_state(post, viewer_id)
+        if viewer_id is not None:
+            return jsonify(data)
+        return cache_json_response(cache_key, data,
+                                   [f"post:{post_id}", f"user:{post['user_id']}"])
     except Exception as e:
         return jsonify({"message": "데이터를 불러오는 데 실패했습니다.", "details": str(e)}), 500
 
 # (수정) - ID로 특정 게시글 수정
+# 작성자 확인은 WHERE user_id 조건으로 처리합니다. (존재하지 않거나 남의 글이면 403)
 @app.route("/api/posts/<int:post_id>", methods=['PUT'])
 @token_required
+@query_budget(1)
 def update_post(current_user_id, post_id):
     try:
+        data = request.get_json()
         with engine.connect() as conn:
-            post_check = conn.execute(text("SELECT user_id FROM posts WHERE id = :id"), {"id": post_id}).first()
-            if not post_check or post_check[0] != current_user_id:
+            updated = conn.execute(text("""
+                UPDATE posts SET title = :title, content = :content, excerpt = :excerpt,
+                                 search_tsv = CAST(:search_document AS tsvector)
+                WHERE id = :id AND user_id = :user_id
+                RETURNING id
+            """), {
+                "title": data.get('title'),
+                "content": data.get('content'),
+                "excerpt": build_excerpt(data.get('content')),
+                "search_document": search.build_document(data.get('title'), data.get('content')),
+                "id": post_id,
+                "user_id": current_user_id
+            }).first()
+            if not updated:
                 return jsonify({'message': '수정 권한이 없습니다.'}), 403
-
-            data = request.get_json()
-            conn.execute(text("""
-                UPDATE posts SET title = :title, content = :content 
-                WHERE id = :id
-            """), {"title": data.get('title'), "content": data.get('content'), "id": post_id})
             conn.commit()
+        _post_count_cache.clear()
+        invalidate_cached(f"post:{post_id}", 'posts:search')
+        mark_feed(post_ids=[post_id])
             
-            # (수정된 데이터 반환 로직은 편의상 생략, 간단히 성공 메시지 반환)
-            return jsonify({'message': '게시글이 수정되었습니다.'}), 200
+        # (수정된 데이터 반환 로직은 편의상 생략, 간단히 성공 메시지 반환)
+        return jsonify({'message': '게시글이 수정되었습니다.'}), 200
     except Exception as e:
         return jsonify({"message": "An error occurred", "details": str(e)}), 500
 
 # (삭제) - ID로 특정 게시글 삭제
 @app.route("/api/posts/<int:post_id>", methods=['DELETE'])
 @token_required
+@query_budget(1)
 def delete_post(current_user_id, post_id):
     try:
+        # 삭제와 함께 (다른 글이 쓰지 않는) 대표 이미지와 파생본의 Storage 삭제 작업을 예약합니다. (한 문장)
         with engine.connect() as conn:
-            post_check = conn.execute(text("SELECT user_id FROM posts WHERE id = :id"), {"id": post_id}).first()
-            if not post_check or post_check[0] != current_user_id:
+            deleted = conn.execute(text("""
+                WITH deleted AS (
+                    DELETE FROM posts WHERE id = :id AND user_id = :user_id
+                    RETURNING id, image_url
+                ), orphan AS (
+                    SELECT d.image_url FROM deleted AS d
+                    WHERE d.image_url IS NOT NULL
+                      AND NOT EXISTS (SELECT 1 FROM posts AS p WHERE p.image_url = d.image_url AND p.id <> d.id)
+                ), removed AS (
+                    DELETE FROM image_variants WHERE original_url IN (SELECT image_url FROM orphan)
+                    RETURNING variants
+                ), job AS (
+                    INSERT INTO jobs (kind, payload)
+                    SELECT :job_kind, jsonb_build_object('bucket', 'post_images', 'urls',
+                        jsonb_build_array(image_url) || COALESCE(
+                            (SELECT jsonb_agg(e.value) FROM removed, jsonb_each(removed.variants) AS e),
+                            CAST('[]' AS jsonb)))
+                    FROM orphan
+                )
+                SELECT id FROM deleted
+            """), {"id": post_id, "user_id": current_user_id, "job_kind": STORAGE_REMOVE}).first()
+            if not deleted:
                 return jsonify({'message': '삭제 권한이 없습니다.'}), 403
-
-            conn.execute(text("DELETE FROM posts WHERE id = :id"), {"id": post_id})
             conn.commit()
-            return jsonify({'message': '게시글이 삭제되었습니다.'}), 200
+        _post_count_cache.clear()
+        invalidate_cached('posts:list', f"post:{post_id}", f"comments:{post_id}")
+        mark_feed(count_delta=-1)  # 피드 행은 CASCADE로 지워지고, 빈자리는 갱신 스레드가 채움
+        return jsonify({'message': '게시글이 삭제되었습니다.'}), 200
     except Exception as e:
         return jsonify({"message": "An error occurred", "details": str(e)}), 500
 
 # 5. 닉네임 변경 API
 @app.route('/api/user/nickname', methods=['PUT'])
 @token_required
+@query_budget(1)
 def update_nickname(current_user_id):
     data = request.get_json()
     new_nickname = data.get('nickname')
@@ -285,13 +932,54 @@ def update_nickname(current_user_id):
             conn.execute(text("UPDATE users SET nickname = :nickname WHERE id = :id"), 
                          {"nickname": new_nickname, "id": current_user_id})
             conn.commit()
+        invalidate_cached(f"user:{current_user_id}", 'profiles')
+        mark_feed(user_ids=[current_user_id])
         return jsonify({'nickname': new_nickname})
     except Exception as e:
         return jsonify({'message': '이미 사용 중인 닉네임이거나 오류가 발생했습니다.', 'error': str(e)}), 409
 
+# --- 업로드 이미지 파생본 (images.py) ---
+# 워커가 썸네일/중간 크기/WebP 파생본을 만들면 원본 URL 기준으로 image_variants에 기록하고,
+# 해당 이미지를 포함하는 캐시된 응답을 무효화합니다. (워커 스레드에서 실행)
+def record_image_variants(original_url, variants, tags):
+    with engine.connect() as conn:
+        conn.execute(text("""
+            INSERT INTO image_variants (original_url, variants)
+            VALUES (:original_url, CAST(:variants AS jsonb))
+            ON CONFLICT (original_url) DO UPDATE SET variants = EXCLUDED.variants
+        """), {"original_url": original_url, "variants": json.dumps(variants)})
+        conn.commit()
+    if tags:
+        invalidate_cached(*tags)
+    mark_feed(image_urls=[original_url])
+
+image_processor = create_image_processor(storage, record_image_variants, os.environ)
+
+# 요청 파일을 스트리밍으로 Storage에 업로드하고 공개 URL을 반환합니다.
+# 파일 형식은 확장자/Content-Type 대신 파일 앞부분(magic bytes)으로 판별합니다.
+# 업로드 후 파생본 생성을 예약하며(variant_tags: 파생본 완료 시 무효화할 캐시 태그), 응답은 기다리지 않습니다.
+# 실패 시 (None, 오류 응답)을 반환합니다.
+def upload_image(file, bucket, user_id, variant_tags=()):
+    try:
+        upload_stream = UploadStream(file.stream, UPLOAD_MAX_BYTES)
+    except UnsupportedFileType:
+        return None, (jsonify({'message': 'JPEG, PNG, GIF, WebP 이미지만 업로드할 수 있습니다.'}), 415)
+
+    file_path = f"{user_id}/{uuid.uuid4()}{upload_stream.extension}"
+    try:
+        storage.upload(bucket, file_path, upload_stream, upload_stream.content_type)
+    except Exception as e:
+        # HTTP 클라이언트가 UploadTooLarge를 다른 예외로 감싼 경우도 exceeded로 확인합니다.
+        if not (isinstance(e, UploadTooLarge) or upload_stream.exceeded):
+            raise
+        return None, (jsonify({'message': f'파일 크기는 {UPLOAD_MAX_BYTES // (1024 * 1024)}MB 이하여야 합니다.'}), 413)
+    image_processor.submit(bucket, file_path, list(variant_tags))
+    return storage.get_public_url(bucket, file_path), None
+
 # 6. 프로필 사진 업로드 API (Storage는 Supabase 계속 사용)
 @app.route('/api/user/avatar', methods=['POST'])
 @token_required
+@query_budget(1)
 def upload_avatar(current_user_id):
     if 'avatar' not in request.files:
         return jsonify({'message': '파일이 전송되지 않았습니다.'}), 400
@@ -299,21 +987,37 @@ def upload_avatar(current_user_id):
     if file.filename == '':
         return jsonify({'message': '선택된 파일이 없습니다.'}), 400
     try:
-        file_ext = os.path.splitext(file.filename)[1]
-        file_path = f"{current_user_id}/{uuid.uuid4()}{file_ext}"
-
-        # 1. Supabase Storage에 업로드 (관리자 권한)
-        file_data = file.read()
-        supabase.storage.from_('avatars').upload(
-            path=file_path, file=file_data, file_options={'content-type': file.content_type}
-        )
-        public_url = supabase.storage.from_('avatars').get_public_url(file_path)
+        # 1. Supabase Storage에 스트리밍 업로드 (관리자 권한)
+        public_url, error_response = upload_image(file, 'avatars', current_user_id,
+                                                   variant_tags=[f"user:{current_user_id}"])
+        if error_response:
+            return error_response
 
-        # 2. Neon DB에 URL 업데이트
+        # 2. Neon DB에 URL 업데이트 + 이전 사진(파생본 포함)의 Storage 삭제 작업 예약 (한 문장)
         with engine.connect() as conn:
-            conn.execute(text("UPDATE users SET avatar_url = :url WHERE id = :id"),
-                         {"url": public_url, "id": current_user_id})
+            conn.execute(text("""
+                WITH old AS (
+                    SELECT id, avatar_url FROM users WHERE id = :id FOR UPDATE
+                ), updated AS (
+                    UPDATE users AS u SET avatar_url = :url
+                    FROM old WHERE u.id = old.id
+                    RETURNING old.avatar_url AS previous_url
+                ), removed AS (
+                    DELETE FROM image_variants
+                    WHERE original_url IN (SELECT previous_url FROM updated WHERE previous_url <> :url)
+                    RETURNING variants
+                )
+                INSERT INTO jobs (kind, payload)
+                SELECT :job_kind, jsonb_build_object('bucket', 'avatars', 'urls',
+                    jsonb_build_array(previous_url) || COALESCE(
+                        (SELECT jsonb_agg(e.value) FROM removed, jsonb_each(removed.variants) AS e),
+                        CAST('[]' AS jsonb)))
+                FROM updated
+                WHERE previous_url IS NOT NULL AND previous_url <> :url
+            """), {"url": public_url, "id": current_user_id, "job_kind": STORAGE_REMOVE})
             conn.commit()
+        invalidate_cached(f"user:{current_user_id}", 'profiles')
+        mark_feed(user_ids=[current_user_id])
 
         return jsonify({'avatar_url': public_url}), 200
     except Exception as e:
@@ -322,63 +1026,169 @@ def upload_avatar(current_user_id):
 # 7. 프로필 사진 삭제 API
 @app.route('/api/user/avatar', methods=['DELETE'])
 @token_required
+@query_budget(1)
 def delete_avatar(current_user_id):
     try:
-        # 1. DB에서 현재 URL 가져오기
+        # 1. 기존 URL을 읽으면서 DB에서 URL과 파생본 기록 제거 + Storage 삭제 작업 예약 (한 문장)
         with engine.connect() as conn:
-            result = conn.execute(text("SELECT avatar_url FROM users WHERE id = :id"), {"id": current_user_id}).first()
-            current_avatar_url = result[0] if result else None
-        
-            if not current_avatar_url:
+            result = conn.execute(text("""
+                WITH cleared AS (
+                    UPDATE users AS u SET avatar_url = NULL
+                    FROM (SELECT id, avatar_url FROM users WHERE id = :id FOR UPDATE) AS old
+                    WHERE u.id = old.id AND old.avatar_url IS NOT NULL
+                    RETURNING old.avatar_url
+                ), removed AS (
+                    DELETE FROM image_variants WHERE original_url IN (SELECT avatar_url FROM cleared)
+                    RETURNING variants
+                ), job AS (
+                    INSERT INTO jobs (kind, payload)
+                    SELECT :job_kind, jsonb_build_object('bucket', 'avatars', 'urls',
+                        jsonb_build_array(avatar_url) || COALESCE(
+                            (SELECT jsonb_agg(e.value) FROM removed, jsonb_each(removed.variants) AS e),
+                            CAST('[]' AS jsonb)))
+                    FROM cleared
+                    RETURNING id
+                )
+                SELECT avatar_url, (SELECT id FROM job) AS job_id FROM cleared
+            """), {"id": current_user_id, "job_kind": STORAGE_REMOVE}).first()
+            if not result:
                 return jsonify({'message': '삭제할 프로필 사진이 없습니다.'}), 404
-        
-            # 2. Storage에서 파일 삭제
-            try:
-                path_to_remove = current_avatar_url.split('/avatars/')[-1]
-                supabase.storage.from_('avatars').remove([path_to_remove])
-            except Exception as e:
-                print(f"Could not delete file from storage: {e}")
-            
-            # 3. DB에서 URL 제거
-            conn.execute(text("UPDATE users SET avatar_url = NULL WHERE id = :id"), {"id": current_user_id})
             conn.commit()
-            
+        invalidate_cached(f"user:{current_user_id}", 'profiles')
+        mark_feed(user_ids=[current_user_id])
+
+        # 2. Storage의 파일(원본 + 파생본)은 작업 워커가 삭제합니다. (jobs.py)
         return jsonify({'avatar_url': None}), 200
     except Exception as e:
-        print(f"Error in delete_avatar: {e}")
+        app.logger.exception("Error in delete_avatar")
         return jsonify({'message': '사진 삭제 중 오류가 발생했습니다.', 'error': str(e)}), 500
 
+# 댓글 + 작성자 JOIN 결과 행은 작성자 컬럼을 'users' 객체로 묶어 반환합니다. (프론트엔드 호환용)
+COMMENT_USERS = (('users', ('nickname', 'avatar_url', 'avatar_thumb_url')),)
+
 # 8. 특정 게시글의 댓글 목록 조회 API
+# ?cursor=&limit=N 이면 {comments, next_cursor, limit}, ?format=ndjson 이면 스트리밍 (목록 헬퍼 참고)
+COMMENTS_QUERY = """
+    SELECT c.*, u.nickname, u.avatar_url, """ + AVATAR_THUMB_SQL + """
+    FROM comments c
+    JOIN users u ON c.user_id = u.id
+    WHERE c.post_id = :post_id {cursor_condition}
+    ORDER BY c.created_at DESC, c.id DESC
+    {limit_clause}
+"""
+
 @app.route('/api/posts/<int:post_id>/comments', methods=['GET'])
+@query_budget(1)
 def get_comments(post_id):
+    mode, cursor, limit = get_list_mode()
+    params = {"post_id": post_id}
+    tags = (f"comments:{post_id}",) + SHARED_READ_TAGS
+    if mode == 'ndjson':
+        return stream_ndjson(COMMENTS_QUERY, params, nested=COMMENT_USERS, tags=tags)
+
+    # 같은 게시글/커서/limit의 동시 조회는 한 번만 실행합니다.
+    target = read_engine(*tags)
+
+    def query():
+        with target.connect() as conn:
+            if mode == 'cursor':
+                result, next_cursor = fetch_keyset_page(conn, COMMENTS_QUERY, params,
+                                                        "c.created_at", "c.id", cursor, limit)
+                return serialize_rows(result, nested=COMMENT_USERS), next_cursor
+            result = conn.execute(render_list_query(COMMENTS_QUERY), params).fetchall()
+        return serialize_rows(result, nested=COMMENT_USERS), None
+
     try:
-        query = text("""
-            SELECT c.*, u.nickname, u.avatar_url 
-            FROM comments c
-            JOIN users u ON c.user_id = u.id
-            WHERE c.post_id = :post_id
-            ORDER BY c.created_at DESC
-        """)
-        with engine.connect() as conn:
-            result = conn.execute(query, {"post_id": post_id}).fetchall()
-        
-        # 'users' 객체 형태로 중첩시키기 (프론트엔드 호환용)
-        comments_data = []
-        for row in result:
-            comment = row._asdict()
-            comment['users'] = {
-                'nickname': comment.pop('nickname'),
-                'avatar_url': comment.pop('avatar_url')
-            }
-            comments_data.append(comment)
-            
+        comments_data, next_cursor = single_flight.do(
+            f"comments:{post_id}:{mode}:{cursor}:{limit}:{read_source(target)}", query, tags=tags)
+        if mode == 'cursor':
+            return jsonify({'comments': comments_data, 'next_cursor': next_cursor, 'limit': limit})
         return jsonify(comments_data)
+    except ValueError:
+        return jsonify({"message": "잘못된 커서 값입니다."}), 400
     except Exception as e:
         return jsonify({"message": "댓글을 불러오는 데 실패했습니다.", "details": str(e)}), 500
 
+# 8-1. 게시글 상세 페이지 통합 API
+# 게시글 상세, 댓글 첫 페이지, 현재 사용자 상태(좋아요/작성자 여부)를 연결 하나로 한 번에 반환합니다.
+# - ?include=post,comments,viewer (기본값: 전부)
+# - ?comments_limit=N (기본 20, 최대 100)
+# 응답의 comments_next_cursor로 나머지 댓글을 이어서 불러올 수 있습니다.
+PAGE_SECTIONS = ('post', 'comments', 'viewer')
+
+@app.route('/api/posts/<int:post_id>/page', methods=['GET'])
+@query_budget(3)  # 게시글 + 댓글 + (로그인 시) 좋아요 여부
+def get_post_page(post_id):
+    include = request.args.get('include')
+    sections = set(include.split(',')) if include else set(PAGE_SECTIONS)
+    if not sections or not sections.issubset(PAGE_SECTIONS):
+        return jsonify({'message': f"include는 {', '.join(PAGE_SECTIONS)} 중에서 선택해주세요."}), 400
+    try:
+        comments_limit = min(max(int(request.args.get('comments_limit', 20)), 1), 100)
+    except ValueError:
+        comments_limit = 20
+    viewer_id = get_optional_user_id()
+
+    try:
+        shared = load_post_page(post_id, comments_limit if 'comments' in sections else 0)
+        if shared is None:
+            return jsonify({'message': '게시글을 찾을 수 없습니다.'}), 404
+
+        post = with_viewer_state(shared['post'], viewer_id)
+        response = {}
+        if 'post' in sections:
+            response['post'] = post
+        if 'comments' in sections:
+            response['comments'] = shared['comments']
+            response['comments_next_cursor'] = shared['comments_next_cursor']
+        if 'viewer' in sections:
+            response['viewer'] = {
+                'user_id': viewer_id,
+                'liked_by_me': post['liked_by_me'],
+                'is_author': viewer_id is not None and viewer_id == post['user_id']
+            }
+        return jsonify(response)
+    except Exception as e:
+        return jsonify({"message": "데이터를 불러오는 데 실패했습니다.", "details": str(e)}), 500
+
+# 상세 페이지의 사용자와 무관한 부분(게시글 + 댓글 첫 페이지)을 연결 하나로 조회합니다. 게시글이 없으면 None.
+# comments_limit이 0이면 댓글은 조회하지 않습니다.
+def load_post_page(post_id, comments_limit):
+    tags = (f"post:{post_id}", f"comments:{post_id}") + SHARED_READ_TAGS
+    target = read_engine(*tags)
+
+    def query():
+        with target.connect() as conn:
+            # 게시글 존재 여부는 어떤 섹션을 요청하든 확인합니다.
+            post = conn.execute(text(POST_DETAIL_QUERY), {"post_id": post_id}).first()
+            if not post:
+                return None
+            comments = []
+            if comments_limit:
+                comments = conn.execute(text(f"""
+                    SELECT c.*, u.nickname, u.avatar_url, {AVATAR_THUMB_SQL}
+                    FROM comments c
+                    JOIN users u ON c.user_id = u.id
+                    WHERE c.post_id = :post_id
+                    ORDER BY c.created_at DESC, c.id DESC
+                    LIMIT :limit
+                """), {"post_id": post_id, "limit": comments_limit + 1}).fetchall()
+
+        next_cursor = None
+        if len(comments) > comments_limit:
+            last = comments[comments_limit - 1]
+            next_cursor = encode_cursor(last.created_at, last.id)
+        return {
+            'post': serialize_row(post),
+            'comments': serialize_rows(comments[:comments_limit], nested=COMMENT_USERS),
+            'comments_next_cursor': next_cursor,
+        }
+    return single_flight.do(f"post:{post_id}:page:{comments_limit}:{read_source(target)}", query, tags=tags)
+
 # 9. 새 댓글 작성 API
 @app.route('/api/posts/<int:post_id>/comments', methods=['POST'])
 @token_required
+@query_budget(1)
 def create_comment(current_user_id, post_id):
     data = request.get_json()
     content = data.get('content')
@@ -386,58 +1196,63 @@ def create_comment(current_user_id, post_id):
         return jsonify({'message': '댓글 내용을 확인해주세요.'}), 400
     try:
         with engine.connect() as conn:
-            query = text("""
-                INSERT INTO comments (content, user_id, post_id) 
-                VALUES (:content, :user_id, :post_id)
-                RETURNING id;
+            # INSERT 후 작성자 정보를 JOIN하여 한 번에 반환
+            query = text(f"""
+                WITH inserted AS (
+                    INSERT INTO comments (content, user_id, post_id) 
+                    VALUES (:content, :user_id, :post_id)
+                    RETURNING *
+                )
+                SELECT i.*, u.nickname, u.avatar_url, {AVATAR_THUMB_SQL}
+                FROM inserted i
+                JOIN users u ON i.user_id = u.id;
             """)
-            result = conn.execute(query, {
+            new_comment_result = conn.execute(query, {
                 "content": content, "user_id": current_user_id, "post_id": post_id
             }).first()
-            new_comment_id = result[0]
             conn.commit()
-
-            # 방금 만든 댓글 정보 반환
-            detail_query = text("""
-                SELECT c.*, u.nickname, u.avatar_url 
-                FROM comments c
-                JOIN users u ON c.user_id = u.id
-                WHERE c.id = :comment_id
-            """)
-            new_comment_result = conn.execute(detail_query, {"comment_id": new_comment_id}).first()
+        invalidate_cached(f"comments:{post_id}")
             
-            # 'users' 객체 형태로 중첩
-            new_comment_data = new_comment_result._asdict()
-            new_comment_data['users'] = {
-                'nickname': new_comment_data.pop('nickname'),
-                'avatar_url': new_comment_data.pop('avatar_url')
-            }
-            return jsonify(new_comment_data), 201
+        return jsonify(serialize_row(new_comment_result, nested=COMMENT_USERS)), 201
             
     except Exception as e:
         return jsonify({'message': '댓글 작성 중 오류가 발생했습니다.', 'error': str(e)}), 500
 
 # 10. 댓글 삭제 API
+# 작성자 조건부 DELETE와 소유자 조회를 한 문장으로 처리합니다.
+# (owner_id가 없으면 404, 삭제된 행이 없으면 403)
 @app.route('/api/comments/<int:comment_id>', methods=['DELETE'])
 @token_required
+@query_budget(1)
 def delete_comment(current_user_id, comment_id):
     try:
         with engine.connect() as conn:
-            comment_check = conn.execute(text("SELECT user_id FROM comments WHERE id = :id"), {"id": comment_id}).first()
-            if not comment_check:
+            result = conn.execute(text("""
+                WITH target AS (
+                    SELECT user_id FROM comments WHERE id = :id
+                ), deleted AS (
+                    DELETE FROM comments WHERE id = :id AND user_id = :user_id
+                    RETURNING id, post_id
+                )
+                SELECT (SELECT user_id FROM target) AS owner_id,
+                       (SELECT id FROM deleted) AS deleted_id,
+                       (SELECT post_id FROM deleted) AS post_id
+            """), {"id": comment_id, "user_id": current_user_id}).first()
+            if result.owner_id is None:
                 return jsonify({'message': '댓글을 찾을 수 없습니다.'}), 404
-            if comment_check[0] != current_user_id:
+            if result.deleted_id is None:
                 return jsonify({'message': '삭제 권한이 없습니다.'}), 403
-            
-            conn.execute(text("DELETE FROM comments WHERE id = :id"), {"id": comment_id})
             conn.commit()
+        invalidate_cached(f"comments:{result.post_id}")
         return jsonify({'message': '댓글이 삭제되었습니다.'}), 200
     except Exception as e:
         return jsonify({'message': '댓글 삭제 중 오류가 발생했습니다.', 'error': str(e)}), 500
 
 # 11. 댓글 수정 API
+# 작성자 조건부 UPDATE, 소유자 조회, 작성자 정보 JOIN을 한 문장으로 처리합니다.
 @app.route('/api/comments/<int:comment_id>', methods=['PUT'])
 @token_required
+@query_budget(1)
 def update_comment(current_user_id, comment_id):
     data = request.get_json()
     content = data.get('content')
@@ -445,30 +1260,28 @@ def update_comment(current_user_id, comment_id):
         return jsonify({'message': '댓글 내용을 확인해주세요.'}), 400
     try:
         with engine.connect() as conn:
-            comment_check = conn.execute(text("SELECT user_id FROM comments WHERE id = :id"), {"id": comment_id}).first()
-            if not comment_check:
+            result = conn.execute(text(f"""
+                WITH target AS (
+                    SELECT user_id FROM comments WHERE id = :id
+                ), updated AS (
+                    UPDATE comments SET content = :content
+                    WHERE id = :id AND user_id = :user_id
+                    RETURNING *
+                )
+                SELECT (SELECT user_id FROM target) AS owner_id,
+                       updated.*, u.nickname, u.avatar_url, {AVATAR_THUMB_SQL}
+                FROM (SELECT 1) AS one
+                LEFT JOIN updated ON TRUE
+                LEFT JOIN users u ON updated.user_id = u.id
+            """), {"content": content, "id": comment_id, "user_id": current_user_id}).first()
+            if result.owner_id is None:
                 return jsonify({'message': '댓글을 찾을 수 없습니다.'}), 404
-            if comment_check[0] != current_user_id:
+            if result.id is None:
                 return jsonify({'message': '수정 권한이 없습니다.'}), 403
-
-            conn.execute(text("UPDATE comments SET content = :content WHERE id = :id"), 
-                         {"content": content, "id": comment_id})
             conn.commit()
+        invalidate_cached(f"comments:{result.post_id}")
 
-            # (상세 조회 쿼리를 재사용하여 수정된 댓글 정보 반환)
-            detail_query = text("""
-                SELECT c.*, u.nickname, u.avatar_url 
-                FROM comments c
-                JOIN users u ON c.user_id = u.id
-                WHERE c.id = :comment_id
-            """)
-            updated_comment_result = conn.execute(detail_query, {"comment_id": comment_id}).first()
-            updated_comment_data = updated_comment_result._asdict()
-            updated_comment_data['users'] = {
-                'nickname': updated_comment_data.pop('nickname'),
-                'avatar_url': updated_comment_data.pop('avatar_url')
-            }
-            return jsonify(updated_comment_data), 200
+        return jsonify(serialize_row(result, nested=COMMENT_USERS, drop=('owner_id',))), 200
             
     except Exception as e:
         return jsonify({'message': '댓글 수정 중 오류가 발생했습니다.', 'error': str(e)}), 500
@@ -476,12 +1289,24 @@ def update_comment(current_user_id, comment_id):
 # 13. 좋아요 누르기 API
 @app.route('/api/posts/<int:post_id>/like', methods=['POST'])
 @token_required
+@query_budget(1)
 def add_like(current_user_id, post_id):
+    if like_writer is not None:
+        return queue_like(current_user_id, post_id, True)
     try:
+        # likes INSERT와 posts.like_count 증가를 하나의 문장(트랜잭션)으로 처리
         with engine.connect() as conn:
-            conn.execute(text("INSERT INTO likes (user_id, post_id) VALUES (:user_id, :post_id)"), 
-                         {"user_id": current_user_id, "post_id": post_id})
+            conn.execute(text("""
+                WITH inserted AS (
+                    INSERT INTO likes (user_id, post_id) VALUES (:user_id, :post_id)
+                    RETURNING post_id
+                )
+                UPDATE posts SET like_count = like_count + 1
+                WHERE id IN (SELECT post_id FROM inserted)
+            """), {"user_id": current_user_id, "post_id": post_id})
             conn.commit()
+        invalidate_like_counts([post_id])
+        mark_feed(post_ids=[post_id])
         return jsonify({'message': '좋아요가 추가되었습니다.'}), 201
     except Exception as e:
         return jsonify({'message': '이미 좋아요를 눌렀거나 오류가 발생했습니다.', 'error': str(e)}), 409
@@ -489,24 +1314,54 @@ def add_like(current_user_id, post_id):
 # 14. 좋아요 취소하기 API
 @app.route('/api/posts/<int:post_id>/like', methods=['DELETE'])
 @token_required
+@query_budget(1)
 def remove_like(current_user_id, post_id):
+    if like_writer is not None:
+        return queue_like(current_user_id, post_id, False)
     try:
+        # likes DELETE와 posts.like_count 감소를 하나의 문장(트랜잭션)으로 처리
         with engine.connect() as conn:
-            result = conn.execute(text("DELETE FROM likes WHERE user_id = :user_id AND post_id = :post_id"), 
-                                  {"user_id": current_user_id, "post_id": post_id})
+            result = conn.execute(text("""
+                WITH deleted AS (
+                    DELETE FROM likes WHERE user_id = :user_id AND post_id = :post_id
+                    RETURNING post_id
+                )
+                UPDATE posts SET like_count = like_count - 1
+                WHERE id IN (SELECT post_id FROM deleted)
+            """), {"user_id": current_user_id, "post_id": post_id})
             conn.commit()
             if result.rowcount == 0:
                 return jsonify({'message': '좋아요 기록을 찾을 수 없습니다.'}), 404
+        invalidate_like_counts([post_id])
+        mark_feed(post_ids=[post_id])
         return jsonify({'message': '좋아요가 취소되었습니다.'}), 200
     except Exception as e:
         return jsonify({'message': '좋아요 취소 중 오류가 발생했습니다.', 'error': str(e)}), 500
 
+# 좋아요 쓰기 지연 모드: 상태만 확인해 바로 응답하고 DB 반영은 like_writer가 묶어서 처리합니다.
+# (응답 코드와 메시지는 즉시 반영 모드와 같음, 여러 워커 사이의 규칙은 likes.py 참고)
+def queue_like(current_user_id, post_id, like):
+    try:
+        outcome = like_writer.submit(current_user_id, post_id, like)
+    except Exception as e:
+        if like:
+            return jsonify({'message': '이미 좋아요를 눌렀거나 오류가 발생했습니다.', 'error': str(e)}), 409
+        return jsonify({'message': '좋아요 취소 중 오류가 발생했습니다.', 'error': str(e)}), 500
+    if outcome == 'conflict':
+        return jsonify({'message': '이미 좋아요를 눌렀거나 오류가 발생했습니다.'}), 409
+    if outcome == 'not_found':
+        return jsonify({'message': '좋아요 기록을 찾을 수 없습니다.'}), 404
+    if like:
+        return jsonify({'message': '좋아요가 추가되었습니다.'}), 201
+    return jsonify({'message': '좋아요가 취소되었습니다.'}), 200
+
 # 15. 내가 좋아요 누른 게시글 ID 목록 API
 @app.route('/api/user/my-likes', methods=['GET'])
 @token_required
+@query_budget(1)
 def get_my_likes(current_user_id):
     try:
-        with engine.connect() as conn:
+        with read_engine().connect() as conn:
             result = conn.execute(text("SELECT post_id FROM likes WHERE user_id = :user_id"), 
                                   {"user_id": current_user_id}).fetchall()
         liked_post_ids = [row[0] for row in result]
@@ -517,6 +1372,7 @@ def get_my_likes(current_user_id):
 # 13. (신규) 게시글 본문 이미지 업로드 API (Storage는 Supabase)
 @app.route('/api/posts/image-upload', methods=['POST'])
 @token_required
+@query_budget(0)
 def upload_post_image(current_user_id):
     if 'image' not in request.files:
         return jsonify({'message': '이미지 파일이 전송되지 않았습니다.'}), 400
@@ -524,123 +1380,376 @@ def upload_post_image(current_user_id):
     if file.filename == '':
         return jsonify({'message': '선택된 파일이 없습니다.'}), 400
     try:
-        file_ext = os.path.splitext(file.filename)[1]
-        file_path = f"{current_user_id}/{uuid.uuid4()}{file_ext}"
-
-        # (관리자 권한으로 Storage에 업로드)
-        file_data = file.read()
-        supabase.storage.from_('post_images').upload(
-            path=file_path, file=file_data, file_options={'content-type': file.content_type}
-        )
-        public_url = supabase.storage.from_('post_images').get_public_url(file_path)
+        # (관리자 권한으로 Storage에 스트리밍 업로드)
+        public_url, error_response = upload_image(file, 'post_images', current_user_id,
+                                                   variant_tags=['posts:list'])
+        if error_response:
+            return error_response
         return jsonify({'image_url': public_url}), 200
     except Exception as e:
-        print(f"Error in upload_post_image: {e}")
+        app.logger.exception("Error in upload_post_image")
         return jsonify({'message': '이미지 업로드 중 오류가 발생했습니다.', 'error': str(e)}), 500
     
+# 내 글 / 좋아요한 글 목록 응답을 만듭니다. (cursor 모드가 아니면 기존 형태로 전체 반환)
+def my_posts_response(mode, posts_data, next_cursor, limit):
+    if mode == 'cursor':
+        return jsonify({'posts': posts_data, 'next_cursor': next_cursor, 'limit': limit})
+    return jsonify({
+        'posts': posts_data,
+        'total_count': len(posts_data),
+        'page': 1,
+        'limit': len(posts_data)
+    })
+
 # 14. (신규) '내가 쓴 글' 목록 조회 API (로그인 필요)
+# get_posts와 동일한 SQL 쿼리지만, WHERE p.user_id = :user_id 조건만 추가합니다.
+MY_POSTS_QUERY = """
+    SELECT
+        {post_columns}
+    FROM posts AS p
+    JOIN users AS u ON p.user_id = u.id
+    WHERE p.user_id = :current_user_id {cursor_condition} -- 이 사용자가 쓴 글만 필터링
+    ORDER BY p.created_at DESC, p.id DESC
+    {limit_clause}
+"""
+
 @app.route('/api/user/my-posts', methods=['GET'])
 @token_required
+@query_budget(1)
 def get_my_posts(current_user_id):
+    mode, cursor, limit = get_list_mode()
     try:
-        # get_posts와 동일한 SQL 쿼리지만, WHERE p.user_id = :user_id 조건만 추가합니다.
-        query = text("""
-            SELECT
-                p.id, p.created_at, p.title, p.content, p.user_id, p.image_url,
-                u.nickname AS author_nickname,
-                COUNT(l.post_id) AS like_count,
-                COUNT(*) OVER() as total_count
-            FROM posts AS p
-            JOIN users AS u ON p.user_id = u.id
-            LEFT JOIN likes AS l ON p.id = l.post_id
-            WHERE p.user_id = :current_user_id -- 이 사용자가 쓴 글만 필터링
-            GROUP BY p.id, u.nickname
-            ORDER BY p.created_at DESC;
-        """)
-        
-        with engine.connect() as conn:
-            result = conn.execute(query, {"current_user_id": current_user_id}).fetchall()
-        
-        posts_data = [row._asdict() for row in result]
+        fields = get_post_fields()
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    query_sql = MY_POSTS_QUERY.replace("{post_columns}", select_post_columns(fields))
+    params = {"current_user_id": current_user_id, "viewer_id": current_user_id}
+    if mode == 'ndjson':
+        return stream_ndjson(query_sql, params, drop=post_drop_fields(fields))
+    try:
+        next_cursor = None
+        with read_engine().connect() as conn:
+            if mode == 'cursor':
+                result, next_cursor = fetch_keyset_page(conn, query_sql, params,
+                                                        "p.created_at", "p.id", cursor, limit)
+            else:
+                result = conn.execute(render_list_query(query_sql), params).fetchall()
         
-        # '좋아요' 기능과 달리, 이 API는 페이지네이션 없이 모든 글을 반환합니다.
-        # (추후 페이지네이션을 추가할 수도 있습니다.)
-        return jsonify({
-            'posts': posts_data,
-            'total_count': len(posts_data),
-            'page': 1,
-            'limit': len(posts_data)
-        })
+        posts_data = serialize_rows(result, drop=post_drop_fields(fields))
+        return my_posts_response(mode, posts_data, next_cursor, limit)
 
+    except ValueError:
+        return jsonify({"message": "잘못된 커서 값입니다."}), 400
     except Exception as e:
-        print(f"Error in get_my_posts: {e}")
+        app.logger.exception("Error in get_my_posts")
         return jsonify({"message": "내 게시글을 불러오는 데 실패했습니다.", "details": str(e)}), 500
 
 # 15. (신규) '내가 쓴 댓글' 목록 조회 API (로그인 필요)
+# comments 테이블을 기준으로 posts 테이블을 조인합니다.
+MY_COMMENTS_QUERY = """
+    SELECT 
+        c.id, 
+        c.created_at, 
+        c.content, 
+        c.post_id, 
+        p.title AS post_title
+    FROM comments AS c
+    JOIN posts AS p ON c.post_id = p.id
+    WHERE c.user_id = :current_user_id {cursor_condition}
+    ORDER BY c.created_at DESC, c.id DESC
+    {limit_clause}
+"""
+
 @app.route('/api/user/my-comments', methods=['GET'])
 @token_required
+@query_budget(1)
 def get_my_comments(current_user_id):
+    mode, cursor, limit = get_list_mode()
+    params = {"current_user_id": current_user_id}
+    if mode == 'ndjson':
+        return stream_ndjson(MY_COMMENTS_QUERY, params)
     try:
-        # comments 테이블을 기준으로 posts 테이블을 조인합니다.
-        query = text("""
-            SELECT 
-                c.id, 
-                c.created_at, 
-                c.content, 
-                c.post_id, 
-                p.title AS post_title
-            FROM comments AS c
-            JOIN posts AS p ON c.post_id = p.id
-            WHERE c.user_id = :current_user_id
-            ORDER BY c.created_at DESC;
-        """)
-        
-        with engine.connect() as conn:
-            result = conn.execute(query, {"current_user_id": current_user_id}).fetchall()
-        
-        comments_data = [row._asdict() for row in result]
+        with read_engine().connect() as conn:
+            if mode == 'cursor':
+                result, next_cursor = fetch_keyset_page(conn, MY_COMMENTS_QUERY, params,
+                                                        "c.created_at", "c.id", cursor, limit)
+            else:
+                result = conn.execute(render_list_query(MY_COMMENTS_QUERY), params).fetchall()
         
+        comments_data = serialize_rows(result)
+        if mode == 'cursor':
+            return jsonify({'comments': comments_data, 'next_cursor': next_cursor, 'limit': limit})
         return jsonify(comments_data)
 
+    except ValueError:
+        return jsonify({"message": "잘못된 커서 값입니다."}), 400
     except Exception as e:
-        print(f"Error in get_my_comments: {e}")
+        app.logger.exception("Error in get_my_comments")
         return jsonify({"message": "내 댓글을 불러오는 데 실패했습니다.", "details": str(e)}), 500
     
 # 16. (신규) '내가 좋아요 누른 글' 목록 조회 API (로그인 필요)
+# likes 테이블을 기준으로 JOIN하여 '좋아요 누른 글' 목록을 가져옵니다.
+MY_LIKED_POSTS_QUERY = """
+    SELECT
+        {post_columns}
+    FROM likes AS l
+    JOIN posts AS p ON l.post_id = p.id
+    JOIN users AS u ON p.user_id = u.id
+    WHERE l.user_id = :current_user_id {cursor_condition}
+    ORDER BY p.created_at DESC, p.id DESC
+    {limit_clause}
+"""
+
 @app.route('/api/user/my-likes-posts', methods=['GET'])
 @token_required
+@query_budget(1)
 def get_my_liked_posts(current_user_id):
+    mode, cursor, limit = get_list_mode()
     try:
-        # likes 테이블을 기준으로 JOIN하여 '좋아요 누른 글' 목록을 가져옵니다.
-        query = text("""
-            SELECT
-                p.id, p.created_at, p.title, p.content, p.user_id, p.image_url,
-                u.nickname AS author_nickname,
-                (SELECT COUNT(*) FROM likes l_count WHERE l_count.post_id = p.id) AS like_count,
-                COUNT(*) OVER() as total_count
-            FROM likes AS l
-            JOIN posts AS p ON l.post_id = p.id
-            JOIN users AS u ON p.user_id = u.id
-            WHERE l.user_id = :current_user_id
-            GROUP BY p.id, u.nickname
-            ORDER BY p.created_at DESC;
-        """)
-        
-        with engine.connect() as conn:
-            result = conn.execute(query, {"current_user_id": current_user_id}).fetchall()
-        
-        posts_data = [row._asdict() for row in result]
+        fields = get_post_fields()
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    # 좋아요 누른 글 목록이므로 liked_by_me는 항상 true
+    query_sql = MY_LIKED_POSTS_QUERY.replace("{post_columns}", select_post_columns(fields, "TRUE AS liked_by_me"))
+    params = {"current_user_id": current_user_id}
+    if mode == 'ndjson':
+        return stream_ndjson(query_sql, params, drop=post_drop_fields(fields))
+    try:
+        next_cursor = None
+        with read_engine().connect() as conn:
+            if mode == 'cursor':
+                result, next_cursor = fetch_keyset_page(conn, query_sql, params,
+                                                        "p.created_at", "p.id", cursor, limit)
+            else:
+                result = conn.execute(render_list_query(query_sql), params).fetchall()
         
-        return jsonify({
-            'posts': posts_data,
-            'total_count': len(posts_data),
-            'page': 1,
-            'limit': len(posts_data)
-        })
+        posts_data = serialize_rows(result, drop=post_drop_fields(fields))
+        return my_posts_response(mode, posts_data, next_cursor, limit)
 
+    except ValueError:
+        return jsonify({"message": "잘못된 커서 값입니다."}), 400
     except Exception as e:
-        print(f"Error in get_my_liked_posts: {e}")
+        app.logger.exception("Error in get_my_liked_posts")
         return jsonify({"message": "좋아요한 게시글을 불러오는 데 실패했습니다.", "details": str(e)}), 500
 
+# --- 내부 운영용 API ---
+# 응답 캐시 적중/미스/축출 통계 (캐시 크기 조정용)
+@app.route('/internal/cache', methods=['GET'])
+@internal_only
+def get_cache_stats():
+    return jsonify(response_cache.stats())
+
+# 토큰 검증 캐시 상태: 적중/미스/축출 수와 실제 jwt.decode 횟수
+@app.route('/internal/auth', methods=['GET'])
+@internal_only
+def get_auth_stats():
+    return jsonify(token_verifier.stats())
+
+# 비밀번호 워커 풀 상태: 대기/완료/거절/재해시 수
+@app.route('/internal/passwords', methods=['GET'])
+@internal_only
+def get_password_stats():
+    return jsonify(password_hasher.stats())
+
+# Prometheus 형식 지표: 라우트별 요청 수/구간별 지연 히스토그램/쿼리 수 + 커넥션 풀·캐시 상태
+@app.route('/metrics', methods=['GET'])
+@internal_only
+def get_metrics():
+    pool = pool_stats.snapshot(engine.pool)
+    cache = response_cache.stats()
+    flights = single_flight.stats()
+    extra = [
+        ('db_pool_checked_out', 'gauge', '사용 중인 DB 연결 수', pool['checked_out']),
+        ('db_pool_overflow', 'gauge', '풀 크기를 넘어 추가로 연 DB 연결 수', pool['overflow']),
+        ('db_pool_timeouts_total', 'counter', 'DB 연결 대기 시간 초과 수', pool['timeouts']),
+        ('db_pool_wait_seconds_total', 'counter', 'DB 연결을 기다린 시간 합계', pool['wait_seconds_total']),
+        ('db_pool_connect_seconds_total', 'counter', '체크아웃 중 새 DB 연결을 만든 시간 합계', pool['connect_seconds_total']),
+        ('response_cache_hits_total', 'counter', '응답 캐시 적중 수', cache.get('hits', 0)),
+        ('response_cache_misses_total', 'counter', '응답 캐시 미스 수', cache.get('misses', 0)),
+        ('single_flight_leaders_total', 'counter', 'single-flight로 실제 실행한 조회 수', flights['leaders']),
+        ('single_flight_shared_total', 'counter', '진행 중인 조회에 합류한 요청 수', flights['shared']),
+        ('single_flight_stale_hits_total', 'counter', 'stale-while-revalidate로 응답한 요청 수', flights['stale_hits']),
+    ]
+    return app.response_class(request_metrics.render(extra), mimetype='text/plain; version=0.0.4')
+
+# 이미지 파생본 워커 풀 상태: 대기/완료/실패/거절 수
+@app.route('/internal/images', methods=['GET'])
+@internal_only
+def get_image_stats():
+    return jsonify(image_processor.stats())
+
+# 좋아요 쓰기 지연 상태: 대기/상쇄/반영/버린 이벤트 수 (LIKE_WRITE_BEHIND=1이 아니면 404)
+@app.route('/internal/likes', methods=['GET'])
+@internal_only
+def get_like_writer_stats():
+    if like_writer is None:
+        return jsonify({'message': 'LIKE_WRITE_BEHIND=1로 실행 중이 아닙니다.'}), 404
+    return jsonify(like_writer.stats())
+
+# 읽기 복제본 상태: 복제본별 지연/건강 여부/풀, 주 DB·복제본·고정(sticky) 조회 수
+@app.route('/internal/replicas', methods=['GET'])
+@internal_only
+def get_replica_stats():
+    return jsonify(db_router.stats())
+
+# 작업 대기열 상태: 종류별 준비/실행 중/예약/dead 작업 수와 가장 오래 기다린 작업의 대기 시간
+@app.route('/internal/jobs', methods=['GET'])
+@internal_only
+def get_job_stats():
+    try:
+        return jsonify(job_queue.stats())
+    except Exception as e:
+        return jsonify({'message': '작업 대기열 상태를 불러오지 못했습니다.', 'details': str(e)}), 500
+
+# 홈 피드 상태: ranking/크기, 대기 중인 변경, 증분/주기 갱신 횟수와 마지막 소요 시간 (FEED_ENABLED=1이 아니면 404)
+@app.route('/internal/feed', methods=['GET'])
+@internal_only
+def get_feed_stats():
+    if home_feed is None:
+        return jsonify({'message': 'FEED_ENABLED=1로 실행 중이 아닙니다.'}), 404
+    return jsonify(home_feed.stats())
+
+# 동시 조회 합치기 상태: 실행/합류/stale 응답 수
+@app.route('/internal/single-flight', methods=['GET'])
+@internal_only
+def get_single_flight_stats():
+    return jsonify(single_flight.stats())
+
+# 커넥션 풀 상태: 체크아웃/오버플로 수, 대기 시간, 체크아웃 지연 히스토그램
+@app.route('/internal/pool', methods=['GET'])
+@internal_only
+def get_pool_stats():
+    return jsonify(pool_stats.snapshot(engine.pool))
+
+# 쿼리 계획 검사 결과: 큰 테이블을 Seq Scan한 SQL과 라우트 (PLAN_CHECK=1이 아니면 404)
+@app.route('/internal/query-plans', methods=['GET'])
+@internal_only
+def get_query_plans():
+    if plan_checker is None:
+        return jsonify({'message': 'PLAN_CHECK=1로 실행 중이 아닙니다.'}), 404
+    return jsonify(plan_checker.report())
+
+# --- 워커 초기화 (gunicorn.conf.py의 훅에서 호출) ---
+# gunicorn post_fork 훅(PRELOAD_APP=1)에서 호출: 마스터에서 만들어진 연결이 있다면 워커가 공유하지 않도록 버립니다.
+def reset_after_fork():
+    for _engine in db_router.engines():
+        _engine.reset_after_fork()
+    storage.reset_after_fork()
+
+# gunicorn post_worker_init 훅(STARTUP_WARM=1)에서 호출: 첫 요청이 DB 연결/드라이버 로딩 비용을 내지 않도록
+# 워커가 요청을 받기 전에 DB 연결을 하나 열어 둡니다. (실패해도 워커는 시작 — 첫 요청에서 다시 연결)
+def warm_up():
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except Exception as e:
+        app.logger.warning("warm-up failed: %s", e)
+
+# --- 관리용 CLI 명령 ---
+# 사용법: flask --app app migrate [--status] [--fake] [--target 6]
+# migrations/*.sql 중 적용되지 않은 파일을 번호 순서대로 적용합니다. (migrate.py 참고)
+@app.cli.command('migrate')
+@click.option('--status', 'show_status', is_flag=True, help='적용 여부만 출력')
+@click.option('--fake', is_flag=True, help='SQL을 실행하지 않고 적용된 것으로만 기록 (이미 수동 적용한 DB)')
+@click.option('--target', type=int, default=None, help='이 번호까지만 적용')
+def migrate_command(show_status, fake, target):
+    if show_status:
+        for item in migration_status(engine):
+            state = item.applied_at.isoformat() if item.applied_at else '미적용'
+            changed = ' (적용 후 파일이 변경됨)' if item.checksum_changed else ''
+            click.echo(f"{item.version:04d}_{item.name}: {state}{changed}")
+        return
+    applied = apply_migrations(engine, target=target, fake=fake, log=click.echo)
+    click.echo(f"마이그레이션 완료: {len(applied)}개 적용")
+
+# 사용법: flask --app app jobs-worker [--once]
+# 작업 대기열(jobs 테이블)의 Storage 삭제와 주기적인 고아 객체 정리, (FEED_ENABLED=1이면) 홈 피드 주기 갱신을 실행합니다.
+# (jobs.py 참고)
+# 여러 프로세스를 동시에 실행해도 되며, SIGTERM/SIGINT를 받으면 처리 중인 묶음을 끝내고 종료합니다.
+@app.cli.command('jobs-worker')
+@click.option('--once', is_flag=True, help='준비된 작업을 한 묶음만 처리하고 종료')
+def jobs_worker(once):
+    sweeper = create_orphan_sweeper(engine, storage, os.environ, is_variant_path=is_variant_path, log=click.echo)
+    worker = create_job_worker(job_queue, storage, sweeper, os.environ, feed=home_feed, log=click.echo)
+    if once:
+        click.echo(f"작업 {worker.run_once()}개 처리")
+        return
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    click.echo("작업 워커 시작")
+    worker.run()
+
+# 사용법: flask --app app sweep-orphans [--bucket avatars]
+# 고아 객체 정리를 바로 실행합니다. (삭제 자체는 jobs-worker가 storage.remove 작업으로 처리)
+@app.cli.command('sweep-orphans')
+@click.option('--bucket', type=click.Choice(ORPHAN_BUCKETS), multiple=True, help='생략하면 모든 버킷')
+def sweep_orphans(bucket):
+    sweeper = create_orphan_sweeper(engine, storage, os.environ, is_variant_path=is_variant_path, log=click.echo)
+    for name in bucket or ORPHAN_BUCKETS:
+        sweeper.sweep(name)
+
+# 사용법: flask --app app rebuild-feed
+# 홈 피드(home_feed)를 ranking별 상위 게시글로 다시 채우고 게시글 수를 맞춥니다. (feed.py 참고)
+# 마이그레이션 직후 처음 채울 때, FEED_SIZE/FEED_HOT을 바꿨을 때 실행합니다. (FEED_ENABLED와 관계없이 실행)
+@app.cli.command('rebuild-feed')
+def rebuild_feed():
+    feed = home_feed or create_home_feed(engine, dict(os.environ, FEED_ENABLED='1'),
+                                         on_refresh=lambda tags: invalidate_cached(*tags))
+    feed.refresh()
+    click.echo(f"홈 피드 갱신 완료: {', '.join(ranking.name for ranking in feed.rankings)} "
+               f"(각 최대 {feed.size}개, {feed.last_refresh_ms}ms)")
+
+# 사용법: flask --app app reconcile-like-counts [--batch-size 10000]
+# posts.like_count가 likes 테이블과 어긋난 행(예: 사용자 삭제로 인한 CASCADE)을 id 구간별로 일괄 보정합니다.
+@app.cli.command('reconcile-like-counts')
+@click.option('--batch-size', default=10000, show_default=True, help='한 번에 보정할 게시글 id 구간 크기')
+def reconcile_like_counts(batch_size):
+    with engine.connect() as conn:
+        max_id = conn.execute(text("SELECT COALESCE(MAX(id), 0) FROM posts")).scalar()
+
+    fixed = 0
+    for start in range(0, max_id + 1, batch_size):
+        with engine.connect() as conn:
+            result = conn.execute(text("""
+                UPDATE posts AS p SET like_count = actual.cnt
+                FROM (
+                    SELECT p2.id, COUNT(l.post_id) AS cnt
+                    FROM posts AS p2
+                    LEFT JOIN likes AS l ON l.post_id = p2.id
+                    WHERE p2.id >= :start AND p2.id < :end
+                    GROUP BY p2.id
+                ) AS actual
+                WHERE p.id = actual.id AND p.like_count <> actual.cnt
+            """), {"start": start, "end": start + batch_size})
+            conn.commit()
+            fixed += result.rowcount
+    click.echo(f"like_count 보정 완료: {fixed}개 게시글 수정")
+
+# 사용법: flask --app app rebuild-search-index [--batch-size 1000] [--only-missing]
+# posts.search_tsv를 search.build_document로 다시 계산합니다. (마이그레이션 직후 백필 / 토크나이저 변경 시)
+@app.cli.command('rebuild-search-index')
+@click.option('--batch-size', default=1000, show_default=True, help='한 번에 색인할 게시글 수')
+@click.option('--only-missing', is_flag=True, help='search_tsv가 비어 있는 게시글만 색인')
+def rebuild_search_index(batch_size, only_missing):
+    last_id = 0
+    indexed = 0
+    missing_condition = "AND search_tsv IS NULL" if only_missing else ""
+    while True:
+        with engine.connect() as conn:
+            rows = conn.execute(text(f"""
+                SELECT id, title, content FROM posts
+                WHERE id > :last_id {missing_condition}
+                ORDER BY id LIMIT :limit
+            """), {"last_id": last_id, "limit": batch_size}).fetchall()
+            if not rows:
+                break
+            conn.execute(text("UPDATE posts SET search_tsv = CAST(:doc AS tsvector) WHERE id = :id"), [
+                {"id": row.id, "doc": search.build_document(row.title, row.content)} for row in rows
+            ])
+            conn.commit()
+        last_id = rows[-1].id
+        indexed += len(rows)
+    click.echo(f"검색 색인 완료: {indexed}개 게시글")
+
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=4000)
\ No newline at end of file
@@ -0,0 +1,46 @@
+# --- JWT 검증 결과 캐시 ---
+# SPA는 페이지마다 인증 요청을 여러 번 보내므로 같은 토큰을 반복해서 검증하게 됩니다.
+# 검증에 성공한 토큰의 payload를 토큰 digest 기준으로 LRU 캐시에 보관하고,
+# 각 항목은 토큰의 exp 시각에 맞춰 만료되도록 합니다. (검증에 실패한 토큰은 캐시하지 않음)
+import hashlib
+import threading
+import time
+
+import jwt
+
+from cache import MemoryCache
+
+
+class TokenVerifier:
+    def __init__(self, secret_key, cache_size=10000, algorithms=("HS256",), default_ttl=300):
+        self.secret_key = secret_key
+        self.algorithms = list(algorithms)
+        self.default_ttl = default_ttl  # exp가 없는 토큰의 캐시 유지 시간(초)
+        self.cache = MemoryCache(max_entries=cache_size, ttl=default_ttl) if cache_size > 0 else None
+        self._lock = threading.Lock()
+        self.decodes = 0
+
+    # 토큰을 검증하고 payload를 반환합니다. 유효하지 않으면 jwt.InvalidTokenError 계열 예외.
+    def verify(self, token):
+        key = hashlib.sha256(token.encode('utf-8')).digest() if self.cache else None
+        if key is not None:
+            payload = self.cache.get(key)
+            if payload is not None:
+                return payload
+
+        payload = jwt.decode(token, self.secret_key, algorithms=self.algorithms)
+        with self._lock:
+            self.decodes += 1
+
+        if key is not None:
+            exp = payload.get('exp')
+            ttl = exp - time.time() if exp is not None else self.default_ttl
+            if ttl > 0:
+                self.cache.set(key, payload, ttl=ttl)
+        return payload
+
+    def stats(self):
+        stats = self.cache.stats() if self.cache else {'backend': 'none'}
+        with self._lock:
+            stats['decodes'] = self.decodes
+        return stats
@@ -0,0 +1,58 @@
+# 토큰 검증 마이크로벤치마크: 요청마다 jwt.decode를 하는 경우와 TokenVerifier 캐시를 쓰는 경우 비교
+#
+# 사용법 (backend 디렉터리에서):
+#   python bench/bench_auth.py --iterations 100000
+#
+# 결과(JSON): 방식별 1회당 평균 소요 시간(µs)
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import jwt
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from auth import TokenVerifier  # noqa: E402
+
+SECRET = "bench-secret"
+
+
+def measure(fn, iterations):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return round((time.perf_counter() - started) / iterations * 1_000_000, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JWT 검증 캐시 마이크로벤치마크")
+    parser.add_argument('--iterations', type=int, default=100000)
+    parser.add_argument('--users', type=int, default=1000, help='서로 다른 토큰 수 (캐시 미스 측정용)')
+    args = parser.parse_args()
+
+    exp = datetime.now(timezone.utc) + timedelta(hours=24)
+    token = jwt.encode({'user_id': 1, 'exp': exp}, SECRET, algorithm="HS256")
+    tokens = [jwt.encode({'user_id': i, 'exp': exp}, SECRET, algorithm="HS256") for i in range(args.users)]
+
+    warm = TokenVerifier(SECRET)
+    warm.verify(token)
+    cold = TokenVerifier(SECRET, cache_size=0)
+    rotating = TokenVerifier(SECRET, cache_size=args.users // 2)  # 캐시보다 토큰이 많아 계속 축출되는 경우
+    counter = iter(range(10 ** 12))
+
+    results = {
+        'jwt_decode_us': measure(lambda: jwt.decode(token, SECRET, algorithms=["HS256"]), args.iterations),
+        'verifier_uncached_us': measure(lambda: cold.verify(token), args.iterations),
+        'verifier_cache_hit_us': measure(lambda: warm.verify(token), args.iterations),
+        'verifier_cache_thrash_us': measure(lambda: rotating.verify(tokens[next(counter) % args.users]),
+                                            args.iterations),
+    }
+    results['speedup_on_hit'] = round(results['jwt_decode_us'] / results['verifier_cache_hit_us'], 2)
+    print(json.dumps({'iterations': args.iterations, 'results': results,
+                      'warm_cache_stats': warm.stats()}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+# 좋아요 처리량 벤치마크: 여러 사용자가 같은 인기 글에 좋아요/취소를 반복할 때 초당 처리 건수를 측정합니다.
+# 즉시 반영(기본)과 쓰기 지연 모드를 같은 조건에서 비교합니다.
+#
+# 사용법 (bench/seed.py로 만든 DB와 매니페스트 필요):
+#   LIKE_WRITE_BEHIND=0 gunicorn -c gunicorn.conf.py app:app
+#   python bench/bench_likes.py --base-url http://localhost:4000 --manifest bench/results/manifest.json --label direct
+#   LIKE_WRITE_BEHIND=1 gunicorn -c gunicorn.conf.py app:app
+#   python bench/bench_likes.py --base-url http://localhost:4000 --manifest bench/results/manifest.json --label write-behind
+#
+# 클라이언트마다 다른 사용자로 로그인해 --posts개의 바이럴 글을 돌아가며 좋아요 → 취소합니다.
+# 결과(JSON): 초당 좋아요/취소 요청 수, p50/p99, 상태 코드별 개수 (409/404가 있으면 상태 불일치)
+# 쓰기 지연 모드는 마지막 반영이 끝난 뒤 like_count와 likes 행 수가 일치하는지
+# `flask --app app reconcile-like-counts`(수정 0건이어야 함)로 확인할 수 있습니다.
+import argparse
+import json
+import statistics
+import threading
+import time
+from collections import Counter
+
+from traffic import Client, Recorder
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * q))], 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="좋아요 처리량 벤치마크")
+    parser.add_argument('--base-url', default='http://localhost:4000')
+    parser.add_argument('--manifest', default='bench/results/manifest.json')
+    parser.add_argument('--label', default='direct', help='결과에 표시할 모드 이름')
+    parser.add_argument('--concurrency', type=int, default=32, help='동시 클라이언트(= 사용자) 수')
+    parser.add_argument('--posts', type=int, default=3, help='좋아요를 누를 바이럴 글 수')
+    parser.add_argument('--duration', type=float, default=20)
+    args = parser.parse_args()
+
+    with open(args.manifest, encoding='utf-8') as f:
+        manifest = json.load(f)
+    post_ids = manifest['viral_post_ids'][:args.posts]
+    # 시드 데이터에서 이미 눌러 둔 좋아요가 있으면 첫 요청이 409가 되고, 그 뒤로는 취소부터 시작합니다.
+    user_ids = manifest['active_author_ids'][:args.concurrency]
+
+    setup = Recorder()
+    clients = []
+    for user_id in user_ids:
+        data = Client(args.base_url, setup).call("POST /api/login", "/api/login", json_body={
+            'email': f"user{user_id}@bench.local", 'password': manifest['password']})
+        if data:
+            clients.append(Client(args.base_url, Recorder(), data['token'], data['user_id']))
+
+    deadline = time.monotonic() + args.duration
+    lock = threading.Lock()
+    latencies = []
+    statuses = Counter()
+
+    def worker(client):
+        liked = {post_id: False for post_id in post_ids}
+        i = 0
+        while time.monotonic() < deadline:
+            post_id = post_ids[i % len(post_ids)]
+            i += 1
+            method = "DELETE" if liked[post_id] else "POST"
+            started = time.perf_counter()
+            client.call(f"{method} /api/posts/<int:post_id>/like", f"/api/posts/{post_id}/like",
+                        json_body={} if method == "POST" else None)
+            elapsed = (time.perf_counter() - started) * 1000
+            status = client.last_status
+            # 409(이미 좋아요) / 404(좋아요 없음)는 상태를 맞추고 계속 진행
+            if status in (201, 409):
+                liked[post_id] = True
+            elif status in (200, 404):
+                liked[post_id] = False
+            with lock:
+                statuses[status] += 1
+                if status in (200, 201):
+                    latencies.append(elapsed)
+
+    threads = [threading.Thread(target=worker, args=(client,)) for client in clients]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    print(json.dumps({
+        'label': args.label,
+        'clients': len(clients),
+        'posts': post_ids,
+        'duration_s': round(elapsed, 2),
+        'likes_per_sec': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(statistics.median(latencies), 2) if latencies else None,
+        'p99_ms': percentile(latencies, 0.99) if latencies else None,
+        'statuses': dict(statuses),
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+# 로그인 처리량 벤치마크: 동시 로그인 부하를 주면서 다른 API의 지연 시간을 함께 측정합니다.
+#
+# 사용법 (서버를 먼저 실행한 뒤):
+#   python bench/bench_login.py --base-url http://localhost:4000 \
+#       --email bench@example.com --password secret --concurrency 16 --duration 30
+#
+# 결과(JSON): 초당 로그인 수, 로그인 p50/p99, 상태 코드별 개수(503 = 비밀번호 풀 대기열 초과),
+#             그리고 --probe-path(기본 /api/posts)의 p50/p99
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+
+
+def request(url, body=None):
+    data = json.dumps(body).encode('utf-8') if body is not None else None
+    req = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json'})
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=30) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except OSError:
+        status = 0
+    return status, (time.perf_counter() - started) * 1000
+
+
+def percentile(samples, q):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * q))], 2)
+
+
+def summarize(samples):
+    return {
+        'count': len(samples),
+        'p50_ms': round(statistics.median(samples), 2) if samples else None,
+        'p99_ms': percentile(samples, 0.99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="동시 로그인 부하 벤치마크")
+    parser.add_argument('--base-url', default='http://localhost:4000')
+    parser.add_argument('--email', required=True)
+    parser.add_argument('--password', required=True)
+    parser.add_argument('--concurrency', type=int, default=8, help='동시에 로그인하는 클라이언트 수')
+    parser.add_argument('--duration', type=float, default=20, help='측정 시간(초)')
+    parser.add_argument('--probe-path', default='/api/posts', help='로그인 부하 중 지연을 측정할 API')
+    parser.add_argument('--probe-interval', type=float, default=0.05)
+    args = parser.parse_args()
+
+    deadline = time.monotonic() + args.duration
+    lock = threading.Lock()
+    login_latencies, probe_latencies = [], []
+    statuses = Counter()
+
+    def login_worker():
+        while time.monotonic() < deadline:
+            status, elapsed = request(f"{args.base_url}/api/login",
+                                      {'email': args.email, 'password': args.password})
+            with lock:
+                statuses[status] += 1
+                if status == 200:
+                    login_latencies.append(elapsed)
+
+    def probe_worker():
+        while time.monotonic() < deadline:
+            status, elapsed = request(f"{args.base_url}{args.probe_path}")
+            if status == 200:
+                with lock:
+                    probe_latencies.append(elapsed)
+            time.sleep(args.probe_interval)
+
+    threads = [threading.Thread(target=login_worker) for _ in range(args.concurrency)]
+    threads.append(threading.Thread(target=probe_worker))
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    print(json.dumps({
+        'concurrency': args.concurrency,
+        'duration_s': round(elapsed, 2),
+        'logins_per_sec': round(len(login_latencies) / elapsed, 2),
+        'login': summarize(login_latencies),
+        'login_statuses': {str(k): v for k, v in sorted(statuses.items())},
+        'probe_path': args.probe_path,
+        'probe': summarize(probe_latencies),
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
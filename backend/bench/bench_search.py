@@ -0,0 +1,147 @@
+# 게시글 검색 벤치마크: 기존 ILIKE 검색 vs search_tsv n-gram 전문 검색
+#
+# 사용법 (backend 디렉터리에서):
+#   DATABASE_URL=postgresql://... python bench/bench_search.py --rows 300000
+#
+# 실제 테이블을 건드리지 않도록 bench_search 스키마에 posts 테이블을 만들고
+# 한국어/영어가 섞인 합성 게시글을 채운 뒤, 같은 검색어로 두 방식을 번갈아 측정합니다.
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import search  # noqa: E402
+
+KOREAN_WORDS = [
+    "게시글", "댓글", "좋아요", "프로필", "사진", "여행", "맛집", "개발", "공부", "오늘",
+    "날씨", "카페", "주말", "영화", "음악", "운동", "회사", "학교", "친구", "가족",
+    "데이터베이스", "서버", "프론트엔드", "백엔드", "배포", "성능", "최적화", "검색", "인덱스", "쿼리",
+]
+KOREAN_SUFFIXES = ["", "을", "를", "이", "가", "은", "는", "에서", "으로", "입니다", "했어요"]
+ENGLISH_WORDS = [
+    "flask", "react", "postgres", "python", "vite", "neon", "supabase", "docker", "index", "query",
+    "cache", "deploy", "latency", "throughput", "cursor", "search", "review", "weekend", "coffee", "travel",
+]
+QUERIES = ["게시글", "데이터베이스", "최적화", "맛집 여행", "flask", "postgres cursor", "없는검색어"]
+
+
+def random_sentence(rng, words):
+    parts = []
+    for _ in range(words):
+        if rng.random() < 0.7:
+            parts.append(rng.choice(KOREAN_WORDS) + rng.choice(KOREAN_SUFFIXES))
+        else:
+            parts.append(rng.choice(ENGLISH_WORDS))
+    return " ".join(parts)
+
+
+def seed(engine, rows, batch_size, rng):
+    with engine.begin() as conn:
+        conn.execute(text("DROP SCHEMA IF EXISTS bench_search CASCADE"))
+        conn.execute(text("CREATE SCHEMA bench_search"))
+        conn.execute(text("""
+            CREATE TABLE bench_search.posts (
+                id bigserial PRIMARY KEY,
+                created_at timestamptz NOT NULL,
+                title text NOT NULL,
+                content text NOT NULL,
+                search_tsv tsvector
+            )
+        """))
+    base = datetime.now() - timedelta(days=365)
+    for start in range(0, rows, batch_size):
+        batch = []
+        for i in range(start, min(start + batch_size, rows)):
+            title = random_sentence(rng, rng.randint(3, 8))
+            content = "<p>" + random_sentence(rng, rng.randint(30, 300)) + "</p>"
+            batch.append({
+                "created_at": base + timedelta(seconds=i * 60),
+                "title": title,
+                "content": content,
+                "doc": search.build_document(title, content),
+            })
+        with engine.begin() as conn:
+            conn.execute(text("""
+                INSERT INTO bench_search.posts (created_at, title, content, search_tsv)
+                VALUES (:created_at, :title, :content, CAST(:doc AS tsvector))
+            """), batch)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE INDEX ON bench_search.posts USING GIN (search_tsv)"))
+        conn.execute(text("CREATE INDEX ON bench_search.posts (created_at DESC, id DESC)"))
+        conn.execute(text("ANALYZE bench_search.posts"))
+
+
+# app.get_posts와 같은 형태(LIMIT 6 = 한 페이지 + 다음 페이지 확인용)로 두 방식의 쿼리를 만듭니다.
+def build_queries(term):
+    ilike = (text("""
+        SELECT id FROM bench_search.posts AS p
+        WHERE p.title ILIKE :pattern OR p.content ILIKE :pattern
+        ORDER BY p.created_at DESC, p.id DESC LIMIT 6
+    """), {"pattern": f"%{term}%"})
+    fts = (text("""
+        SELECT id FROM bench_search.posts AS p
+        WHERE p.search_tsv @@ CAST(:q AS tsquery)
+        ORDER BY ts_rank_cd(p.search_tsv, CAST(:q AS tsquery))::float8 DESC, p.id DESC LIMIT 6
+    """), {"q": search.build_query(term)})
+    return {"ilike": ilike, "fts": fts}
+
+
+def run(engine, repeats):
+    results = []
+    with engine.connect() as conn:
+        for term in QUERIES:
+            timings = {"ilike": [], "fts": []}
+            for _ in range(repeats):
+                for mode, (query, params) in build_queries(term).items():
+                    started = time.perf_counter()
+                    conn.execute(query, params).fetchall()
+                    timings[mode].append((time.perf_counter() - started) * 1000)
+            for mode, samples in timings.items():
+                samples.sort()
+                results.append({
+                    "query": term,
+                    "mode": mode,
+                    "p50_ms": round(statistics.median(samples), 3),
+                    "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+                })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ILIKE vs n-gram 전문 검색 벤치마크")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--batch-size", type=int, default=2000)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-seed", action="store_true", help="이전에 만든 bench_search 데이터를 재사용")
+    parser.add_argument("--keep", action="store_true", help="측정 후 bench_search 스키마를 남겨둠")
+    args = parser.parse_args()
+
+    load_dotenv()
+    db_url = os.environ.get("BENCH_DATABASE_URL") or os.environ.get("DATABASE_URL")
+    if db_url and db_url.startswith("postgres://"):
+        db_url = db_url.replace("postgres://", "postgresql://", 1)
+    engine = create_engine(db_url)
+
+    if not args.skip_seed:
+        started = time.perf_counter()
+        seed(engine, args.rows, args.batch_size, random.Random(args.seed))
+        print(f"seeded {args.rows} rows in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+    print(json.dumps({"rows": args.rows, "results": run(engine, args.repeats)}, ensure_ascii=False, indent=2))
+
+    if not args.keep:
+        with engine.begin() as conn:
+            conn.execute(text("DROP SCHEMA bench_search CASCADE"))
+
+
+if __name__ == "__main__":
+    main()
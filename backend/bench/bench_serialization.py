@@ -0,0 +1,120 @@
+# 응답 직렬화 벤치마크: 기존 방식(row._asdict() + pop/중첩 dict + Flask 기본 JSON)과
+# serialization.py(컬럼별 변환 함수 + orjson)의 직렬화 시간을 1k/10k 행 응답으로 비교합니다.
+#
+# 사용법 (backend 디렉터리에서, DB 불필요 — SQLite 메모리 DB로 실제 SQLAlchemy Row를 만듭니다):
+#   python bench/bench_serialization.py --rows 1000 10000 --repeat 20
+#
+# 결과(JSON): 형태(comments: users 중첩, posts: 평면)와 행 수별 기존/신규 median ms, 배속, 응답 크기
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import DateTime, create_engine, text
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import serialization  # noqa: E402
+
+COMMENT_USERS = (('users', ('nickname', 'avatar_url', 'avatar_thumb_url')),)
+
+
+def build_rows(engine, count):
+    with engine.connect() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS bench_rows"))
+        conn.execute(text("""
+            CREATE TABLE bench_rows (
+                id INTEGER, created_at TEXT, title TEXT, content TEXT, excerpt TEXT,
+                user_id INTEGER, post_id INTEGER, like_count INTEGER,
+                nickname TEXT, avatar_url TEXT, avatar_thumb_url TEXT
+            )
+        """))
+        base = datetime(2024, 1, 1)
+        conn.execute(text("""
+            INSERT INTO bench_rows VALUES (:id, :created_at, :title, :content, :excerpt,
+                                           :user_id, :post_id, :like_count, :nickname, :avatar_url, :avatar_thumb_url)
+        """), [{
+            'id': i, 'created_at': (base + timedelta(seconds=i)).isoformat(sep=' '),
+            'title': f"게시글 제목 {i}", 'content': "댓글 내용입니다. " * 8, 'excerpt': "본문 미리보기 " * 6,
+            'user_id': i % 97, 'post_id': i % 13, 'like_count': i % 50, 'nickname': f"사용자{i % 97}",
+            'avatar_url': f"https://example.supabase.co/storage/v1/object/public/avatars/{i % 97}/a.png",
+            'avatar_thumb_url': f"https://example.supabase.co/storage/v1/object/public/avatars/{i % 97}/a_thumb.webp",
+        } for i in range(count)])
+        comments = conn.execute(text("""
+            SELECT id, created_at, content, user_id, post_id, nickname, avatar_url, avatar_thumb_url
+            FROM bench_rows ORDER BY id
+        """).columns(created_at=DateTime)).fetchall()
+        posts = conn.execute(text("""
+            SELECT id, created_at, title, excerpt, user_id, like_count, nickname AS author_nickname
+            FROM bench_rows ORDER BY id
+        """).columns(created_at=DateTime)).fetchall()
+    return comments, posts
+
+
+# 기존 app.py의 nest_comment_users
+def legacy_comment(row):
+    comment = row._asdict()
+    comment['users'] = {
+        'nickname': comment.pop('nickname'),
+        'avatar_url': comment.pop('avatar_url'),
+        'avatar_thumb_url': comment.pop('avatar_thumb_url')
+    }
+    return comment
+
+
+def measure(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(samples), 3), len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="응답 직렬화 벤치마크")
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    legacy_json = DefaultJSONProvider(Flask(__name__))
+    engine = create_engine("sqlite://")
+    results = []
+    for count in args.rows:
+        comments, posts = build_rows(engine, count)
+        cases = {
+            'comments': (
+                lambda: legacy_json.dumps([legacy_comment(row) for row in comments]).encode('utf-8'),
+                lambda: serialization.dumps(serialization.serialize_rows(comments, nested=COMMENT_USERS)),
+            ),
+            'posts': (
+                lambda: legacy_json.dumps({'posts': [row._asdict() for row in posts]}).encode('utf-8'),
+                lambda: serialization.dumps({'posts': serialization.serialize_rows(posts)}),
+            ),
+        }
+        for shape, (legacy_fn, fast_fn) in cases.items():
+            legacy_ms, legacy_bytes = measure(legacy_fn, args.repeat)
+            fast_ms, fast_bytes = measure(fast_fn, args.repeat)
+            results.append({
+                'shape': shape,
+                'rows': count,
+                'legacy_ms': legacy_ms,
+                'fast_ms': fast_ms,
+                'speedup': round(legacy_ms / fast_ms, 2) if fast_ms else None,
+                'legacy_bytes': legacy_bytes,
+                'fast_bytes': fast_bytes,
+            })
+
+    print(json.dumps({
+        'encoder': 'orjson' if serialization.orjson is not None else 'json',
+        'repeat': args.repeat,
+        'results': results,
+    }, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
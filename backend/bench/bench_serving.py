@@ -0,0 +1,161 @@
+# 서빙 모드 비교 부하 테스트: sync(동기 워커)와 async(gevent 워커)를 같은 워커 수로 띄워 각각 측정합니다.
+#
+# 사용법 (모드마다 서버를 띄운 뒤 같은 옵션으로 실행):
+#   WEB_CONCURRENCY=2 SERVING_MODE=sync  gunicorn -c gunicorn.conf.py app:app
+#   WEB_CONCURRENCY=2 SERVING_MODE=async gunicorn -c gunicorn.conf.py app:app
+#   python bench/bench_serving.py --base-url http://localhost:4000 --label sync \
+#       --concurrency 64 --duration 30 --server-pid <gunicorn master pid> --post-id 1
+#
+# 업로드 경로도 섞으려면 bench/fake_storage.py를 SUPABASE_URL로 지정하고 --token(로그인 토큰)과 --upload-ratio를 줍니다.
+#
+# 결과(JSON): 초당 요청 수, 경로별/전체 p50/p95/p99, 상태 코드별 개수,
+#             그리고 --server-pid를 주면 master + 워커 프로세스의 RSS 합계(MB, 측정 시작/종료 시점)
+import argparse
+import json
+import os
+import random
+import statistics
+import struct
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+import zlib
+from collections import Counter, defaultdict
+
+
+# 1x1 PNG (업로드 경로 측정용)
+def _png_chunk(kind, data):
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+
+TINY_PNG = (b'\x89PNG\r\n\x1a\n'
+            + _png_chunk(b'IHDR', struct.pack('>IIBBBBB', 1, 1, 8, 2, 0, 0, 0))
+            + _png_chunk(b'IDAT', zlib.compress(b'\x00\xff\xff\xff'))
+            + _png_chunk(b'IEND', b''))
+
+
+def request(url, data=None, headers=None, method=None):
+    req = urllib.request.Request(url, data=data, headers=headers or {}, method=method)
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=60) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except OSError:
+        status = 0
+    return status, (time.perf_counter() - started) * 1000
+
+
+def multipart_image(field):
+    boundary = uuid.uuid4().hex
+    body = (f"--{boundary}\r\nContent-Disposition: form-data; name=\"{field}\"; filename=\"bench.png\"\r\n"
+            f"Content-Type: image/png\r\n\r\n").encode('utf-8') + TINY_PNG + f"\r\n--{boundary}--\r\n".encode('utf-8')
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+def percentile(samples, q):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * q))], 2)
+
+
+def summarize(samples):
+    return {
+        'count': len(samples),
+        'p50_ms': round(statistics.median(samples), 2) if samples else None,
+        'p95_ms': percentile(samples, 0.95),
+        'p99_ms': percentile(samples, 0.99),
+    }
+
+
+# master와 자식(워커) 프로세스의 RSS 합계(MB) — Linux /proc 기준
+def server_rss_mb(pid):
+    pids = [pid]
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            pids += [int(child) for child in f.read().split()]
+    except OSError:
+        return None
+    total_kb = 0
+    for p in pids:
+        try:
+            with open(f"/proc/{p}/status") as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total_kb += int(line.split()[1])
+        except OSError:
+            pass
+    return round(total_kb / 1024, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="sync/async 서빙 모드 부하 테스트")
+    parser.add_argument('--base-url', default='http://localhost:4000')
+    parser.add_argument('--label', default=os.environ.get('SERVING_MODE', 'sync'), help='결과에 표시할 모드 이름')
+    parser.add_argument('--concurrency', type=int, default=32, help='동시에 요청을 보내는 클라이언트 수')
+    parser.add_argument('--duration', type=float, default=20, help='측정 시간(초)')
+    parser.add_argument('--post-id', type=int, default=1, help='상세/댓글 경로에 사용할 게시글 id')
+    parser.add_argument('--token', help='로그인 토큰 (업로드 경로 측정 시 필요)')
+    parser.add_argument('--upload-ratio', type=float, default=0.0, help='전체 요청 중 업로드 요청 비율 (0~1)')
+    parser.add_argument('--server-pid', type=int, help='gunicorn master pid (메모리 측정용)')
+    args = parser.parse_args()
+
+    read_paths = [
+        '/api/posts',
+        '/api/posts?page=2',
+        f'/api/posts/{args.post_id}',
+        f'/api/posts/{args.post_id}/page',
+        f'/api/posts/{args.post_id}/comments?cursor=&limit=20',
+    ]
+    deadline = time.monotonic() + args.duration
+    lock = threading.Lock()
+    latencies = defaultdict(list)
+    statuses = Counter()
+
+    def worker():
+        rng = random.Random()
+        while time.monotonic() < deadline:
+            if args.token and rng.random() < args.upload_ratio:
+                name = '/api/posts/image-upload'
+                body, content_type = multipart_image('image')
+                status, elapsed = request(f"{args.base_url}{name}", body, {
+                    'Content-Type': content_type, 'Authorization': f"Bearer {args.token}"
+                }, method='POST')
+            else:
+                name = rng.choice(read_paths)
+                status, elapsed = request(f"{args.base_url}{name}")
+            with lock:
+                statuses[status] += 1
+                if status in (200, 201):
+                    latencies[name].append(elapsed)
+
+    rss_before = server_rss_mb(args.server_pid) if args.server_pid else None
+    threads = [threading.Thread(target=worker) for _ in range(args.concurrency)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+    rss_after = server_rss_mb(args.server_pid) if args.server_pid else None
+
+    all_latencies = [v for samples in latencies.values() for v in samples]
+    print(json.dumps({
+        'label': args.label,
+        'concurrency': args.concurrency,
+        'duration_s': round(elapsed, 2),
+        'requests_per_sec': round(len(all_latencies) / elapsed, 2),
+        'overall': summarize(all_latencies),
+        'paths': {name: summarize(samples) for name, samples in sorted(latencies.items())},
+        'statuses': {str(k): v for k, v in sorted(statuses.items())},
+        'server_rss_mb': {'before': rss_before, 'after': rss_after},
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
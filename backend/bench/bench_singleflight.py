@@ -0,0 +1,117 @@
+# 동시 조회 합치기(single-flight) 부하 테스트: 한 게시글을 읽는 동시 클라이언트 수를 늘려 가며
+# 서버 처리량과 DB에서 실제로 실행된 트랜잭션 수(초당)를 함께 측정합니다.
+#
+# 사용법 (서버와 같은 DB를 가리키도록 BENCH_DATABASE_URL/DATABASE_URL 설정):
+#   SINGLEFLIGHT_ENABLED=1 gunicorn -c gunicorn.conf.py app:app   (SERVING_MODE=async 권장: 워커당 동시 요청 처리)
+#   python bench/bench_singleflight.py --base-url http://localhost:4000 --post-id 1 --levels 1,8,32,128
+#   (비교: SINGLEFLIGHT_ENABLED=0으로 서버를 다시 띄워 같은 명령 실행)
+#
+# DB 쿼리 수는 pg_stat_database의 xact_commit + xact_rollback 증가량으로 셉니다.
+# (요청마다 연결 블록 하나 = 트랜잭션 하나. 다른 부하가 없는 벤치마크 DB에서 실행하세요.)
+# single-flight가 켜져 있으면 동시 클라이언트가 늘어도 db_tps는 거의 일정해야 합니다.
+#
+# 기본 경로는 응답 캐시를 거치지 않는 댓글 cursor 조회와 상세 페이지 통합 API입니다.
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from db import normalize_db_url  # noqa: E402
+
+
+def request(url):
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=30) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except OSError:
+        status = 0
+    return status, (time.perf_counter() - started) * 1000
+
+
+def db_transactions(engine):
+    with engine.connect() as conn:
+        return conn.execute(text(
+            "SELECT xact_commit + xact_rollback FROM pg_stat_database WHERE datname = current_database()"
+        )).scalar()
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * q))], 2)
+
+
+def run_level(base_url, paths, concurrency, duration, engine):
+    deadline = time.monotonic() + duration
+    lock = threading.Lock()
+    latencies = []
+    statuses = Counter()
+
+    def worker(index):
+        i = index
+        while time.monotonic() < deadline:
+            status, elapsed = request(base_url + paths[i % len(paths)])
+            i += 1
+            with lock:
+                statuses[status] += 1
+                if status == 200:
+                    latencies.append(elapsed)
+
+    before = db_transactions(engine)
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(concurrency)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+    time.sleep(1)  # 통계는 트랜잭션 종료 후 잠시 뒤에 반영됨
+    # 측정용 조회 자체(before 1개)는 제외
+    db_count = db_transactions(engine) - before - 1
+
+    return {
+        'concurrency': concurrency,
+        'rps': round(sum(statuses.values()) / elapsed, 1),
+        'db_tps': round(db_count / elapsed, 1),
+        'db_per_request': round(db_count / max(sum(statuses.values()), 1), 3),
+        'p50_ms': round(statistics.median(latencies), 2) if latencies else None,
+        'p99_ms': percentile(latencies, 0.99) if latencies else None,
+        'statuses': dict(statuses),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="single-flight 동시 조회 부하 테스트")
+    parser.add_argument('--base-url', default='http://localhost:4000')
+    parser.add_argument('--post-id', type=int, default=1)
+    parser.add_argument('--levels', default='1,8,32,128', help='동시 클라이언트 수 목록')
+    parser.add_argument('--duration', type=float, default=15, help='단계별 측정 시간(초)')
+    parser.add_argument('--paths', help="쉼표로 구분한 경로 ({post_id} 치환)")
+    args = parser.parse_args()
+
+    load_dotenv()
+    engine = create_engine(normalize_db_url(os.environ.get("BENCH_DATABASE_URL") or os.environ.get("DATABASE_URL")))
+    paths = (args.paths.split(',') if args.paths else
+             ['/api/posts/{post_id}/comments?cursor=&limit=20', '/api/posts/{post_id}/page'])
+    paths = [path.format(post_id=args.post_id) for path in paths]
+
+    results = [run_level(args.base_url, paths, int(level), args.duration, engine)
+               for level in args.levels.split(',')]
+    print(json.dumps({'paths': paths, 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+# 시작 시간 벤치마크: app 임포트 시간과 gunicorn 기동부터 첫 응답까지의 시간(time-to-first-response)을 측정합니다.
+# 자동 확장/서버리스 환경의 콜드 스타트 비용을 비교하기 위한 것입니다.
+#
+# 사용법 (backend 디렉터리에서, .env 또는 환경 변수로 DATABASE_URL 등 설정):
+#   python bench/bench_startup.py --runs 5 --modes default,preload,warm,preload+warm
+#
+# - import: 새 파이썬 프로세스에서 `import app`에 걸린 시간 (--runs회 중앙값/최소)
+#   그리고 -X importtime 기준 누적 임포트 시간이 큰 모듈 상위 --top개
+# - 모드별 gunicorn 기동 (PRELOAD_APP / STARTUP_WARM 조합, gunicorn.conf.py 참고):
+#   ttfr_ms = 프로세스 시작부터 --path가 처음 200으로 응답할 때까지, first_ms = 그 첫 요청 자체의 지연,
+#   steady_p50_ms = 이어서 보낸 요청 20개의 중앙값
+import argparse
+import json
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODES = {
+    'default': {},
+    'preload': {'PRELOAD_APP': '1'},
+    'warm': {'STARTUP_WARM': '1'},
+    'preload+warm': {'PRELOAD_APP': '1', 'STARTUP_WARM': '1'},
+}
+
+
+def measure_import(env):
+    code = "import time; t = time.perf_counter(); import app; print(time.perf_counter() - t)"
+    output = subprocess.run([sys.executable, '-c', code], cwd=BACKEND_DIR, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return float(output.strip().splitlines()[-1]) * 1000
+
+
+# -X importtime 출력(stderr)에서 누적 시간(us)이 큰 모듈을 고릅니다.
+def slowest_imports(env, top):
+    stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'], cwd=BACKEND_DIR, env=env,
+                            capture_output=True, text=True, check=True).stderr
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line.split(':', 1)[1].split('|')
+        modules.append((int(cumulative_us), int(self_us), name.strip()))
+    modules.sort(reverse=True)
+    return [{'module': name, 'cumulative_ms': round(cumulative / 1000, 1), 'self_ms': round(own / 1000, 1)}
+            for cumulative, own, name in modules[:top]]
+
+
+def get(url):
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=30) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except OSError:
+        status = 0
+    return status, (time.perf_counter() - started) * 1000
+
+
+def measure_first_response(env, port, path, timeout):
+    url = f"http://127.0.0.1:{port}{path}"
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'app:app'],
+                               cwd=BACKEND_DIR, env=dict(env, PORT=str(port)),
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"gunicorn이 종료되었습니다 (exit {process.returncode})")
+            status, first_ms = get(url)
+            if status == 200:
+                ttfr_ms = (time.perf_counter() - started) * 1000
+                steady = [get(url)[1] for _ in range(20)]
+                return {'ttfr_ms': round(ttfr_ms, 1), 'first_ms': round(first_ms, 1),
+                        'steady_p50_ms': round(statistics.median(steady), 2)}
+            time.sleep(0.01)
+        raise RuntimeError(f"{timeout}초 안에 {url}가 200으로 응답하지 않았습니다.")
+    finally:
+        process.send_signal(signal.SIGTERM)
+        process.wait(timeout=30)
+
+
+def summarize(samples):
+    return {'median': round(statistics.median(samples), 1), 'min': round(min(samples), 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="app 임포트/gunicorn 첫 응답 시간 측정")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--modes', default='default,preload,warm,preload+warm')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn WEB_CONCURRENCY')
+    parser.add_argument('--port', type=int, default=4100)
+    parser.add_argument('--path', default='/api/posts?cursor=&fields=id,title')
+    parser.add_argument('--timeout', type=float, default=60)
+    parser.add_argument('--top', type=int, default=15, help='출력할 느린 임포트 모듈 수')
+    args = parser.parse_args()
+
+    env = dict(os.environ, WEB_CONCURRENCY=str(args.workers))
+    report = {
+        'import_ms': summarize([measure_import(env) for _ in range(args.runs)]),
+        'slowest_imports': slowest_imports(env, args.top),
+        'modes': {},
+    }
+    for mode in args.modes.split(','):
+        runs = [measure_first_response(dict(env, **MODES[mode]), args.port, args.path, args.timeout)
+                for _ in range(args.runs)]
+        report['modes'][mode] = {key: summarize([run[key] for run in runs]) for key in runs[0]}
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
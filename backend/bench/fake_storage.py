@@ -0,0 +1,131 @@
+# 로컬 테스트용 가짜 Supabase Storage 서버
+# 업로드 API(POST /storage/v1/object/<bucket>/<path>)와 다운로드/공개 URL 조회, 목록, 삭제만 흉내 내며 파일은 메모리에 보관합니다.
+#
+# 사용법:
+#   python bench/fake_storage.py --port 5400
+#   SUPABASE_URL=http://localhost:5400 python app.py
+#
+# 상태 확인: GET /_stats → 저장된 객체 수/총 바이트, 버킷별 경로 목록
+import argparse
+import json
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+OBJECT_PREFIX = '/storage/v1/object/'
+PUBLIC_PREFIX = '/storage/v1/object/public/'
+LIST_PREFIX = '/storage/v1/object/list/'
+
+objects = {}  # (bucket, path) -> (content_type, bytes, 업로드 시각 ISO 문자열)
+objects_lock = threading.Lock()
+
+
+class FakeStorageHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive 연결 재사용 확인용
+
+    def _read_body(self):
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().split(b';', 1)[0].strip(), 16)
+                if size == 0:
+                    self.rfile.readline()  # 마지막 빈 줄
+                    return b''.join(chunks)
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()  # 청크 끝의 CRLF
+        return self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+    def _send_json(self, status, data):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    # 목록 조회: prefix 바로 아래의 파일과 폴더(id가 None)를 이름순으로 반환합니다.
+    def _list(self, bucket, options):
+        prefix = options.get('prefix', '')
+        entries = {}
+        with objects_lock:
+            for (b, path), (_, body, created_at) in objects.items():
+                if b != bucket or not path.startswith(prefix):
+                    continue
+                name, slash, _ = path[len(prefix):].partition('/')
+                if slash:
+                    entries.setdefault(name, {'name': name, 'id': None})
+                else:
+                    entries[name] = {'name': name, 'id': path, 'created_at': created_at,
+                                     'metadata': {'size': len(body)}}
+        items = [entries[name] for name in sorted(entries)]
+        offset = options.get('offset', 0)
+        self._send_json(200, items[offset:offset + options.get('limit', 100)])
+
+    def do_POST(self):
+        if self.path.startswith(LIST_PREFIX):
+            return self._list(self.path[len(LIST_PREFIX):].strip('/'), json.loads(self._read_body() or b'{}'))
+        if not self.path.startswith(OBJECT_PREFIX):
+            return self._send_json(404, {'message': 'not found'})
+        bucket, _, path = self.path[len(OBJECT_PREFIX):].partition('/')
+        body = self._read_body()
+        with objects_lock:
+            if (bucket, path) in objects and self.headers.get('x-upsert') != 'true':
+                return self._send_json(409, {'message': 'The resource already exists'})
+            objects[(bucket, path)] = (self.headers.get('Content-Type'), body,
+                                       datetime.now(timezone.utc).isoformat())
+        self._send_json(200, {'Key': f"{bucket}/{path}"})
+
+    def do_GET(self):
+        if self.path == '/_stats':
+            with objects_lock:
+                buckets = {}
+                for bucket, path in objects:
+                    buckets.setdefault(bucket, []).append(path)
+                total = sum(len(body) for _, body, _ in objects.values())
+            return self._send_json(200, {'objects': sum(map(len, buckets.values())),
+                                         'bytes': total, 'buckets': buckets})
+        # 공개 URL과 인증된 다운로드(/object/<bucket>/<path>)를 같은 방식으로 처리합니다.
+        prefix = PUBLIC_PREFIX if self.path.startswith(PUBLIC_PREFIX) else OBJECT_PREFIX
+        if not self.path.startswith(prefix):
+            return self._send_json(404, {'message': 'not found'})
+        bucket, _, path = self.path[len(prefix):].split('?', 1)[0].partition('/')
+        with objects_lock:
+            stored = objects.get((bucket, path))
+        if stored is None:
+            return self._send_json(404, {'message': 'Object not found'})
+        content_type, body, _ = stored
+        self.send_response(200)
+        self.send_header('Content-Type', content_type or 'application/octet-stream')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_DELETE(self):
+        if not self.path.startswith(OBJECT_PREFIX):
+            return self._send_json(404, {'message': 'not found'})
+        bucket = self.path[len(OBJECT_PREFIX):].strip('/')
+        prefixes = json.loads(self._read_body() or b'{}').get('prefixes', [])
+        removed = []
+        with objects_lock:
+            for path in prefixes:
+                if objects.pop((bucket, path), None) is not None:
+                    removed.append({'name': path})
+        self._send_json(200, removed)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="가짜 Supabase Storage 서버")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5400)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), FakeStorageHandler)
+    print(f"fake storage listening on http://{args.host}:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
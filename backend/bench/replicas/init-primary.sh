@@ -0,0 +1,4 @@
+#!/bin/bash
+# 복제본의 pg_basebackup/스트리밍 복제 연결을 허용합니다.
+set -e
+echo "host replication bench all scram-sha-256" >> "$PGDATA/pg_hba.conf"
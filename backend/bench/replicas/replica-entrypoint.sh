@@ -0,0 +1,12 @@
+#!/bin/bash
+# 주 DB가 준비되면 pg_basebackup으로 복제본을 만들고(처음 한 번) hot standby로 실행합니다.
+# REPLICA_APPLY_DELAY(예: 3s)만큼 WAL 재생을 늦춰 복제 지연을 흉내 낼 수 있습니다.
+set -e
+export PGDATA=/var/lib/postgresql/data
+until pg_isready -h primary -U bench -q; do sleep 1; done
+if [ ! -s "$PGDATA/PG_VERSION" ]; then
+    rm -rf "${PGDATA:?}"/*
+    pg_basebackup -h primary -U bench -D "$PGDATA" -R -X stream
+    chmod 700 "$PGDATA"
+fi
+exec postgres -c hot_standby=on -c recovery_min_apply_delay="${REPLICA_APPLY_DELAY:-0}"
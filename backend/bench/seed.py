@@ -0,0 +1,232 @@
+# 벤치마크용 합성 데이터 생성기: users / posts / comments / likes를 COPY로 대량 적재합니다.
+#
+# 사용법 (backend 디렉터리에서, 스키마/마이그레이션이 적용된 벤치마크 전용 DB에):
+#   BENCH_DATABASE_URL=postgresql://... python bench/seed.py --scale 1 --manifest bench/results/manifest.json
+#
+# --scale 1 기준: 사용자 10만, 게시글 50만, 댓글 200만, 좋아요 300만 (중복 제거 전)
+# 분포
+# - 작성자/댓글 작성자: 소수의 활발한 사용자가 대부분을 작성 (Zipf)
+# - 게시글 인기도: Zipf, 상위 --viral-posts개는 댓글/좋아요가 몰리는 "바이럴" 글
+# - 좋아요: 소수의 heavy liker가 대부분의 좋아요를 누름
+# 스키마는 `flask --app app migrate` (또는 bench/run_suite.py)로 먼저 적용합니다.
+# 모든 사용자의 비밀번호는 --password이며, 트래픽 재생기(bench/traffic.py)가 매니페스트로 계정 정보를 읽습니다.
+#
+# 주의: 대상 DB의 users/posts/comments/likes를 비웁니다. DB 이름에 'bench'가 없으면 --force가 필요합니다.
+import argparse
+import io
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import bcrypt
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import search  # noqa: E402
+from db import normalize_db_url  # noqa: E402
+from bench_search import random_sentence  # noqa: E402
+
+BASE_COUNTS = {'users': 100_000, 'posts': 500_000, 'comments': 2_000_000, 'likes': 3_000_000}
+COPY_BATCH_ROWS = 50_000
+HISTORY_DAYS = 730
+
+
+# rank(1부터)에 대해 1/rank^s 가중치의 누적 합 (random.choices의 cum_weights용)
+def zipf_cum_weights(n, s, boost=None):
+    total = 0.0
+    cumulative = []
+    for rank in range(1, n + 1):
+        total += (boost.get(rank, 1.0) if boost else 1.0) / rank ** s
+        cumulative.append(total)
+    return cumulative
+
+
+class SkewedSampler:
+    # ids를 섞은 뒤 앞쪽 순위일수록 자주 뽑히도록 샘플링합니다. (어떤 id가 인기 있는지는 무작위)
+    def __init__(self, rng, ids, s, boost=None):
+        self.rng = rng
+        self.ranked = list(ids)
+        rng.shuffle(self.ranked)
+        self.cum_weights = zipf_cum_weights(len(self.ranked), s, boost)
+
+    def sample(self, k):
+        return self.rng.choices(self.ranked, cum_weights=self.cum_weights, k=k)
+
+    def top(self, k):
+        return self.ranked[:k]
+
+
+def _copy_value(value):
+    if value is None:
+        return r'\N'
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+
+# 행 generator를 COPY_BATCH_ROWS개씩 끊어 COPY FROM STDIN으로 적재합니다.
+def copy_rows(raw_conn, table, columns, rows):
+    total = 0
+    cursor = raw_conn.cursor()
+    while True:
+        batch = list(itertools.islice(rows, COPY_BATCH_ROWS))
+        if not batch:
+            break
+        buffer = io.StringIO()
+        for row in batch:
+            buffer.write('\t'.join(_copy_value(v) for v in row) + '\n')
+        buffer.seek(0)
+        cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffer)
+        raw_conn.commit()
+        total += len(batch)
+    cursor.close()
+    return total
+
+
+def random_time(rng, now, recent_bias=2.0):
+    # 최근일수록 활동이 많도록 (0에 가까운 값이 더 자주 나옴)
+    age = (rng.random() ** recent_bias) * HISTORY_DAYS
+    return now - timedelta(days=age)
+
+
+def seed(engine, scale=1.0, seed_value=42, viral_posts=50, heavy_likers=200, password='bench-password',
+         bcrypt_rounds=10, log=print):
+    rng = random.Random(seed_value)
+    counts = {name: max(int(count * scale), 10) for name, count in BASE_COUNTS.items()}
+    now = datetime.now(timezone.utc)
+    password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(bcrypt_rounds)).decode('utf-8')
+
+    with engine.begin() as conn:
+        conn.execute(text("TRUNCATE likes, comments, posts, users RESTART IDENTITY CASCADE"))
+    raw_conn = engine.raw_connection()
+    try:
+        started = time.perf_counter()
+        user_ids = range(1, counts['users'] + 1)
+
+        def users():
+            for user_id in user_ids:
+                avatar = (f"/storage/v1/object/public/avatars/{user_id}/seed.png"
+                          if rng.random() < 0.3 else None)
+                yield (user_id, random_time(rng, now, 1.0), f"user{user_id}@bench.local", password_hash,
+                       f"user{user_id}", avatar)
+        copy_rows(raw_conn, 'users', ('id', 'created_at', 'email', 'password_hash', 'nickname', 'avatar_url'),
+                  users())
+        log(f"users: {counts['users']} ({time.perf_counter() - started:.1f}s)")
+
+        started = time.perf_counter()
+        authors = SkewedSampler(rng, user_ids, 1.05)
+        post_ids = range(1, counts['posts'] + 1)
+
+        def posts():
+            for post_id, user_id in zip(post_ids, authors.sample(counts['posts'])):
+                title = random_sentence(rng, rng.randint(3, 8))
+                body = random_sentence(rng, rng.randint(20, 200))
+                excerpt = body[:100] + "..." if len(body) > 100 else body
+                image = f"/storage/v1/object/public/post_images/{user_id}/seed.png" if rng.random() < 0.2 else None
+                yield (post_id, random_time(rng, now), title, f"<p>{body}</p>", excerpt, user_id, image,
+                       search.build_document(title, body))
+        copy_rows(raw_conn, 'posts', ('id', 'created_at', 'title', 'content', 'excerpt', 'user_id',
+                                      'image_url', 'search_tsv'), posts())
+        log(f"posts: {counts['posts']} ({time.perf_counter() - started:.1f}s)")
+
+        # 상위 viral_posts개 순위에 추가 가중치를 줘서 댓글/좋아요가 몰리게 합니다.
+        popularity = SkewedSampler(rng, post_ids, 0.9, boost={rank: 50.0 for rank in range(1, viral_posts + 1)})
+        commenters = SkewedSampler(rng, user_ids, 1.1)
+
+        started = time.perf_counter()
+
+        def comments():
+            targets = popularity.sample(counts['comments'])
+            writers = commenters.sample(counts['comments'])
+            for comment_id, (post_id, user_id) in enumerate(zip(targets, writers), start=1):
+                yield (comment_id, random_time(rng, now, 3.0), random_sentence(rng, rng.randint(3, 30)),
+                       user_id, post_id)
+        copy_rows(raw_conn, 'comments', ('id', 'created_at', 'content', 'user_id', 'post_id'), comments())
+        log(f"comments: {counts['comments']} ({time.perf_counter() - started:.1f}s)")
+
+        # 좋아요는 중복 (user_id, post_id)을 임시 테이블에서 제거한 뒤 옮깁니다.
+        started = time.perf_counter()
+        likers = SkewedSampler(rng, user_ids, 1.3, boost={rank: 20.0 for rank in range(1, heavy_likers + 1)})
+        with raw_conn.cursor() as cursor:
+            cursor.execute("CREATE UNLOGGED TABLE IF NOT EXISTS likes_seed (user_id bigint, post_id bigint, "
+                           "created_at timestamptz)")
+            cursor.execute("TRUNCATE likes_seed")
+        raw_conn.commit()
+
+        def likes():
+            for post_id, user_id in zip(popularity.sample(counts['likes']), likers.sample(counts['likes'])):
+                yield (user_id, post_id, random_time(rng, now, 3.0))
+        copy_rows(raw_conn, 'likes_seed', ('user_id', 'post_id', 'created_at'), likes())
+        with raw_conn.cursor() as cursor:
+            cursor.execute("""
+                INSERT INTO likes (user_id, post_id, created_at)
+                SELECT DISTINCT ON (user_id, post_id) user_id, post_id, created_at FROM likes_seed
+                ON CONFLICT DO NOTHING
+            """)
+            inserted_likes = cursor.rowcount
+            cursor.execute("DROP TABLE likes_seed")
+        raw_conn.commit()
+        log(f"likes: {inserted_likes} ({time.perf_counter() - started:.1f}s)")
+    finally:
+        raw_conn.close()
+
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        conn.execute(text("""
+            UPDATE posts AS p SET like_count = l.cnt
+            FROM (SELECT post_id, COUNT(*) AS cnt FROM likes GROUP BY post_id) AS l
+            WHERE p.id = l.post_id
+        """))
+        for table in ('users', 'posts', 'comments', 'likes'):
+            conn.execute(text(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                              f"(SELECT COALESCE(MAX(id), 1) FROM {table}))"))
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM ANALYZE"))
+    log(f"like_count/sequences/analyze ({time.perf_counter() - started:.1f}s)")
+
+    return {
+        'seed': seed_value,
+        'scale': scale,
+        'counts': dict(counts, likes=inserted_likes),
+        'password': password,
+        'bcrypt_rounds': bcrypt_rounds,
+        'viral_post_ids': popularity.top(viral_posts),
+        'popular_post_ids': popularity.top(max(viral_posts * 20, 1000)),
+        'heavy_user_ids': likers.top(heavy_likers),
+        'active_author_ids': authors.top(200),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="벤치마크용 합성 데이터 생성")
+    parser.add_argument('--scale', type=float, default=1.0, help='1 = 사용자 10만/게시글 50만/댓글 200만/좋아요 300만')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--viral-posts', type=int, default=50)
+    parser.add_argument('--heavy-likers', type=int, default=200)
+    parser.add_argument('--password', default='bench-password')
+    parser.add_argument('--bcrypt-rounds', type=int, default=10, help='앱의 BCRYPT_LOG_ROUNDS와 같게 설정')
+    parser.add_argument('--manifest', default='bench/results/manifest.json')
+    parser.add_argument('--force', action='store_true', help="DB 이름에 'bench'가 없어도 실행")
+    args = parser.parse_args()
+
+    load_dotenv()
+    db_url = normalize_db_url(os.environ.get("BENCH_DATABASE_URL") or os.environ.get("DATABASE_URL"))
+    engine = create_engine(db_url)
+    if 'bench' not in (engine.url.database or '') and not args.force:
+        sys.exit(f"'{engine.url.database}' DB의 데이터를 모두 지웁니다. 벤치마크 전용 DB가 맞다면 --force를 붙여주세요.")
+
+    manifest = seed(engine, args.scale, args.seed, args.viral_posts, args.heavy_likers, args.password,
+                    args.bcrypt_rounds, log=lambda message: print(message, file=sys.stderr))
+    os.makedirs(os.path.dirname(os.path.abspath(args.manifest)), exist_ok=True)
+    with open(args.manifest, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    print(json.dumps(manifest['counts']))
+
+
+if __name__ == '__main__':
+    main()
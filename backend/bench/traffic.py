@@ -0,0 +1,335 @@
+# 트래픽 재생기: 프론트엔드의 호출 패턴을 흉내 낸 요청 혼합으로 모든 /api/* 라우트에 부하를 줍니다.
+#
+# 사용법 (서버와 bench/seed.py로 만든 데이터가 준비된 상태에서):
+#   python bench/traffic.py --base-url http://localhost:4000 --manifest bench/results/manifest.json \
+#       --concurrency 32 --duration 60 --output bench/results/traffic.json
+#
+# 시나리오(가중치는 SCENARIOS 참고)
+# - 목록: PostListPage처럼 ?page=N&fields=...로 조회 (로그인 사용자는 토큰 포함), 일부는 검색
+# - 상세: PostDetailPage처럼 /page 통합 API 후 일부는 댓글 더 보기(cursor)
+# - 좋아요/댓글/글쓰기(이미지 업로드 포함)/내 활동/프로필/로그인/회원가입
+# 인기 글(매니페스트의 popular_post_ids)에 조회가 몰리도록 합니다.
+#
+# 결과(JSON): 엔드포인트("METHOD /rule")별 요청 수, 초당 처리량, p50/p95/p99, 상태 코드별 개수
+import argparse
+import json
+import random
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import Counter, defaultdict
+
+from bench_serving import multipart_image
+
+POST_LIST_FIELDS = 'id,created_at,title,excerpt,user_id,image_url,author_nickname,like_count,liked_by_me'
+SEARCH_TERMS = ["게시글", "데이터베이스", "맛집 여행", "flask", "postgres cursor", "최적화"]
+
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+
+    def record(self, endpoint, status, elapsed_ms):
+        with self._lock:
+            self.statuses[endpoint][status] += 1
+            if 200 <= status < 500:
+                self.latencies[endpoint].append(elapsed_ms)
+
+
+class Client:
+    def __init__(self, base_url, recorder, token=None, user_id=None):
+        self.base_url = base_url
+        self.recorder = recorder
+        self.token = token
+        self.user_id = user_id
+        self.last_status = None
+
+    # endpoint: 집계용 이름 (예: "GET /api/posts/<int:post_id>/page")
+    def call(self, endpoint, path, json_body=None, data=None, content_type=None, auth=True):
+        method = endpoint.split(' ', 1)[0]
+        headers = {}
+        if json_body is not None:
+            data = json.dumps(json_body).encode('utf-8')
+            content_type = 'application/json'
+        if content_type:
+            headers['Content-Type'] = content_type
+        if auth and self.token:
+            headers['Authorization'] = f"Bearer {self.token}"
+        req = urllib.request.Request(self.base_url + path, data=data, headers=headers, method=method)
+        started = time.perf_counter()
+        body = None
+        try:
+            with urllib.request.urlopen(req, timeout=60) as response:
+                status = response.status
+                body = response.read()
+        except urllib.error.HTTPError as e:
+            status = e.code
+        except OSError:
+            status = 0
+        self.recorder.record(endpoint, status, (time.perf_counter() - started) * 1000)
+        self.last_status = status
+        if body and status < 300:
+            try:
+                return json.loads(body)
+            except ValueError:
+                return None
+        return None
+
+
+class Traffic:
+    def __init__(self, manifest, rng):
+        self.manifest = manifest
+        self.rng = rng
+        self.post_count = manifest['counts']['posts']
+        self.popular = manifest['popular_post_ids']
+
+    def post_id(self):
+        # 조회의 80%는 인기 글(바이럴 포함), 나머지는 전체에서 고르게
+        if self.rng.random() < 0.8:
+            return self.rng.choice(self.popular)
+        return self.rng.randint(1, self.post_count)
+
+    # --- 시나리오 (client는 로그인된 사용자 또는 익명) ---
+    def browse_list(self, client):
+        page = 1 if self.rng.random() < 0.7 else self.rng.randint(2, 20)
+        client.call("GET /api/posts", f"/api/posts?page={page}&fields={POST_LIST_FIELDS}")
+
+    def search(self, client):
+        term = urllib.request.quote(self.rng.choice(SEARCH_TERMS))
+        client.call("GET /api/posts", f"/api/posts?search={term}&page=1&fields={POST_LIST_FIELDS}")
+
+    def view_post(self, client):
+        post_id = self.post_id()
+        data = client.call("GET /api/posts/<int:post_id>/page", f"/api/posts/{post_id}/page")
+        cursor = data and data.get('comments_next_cursor')
+        while cursor and self.rng.random() < 0.3:
+            data = client.call("GET /api/posts/<int:post_id>/comments",
+                               f"/api/posts/{post_id}/comments?cursor={cursor}&limit=20", auth=False)
+            cursor = data and data.get('next_cursor')
+
+    def view_post_legacy(self, client):
+        client.call("GET /api/posts/<int:post_id>", f"/api/posts/{self.post_id()}")
+
+    def toggle_like(self, client):
+        post_id = self.post_id()
+        client.call("POST /api/posts/<int:post_id>/like", f"/api/posts/{post_id}/like", json_body={})
+        if self.rng.random() < 0.5:
+            client.call("DELETE /api/posts/<int:post_id>/like", f"/api/posts/{post_id}/like")
+
+    def comment(self, client):
+        post_id = self.post_id()
+        created = client.call("POST /api/posts/<int:post_id>/comments", f"/api/posts/{post_id}/comments",
+                              json_body={'content': f"벤치마크 댓글 {uuid.uuid4().hex[:8]}"})
+        if not created:
+            return
+        if self.rng.random() < 0.2:
+            client.call("PUT /api/comments/<int:comment_id>", f"/api/comments/{created['id']}",
+                        json_body={'content': "수정된 벤치마크 댓글"})
+        if self.rng.random() < 0.2:
+            client.call("DELETE /api/comments/<int:comment_id>", f"/api/comments/{created['id']}")
+
+    def write_post(self, client):
+        image_url = None
+        if self.rng.random() < 0.3:
+            body, content_type = multipart_image('image')
+            uploaded = client.call("POST /api/posts/image-upload", "/api/posts/image-upload",
+                                   data=body, content_type=content_type)
+            image_url = uploaded and uploaded.get('image_url')
+        created = client.call("POST /api/posts", "/api/posts", json_body={
+            'title': f"벤치마크 글 {uuid.uuid4().hex[:8]}",
+            'content': "<p>벤치마크로 작성한 게시글 본문입니다. flask postgres 성능 측정</p>",
+            'image_url': image_url,
+        })
+        if not created:
+            return
+        if self.rng.random() < 0.3:
+            client.call("PUT /api/posts/<int:post_id>", f"/api/posts/{created['id']}", json_body={
+                'title': "수정된 벤치마크 글", 'content': "<p>수정된 본문</p>"
+            })
+        if self.rng.random() < 0.3:
+            client.call("DELETE /api/posts/<int:post_id>", f"/api/posts/{created['id']}")
+
+    def my_activity(self, client):
+        choice = self.rng.random()
+        if choice < 0.4:
+            client.call("GET /api/user/my-posts", f"/api/user/my-posts?fields={POST_LIST_FIELDS}")
+        elif choice < 0.7:
+            client.call("GET /api/user/my-likes-posts", f"/api/user/my-likes-posts?fields={POST_LIST_FIELDS}")
+        elif choice < 0.95:
+            client.call("GET /api/user/my-comments", "/api/user/my-comments")
+        else:
+            client.call("GET /api/user/my-likes", "/api/user/my-likes")
+
+    def profile(self, client):
+        choice = self.rng.random()
+        if choice < 0.4:
+            client.call("PUT /api/user/nickname", "/api/user/nickname",
+                        json_body={'nickname': f"user{client.user_id}-{uuid.uuid4().hex[:6]}"})
+        elif choice < 0.8:
+            body, content_type = multipart_image('avatar')
+            client.call("POST /api/user/avatar", "/api/user/avatar", data=body, content_type=content_type)
+        else:
+            client.call("DELETE /api/user/avatar", "/api/user/avatar")
+
+    def login(self, client):
+        user_id = self.rng.randint(1, self.manifest['counts']['users'])
+        client.call("POST /api/login", "/api/login", auth=False,
+                    json_body={'email': f"user{user_id}@bench.local", 'password': self.manifest['password']})
+
+    def register(self, client):
+        suffix = uuid.uuid4().hex[:12]
+        client.call("POST /api/register", "/api/register", auth=False, json_body={
+            'email': f"new-{suffix}@bench.local", 'password': self.manifest['password'], 'nickname': f"new-{suffix}"
+        })
+
+
+# (시나리오, 가중치, 로그인 필요 여부)
+SCENARIOS = [
+    (Traffic.browse_list, 30, False),
+    (Traffic.search, 6, False),
+    (Traffic.view_post, 28, False),
+    (Traffic.view_post_legacy, 2, False),
+    (Traffic.toggle_like, 10, True),
+    (Traffic.comment, 6, True),
+    (Traffic.write_post, 2, True),
+    (Traffic.my_activity, 8, True),
+    (Traffic.profile, 1, True),
+    (Traffic.login, 2, False),
+    (Traffic.register, 0.5, False),
+]
+
+
+# 모든 라우트를 각 목록 모드(page/cursor/ndjson, 검색 fts/ilike 등)로 한 번씩 호출합니다.
+# 쿼리 계획 검사(run_suite.py --plan-check)처럼 실행 경로를 빠짐없이 거쳐야 할 때 사용합니다.
+def sweep(base_url, manifest, token, user_id):
+    recorder = Recorder()
+    client = Client(base_url, recorder, token, user_id)
+    anonymous = Client(base_url, recorder)
+    post_id = manifest['viral_post_ids'][0]
+    term = urllib.request.quote(SEARCH_TERMS[1])
+
+    first = anonymous.call("GET /api/posts", f"/api/posts?cursor=&fields={POST_LIST_FIELDS}")
+    if first and first.get('next_cursor'):
+        anonymous.call("GET /api/posts", f"/api/posts?cursor={first['next_cursor']}&fields={POST_LIST_FIELDS}")
+    for query in ("page=1", "page=7", "cursor=&total=estimate", f"search={term}&page=1",
+                  f"search={term}&cursor=&total=exact", f"search={term}&search_mode=ilike&page=1"):
+        client.call("GET /api/posts", f"/api/posts?{query}&fields={POST_LIST_FIELDS}")
+    client.call("GET /api/posts/<int:post_id>", f"/api/posts/{post_id}")
+    page = client.call("GET /api/posts/<int:post_id>/page", f"/api/posts/{post_id}/page")
+    comment_cursor = (page or {}).get('comments_next_cursor') or ''
+    for query in ("", f"?cursor={comment_cursor}&limit=20", "?format=ndjson"):
+        client.call("GET /api/posts/<int:post_id>/comments", f"/api/posts/{post_id}/comments{query}")
+    for path in ("/api/user/my-posts", "/api/user/my-comments", "/api/user/my-likes-posts"):
+        for query in ("", "?cursor=&limit=20", "?format=ndjson"):
+            client.call(f"GET {path}", f"{path}{query}")
+    client.call("GET /api/user/my-likes", "/api/user/my-likes")
+
+    traffic = Traffic(manifest, random.Random(0))
+    traffic.rng.random = lambda: 0.0  # 모든 선택적 단계(이미지 업로드, 수정, 삭제 등)를 실행
+    for scenario in (Traffic.write_post, Traffic.comment, Traffic.toggle_like, Traffic.login, Traffic.register):
+        scenario(traffic, client)
+    for roll in (0.0, 0.5, 0.9):  # 닉네임 변경 / 아바타 업로드 / 아바타 삭제
+        traffic.rng.random = lambda roll=roll: roll
+        traffic.profile(client)
+    return {endpoint: dict(statuses) for endpoint, statuses in recorder.statuses.items()}
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * q))], 2)
+
+
+def summarize(samples, statuses, elapsed):
+    return {
+        'count': sum(statuses.values()),
+        'rps': round(sum(statuses.values()) / elapsed, 2),
+        'errors': sum(count for status, count in statuses.items() if status == 0 or status >= 500),
+        'p50_ms': round(statistics.median(samples), 2) if samples else None,
+        'p95_ms': percentile(samples, 0.95) if samples else None,
+        'p99_ms': percentile(samples, 0.99) if samples else None,
+        'statuses': {str(k): v for k, v in sorted(statuses.items())},
+    }
+
+
+# 로그인 세션을 만든 뒤 duration초 동안 시나리오를 재생하고 결과 dict를 반환합니다.
+def run(base_url, manifest, concurrency=32, duration=60, sessions=64, logged_in_ratio=0.6, seed=1):
+    setup = Recorder()
+    rng = random.Random(seed)
+    # 활발한 사용자(작성자/heavy liker) 위주로 로그인 세션을 준비합니다.
+    candidates = manifest['heavy_user_ids'] + manifest['active_author_ids']
+    clients = []
+    for user_id in rng.sample(candidates, min(sessions, len(candidates))):
+        data = Client(base_url, setup).call("POST /api/login", "/api/login", json_body={
+            'email': f"user{user_id}@bench.local", 'password': manifest['password']})
+        if data:
+            clients.append((data['token'], data['user_id']))
+    if not clients:
+        raise RuntimeError("벤치마크 사용자로 로그인하지 못했습니다. 서버/매니페스트를 확인해주세요.")
+
+    recorder = Recorder()
+    deadline = time.monotonic() + duration
+    weights = [weight for _, weight, _ in SCENARIOS]
+
+    def worker(index):
+        worker_rng = random.Random(seed * 1000 + index)
+        traffic = Traffic(manifest, worker_rng)
+        token, user_id = clients[index % len(clients)]
+        authed = Client(base_url, recorder, token, user_id)
+        anonymous = Client(base_url, recorder)
+        while time.monotonic() < deadline:
+            scenario, _, needs_login = worker_rng.choices(SCENARIOS, weights=weights)[0]
+            client = authed if needs_login or worker_rng.random() < logged_in_ratio else anonymous
+            scenario(traffic, client)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    all_samples = [v for samples in recorder.latencies.values() for v in samples]
+    all_statuses = Counter()
+    for statuses in recorder.statuses.values():
+        all_statuses.update(statuses)
+    return {
+        'concurrency': concurrency,
+        'duration_s': round(elapsed, 2),
+        'sessions': len(clients),
+        'overall': summarize(all_samples, all_statuses, elapsed),
+        'endpoints': {endpoint: summarize(recorder.latencies[endpoint], statuses, elapsed)
+                      for endpoint, statuses in sorted(recorder.statuses.items())},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="프론트엔드 호출 패턴 트래픽 재생")
+    parser.add_argument('--base-url', default='http://localhost:4000')
+    parser.add_argument('--manifest', default='bench/results/manifest.json')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=60)
+    parser.add_argument('--sessions', type=int, default=64, help='미리 로그인해 둘 사용자 수')
+    parser.add_argument('--logged-in-ratio', type=float, default=0.6, help='조회 요청 중 로그인 사용자 비율')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='결과 JSON 파일 경로 (없으면 표준 출력)')
+    args = parser.parse_args()
+
+    with open(args.manifest, encoding='utf-8') as f:
+        manifest = json.load(f)
+    result = run(args.base_url, manifest, args.concurrency, args.duration, args.sessions,
+                 args.logged_in_ratio, args.seed)
+    output = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
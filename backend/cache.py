@@ -0,0 +1,211 @@
+# --- 응답 캐시 ---
+# 직렬화된 JSON 응답(bytes)을 키 단위로 저장하고, 태그(예: "post:3", "user:7")로 묶어
+# 쓰기 API에서 관련 항목만 정확히 무효화합니다.
+#
+# - MemoryCache: 워커 프로세스 내부 LRU + TTL (기본값)
+# - RedisCache: 여러 gunicorn 워커가 공유하는 Redis 백엔드 (redis 패키지 필요)
+#   Redis 오류는 요청을 실패시키지 않습니다: 조회는 캐시 미스, 저장/무효화는 건너뛰고 경고 로그를 남깁니다.
+#   (무효화를 건너뛴 항목은 TTL이 지나면 사라집니다.)
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryCache:
+    def __init__(self, max_entries=1024, ttl=30):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # {key: (만료 시각, 값, 태그 목록)}
+        self._tags = {}  # {tag: set(key)}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[0] <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, tags=(), ttl=None):
+        expires_at = time.monotonic() + (ttl or self.ttl)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expires_at, value, tuple(tags))
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate_tags(self, *tags):
+        with self._lock:
+            for tag in tags:
+                for key in self._tags.pop(tag, ()):
+                    if key in self._entries:
+                        self._remove(key)
+                        self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'backend': 'memory',
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
+
+    # (lock을 잡은 상태에서만 호출) 항목과 태그 인덱스를 함께 제거합니다.
+    def _remove(self, key):
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+class RedisCache:
+    def __init__(self, url, ttl=30, prefix='resp:'):
+        try:
+            import redis  # CACHE_BACKEND=redis일 때만 임포트 (requirements.txt에 포함)
+        except ImportError as e:
+            raise RuntimeError("CACHE_BACKEND=redis에는 redis 패키지가 필요합니다. (pip install -r requirements.txt)") from e
+
+        self.client = redis.Redis.from_url(url)
+        self._redis_error = redis.RedisError
+        self.ttl = ttl
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    def get(self, key):
+        try:
+            value = self.client.get(self.prefix + key)
+        except self._redis_error as e:
+            self._error('get', e)
+            value = None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key, value, tags=(), ttl=None):
+        ttl = ttl or self.ttl
+        pipe = self.client.pipeline(transaction=False)
+        pipe.set(self.prefix + key, value, ex=ttl)
+        for tag in tags:
+            tag_key = f"{self.prefix}tag:{tag}"
+            pipe.sadd(tag_key, key)
+            # 태그 집합은 항목보다 조금 더 오래 유지되면 충분합니다.
+            pipe.expire(tag_key, ttl * 2)
+        try:
+            pipe.execute()
+        except self._redis_error as e:
+            self._error('set', e)
+
+    def invalidate_tags(self, *tags):
+        for tag in tags:
+            tag_key = f"{self.prefix}tag:{tag}"
+            try:
+                keys = self.client.smembers(tag_key)
+                pipe = self.client.pipeline(transaction=False)
+                if keys:
+                    pipe.delete(*[self.prefix + k.decode('utf-8') for k in keys])
+                pipe.delete(tag_key)
+                removed = pipe.execute()
+            except self._redis_error as e:
+                self._error('invalidate', e)
+                continue
+            if keys:
+                with self._lock:
+                    self.invalidations += removed[0]
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=self.prefix + '*'))
+        if keys:
+            self.client.delete(*keys)
+
+    def stats(self):
+        # hits/misses는 이 워커 기준, evictions는 Redis 서버 전체 기준입니다.
+        try:
+            evictions = self.client.info('stats').get('evicted_keys', 0)
+        except self._redis_error as e:
+            self._error('info', e)
+            evictions = None
+        with self._lock:
+            return {
+                'backend': 'redis',
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': evictions,
+                'invalidations': self.invalidations,
+                'errors': self.errors,
+            }
+
+    def _error(self, operation, error):
+        with self._lock:
+            self.errors += 1
+        logger.warning("redis cache %s failed: %s", operation, error)
+
+
+class NullCache:
+    def get(self, key):
+        return None
+
+    def set(self, key, value, tags=(), ttl=None):
+        pass
+
+    def invalidate_tags(self, *tags):
+        pass
+
+    def clear(self):
+        pass
+
+    def stats(self):
+        return {'backend': 'none'}
+
+
+# 환경 변수 설정으로 캐시 백엔드를 만듭니다.
+# CACHE_BACKEND=memory(기본) | redis | none, CACHE_TTL(초), CACHE_MAX_ENTRIES, CACHE_REDIS_URL
+def create_cache(environ):
+    backend = environ.get("CACHE_BACKEND", "memory")
+    ttl = int(environ.get("CACHE_TTL", 30))
+    if backend == 'none':
+        return NullCache()
+    if backend == 'redis':
+        return RedisCache(environ.get("CACHE_REDIS_URL", "redis://localhost:6379/0"), ttl=ttl)
+    if backend == 'memory':
+        return MemoryCache(max_entries=int(environ.get("CACHE_MAX_ENTRIES", 1024)), ttl=ttl)
+    raise ValueError(f"알 수 없는 CACHE_BACKEND: {backend}")
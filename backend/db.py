@@ -0,0 +1,220 @@
+# --- DB 엔진 생성 및 커넥션 풀 통계 ---
+# 풀 설정은 gunicorn 워커(프로세스)마다 따로 적용됩니다.
+# 워커 수 x (DB_POOL_SIZE + DB_MAX_OVERFLOW)가 Neon의 최대 연결 수를 넘지 않도록 설정해야 합니다.
+#
+# 환경 변수
+# - DB_POOL_SIZE (기본 5), DB_MAX_OVERFLOW (기본 5), DB_POOL_TIMEOUT (초, 기본 10)
+# - DB_POOL_RECYCLE (초, 기본 300): Neon/프록시가 유휴 연결을 끊기 전에 미리 재연결
+# - DB_POOL_PRE_PING (기본 1): 체크아웃 시 연결 상태를 확인하여 끊어진 연결을 교체
+# - DB_PGBOUNCER (기본 0): PgBouncer(transaction 모드) 호환
+#   psycopg(3, postgresql+psycopg://)는 자동으로 만드는 서버 측 prepared statement를 끕니다. (prepare_threshold)
+#   psycopg2(기본 드라이버)는 prepared statement를 쓰지 않고, NDJSON 스트리밍의 서버 측 커서도 트랜잭션 안에서만
+#   쓰므로(WITH HOLD 아님) 바꿀 설정이 없습니다. 다만 migrate.py는 세션 단위 advisory lock을 쓰므로,
+#   PgBouncer를 거치지 않는 직접 연결 URL로 실행해야 합니다. (시작 시 경고 로그)
+#
+# app.py는 LazyEngine을 사용합니다. 엔진(과 DB 드라이버 로딩)은 처음 쿼리할 때 만들어지므로
+# 임포트/워커 부팅이 빠르고, gunicorn preload 모드에서도 마스터 프로세스가 연결을 만들지 않습니다.
+import bisect
+import logging
+import threading
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+CHECKOUT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+# 큐에서 이 시간보다 오래 걸린 체크아웃만 "기다림"으로 셉니다. (경합 없는 Queue.get은 수 µs)
+POOL_WAIT_THRESHOLD_SECONDS = 0.001
+
+
+# Neon의 DB URL은 postgres://로 시작하므로, psycopg2가 인식하도록 postgresql://로 변경
+def normalize_db_url(db_url):
+    if db_url and db_url.startswith("postgres://"):
+        return db_url.replace("postgres://", "postgresql://", 1)
+    return db_url
+
+
+def _env_int(environ, name, default):
+    return int(environ.get(name, default))
+
+
+def _env_flag(environ, name, default):
+    return environ.get(name, default) in ("1", "true", "True")
+
+
+class PoolStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.waits = 0  # 풀이 가득 차서 기다려야 했던 체크아웃 수
+        self.wait_seconds = 0.0  # 풀 큐에서 기다린 시간 (새 연결을 만든 시간 제외)
+        self.connect_seconds = 0.0  # 체크아웃 중 새 연결을 만든 시간
+        self.checkout_seconds = 0.0
+        self.checkout_buckets = [0] * (len(CHECKOUT_BUCKETS_MS) + 1)
+
+    def record_checkout(self, seconds, connect_seconds):
+        index = bisect.bisect_left(CHECKOUT_BUCKETS_MS, seconds * 1000)
+        wait_seconds = max(seconds - connect_seconds, 0.0)
+        with self._lock:
+            self.checkouts += 1
+            self.checkout_seconds += seconds
+            self.connect_seconds += connect_seconds
+            self.checkout_buckets[index] += 1
+            if wait_seconds > POOL_WAIT_THRESHOLD_SECONDS:
+                self.waits += 1
+                self.wait_seconds += wait_seconds
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def attach(self, engine):
+        @event.listens_for(engine, "connect")
+        def _on_connect(dbapi_connection, connection_record):
+            with self._lock:
+                self.connects += 1
+
+        @event.listens_for(engine, "invalidate")
+        def _on_invalidate(dbapi_connection, connection_record, exception):
+            with self._lock:
+                self.invalidations += 1
+
+    def snapshot(self, pool):
+        with self._lock:
+            cumulative = 0
+            histogram = {}
+            for bound, count in zip(CHECKOUT_BUCKETS_MS + ('+Inf',), self.checkout_buckets):
+                cumulative += count
+                histogram[f"le_{bound}ms" if bound != '+Inf' else "le_inf"] = cumulative
+            return {
+                'size': pool.size(),
+                'checked_out': pool.checkedout(),
+                'checked_in': pool.checkedin(),
+                'overflow': pool.overflow(),
+                'checkouts': self.checkouts,
+                'connects': self.connects,
+                'invalidations': self.invalidations,
+                'timeouts': self.timeouts,
+                'waits': self.waits,
+                'wait_seconds_total': round(self.wait_seconds, 6),
+                'connect_seconds_total': round(self.connect_seconds, 6),
+                'checkout_seconds_total': round(self.checkout_seconds, 6),
+                'checkout_latency_histogram': histogram,
+            }
+
+
+# 체크아웃에 걸린 시간을 PoolStats에 기록하는 QueuePool 서브클래스를 만듭니다.
+# (engine.dispose() 시 풀이 같은 클래스로 다시 만들어지므로 stats는 클래스 속성으로 둡니다.)
+# _do_get 안에서 새 연결을 만든 시간(_create_connection)을 따로 재어, 나머지만 풀 큐에서 기다린 시간으로 셉니다.
+def _instrumented_pool_class(stats):
+    local = threading.local()
+
+    def _do_get(self):
+        local.connect_seconds = 0.0
+        started = time.perf_counter()
+        try:
+            connection = QueuePool._do_get(self)
+        except PoolTimeoutError:
+            stats.record_timeout()
+            raise
+        stats.record_checkout(time.perf_counter() - started, local.connect_seconds)
+        return connection
+
+    def _create_connection(self):
+        started = time.perf_counter()
+        try:
+            return QueuePool._create_connection(self)
+        finally:
+            local.connect_seconds = getattr(local, 'connect_seconds', 0.0) + time.perf_counter() - started
+
+    return type('InstrumentedQueuePool', (QueuePool,),
+                {'_do_get': _do_get, '_create_connection': _create_connection})
+
+
+# 환경 변수 설정을 반영한 엔진과 PoolStats를 만듭니다.
+def create_db_engine(db_url, environ, stats=None, **kwargs):
+    db_url = normalize_db_url(db_url)
+    stats = stats or PoolStats()
+    connect_args = {}
+    if _env_flag(environ, "DB_PGBOUNCER", "0"):
+        if db_url.startswith("postgresql+psycopg://"):
+            connect_args["prepare_threshold"] = None  # psycopg3는 반복 실행한 문장을 자동으로 준비하므로 끕니다.
+        else:
+            logger.warning("DB_PGBOUNCER=1: psycopg2는 prepared statement를 쓰지 않아 바꿀 드라이버 설정이 없습니다. "
+                           "마이그레이션(flask migrate)은 세션 advisory lock을 쓰므로 PgBouncer를 거치지 않는 "
+                           "직접 연결 URL로 실행하세요.")
+    engine = create_engine(
+        db_url,
+        poolclass=_instrumented_pool_class(stats),
+        pool_size=_env_int(environ, "DB_POOL_SIZE", 5),
+        max_overflow=_env_int(environ, "DB_MAX_OVERFLOW", 5),
+        pool_timeout=_env_int(environ, "DB_POOL_TIMEOUT", 10),
+        pool_recycle=_env_int(environ, "DB_POOL_RECYCLE", 300),
+        pool_pre_ping=_env_flag(environ, "DB_POOL_PRE_PING", "1"),
+        connect_args=connect_args,
+        **kwargs,
+    )
+    stats.attach(engine)
+    return engine, stats
+
+
+# 처음 사용할 때 엔진을 만드는 대리 객체입니다. (engine.connect(), engine.pool 등은 실제 엔진으로 전달)
+# 이벤트 리스너는 listen()으로 등록해 두면 엔진을 만들 때 함께 연결합니다.
+class LazyEngine:
+    def __init__(self, db_url, environ, **kwargs):
+        self.db_url = db_url
+        self.environ = environ
+        self.kwargs = kwargs
+        self.pool_stats = PoolStats()
+        self._engine = None
+        self._lock = threading.Lock()
+        self._listeners = []
+
+    @property
+    def created(self):
+        return self._engine is not None
+
+    def get(self):
+        if self._engine is None:
+            with self._lock:
+                if self._engine is None:
+                    engine, _ = create_db_engine(self.db_url, self.environ, stats=self.pool_stats, **self.kwargs)
+                    for identifier, fn in self._listeners:
+                        event.listen(engine, identifier, fn)
+                    self._engine = engine
+        return self._engine
+
+    def listen(self, identifier, fn):
+        with self._lock:
+            self._listeners.append((identifier, fn))
+            if self._engine is not None:
+                event.listen(self._engine, identifier, fn)
+
+    # gunicorn preload 모드: fork 전에 만든 연결을 워커가 함께 쓰지 않도록 풀을 비웁니다.
+    # (close=False: 부모 프로세스의 연결은 닫지 않고 이 프로세스에서만 버림)
+    def reset_after_fork(self):
+        if self._engine is not None:
+            self._engine.dispose(close=False)
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.get(), name)
+
+
+# 엔진(또는 LazyEngine)에 이벤트 리스너를 등록합니다.
+def listen(engine, identifier, fn):
+    if isinstance(engine, LazyEngine):
+        engine.listen(identifier, fn)
+    else:
+        event.listen(engine, identifier, fn)
+
+
+def create_lazy_engine(db_url, environ, **kwargs):
+    return LazyEngine(db_url, environ, **kwargs)
@@ -0,0 +1,387 @@
+# --- 홈 피드 사전 계산 (FEED_ENABLED=1일 때만, migrations/0008_home_feed.sql) ---
+# 검색어 없는 게시글 목록의 앞쪽 페이지는 모든 방문자에게 같은 결과인데도, 요청마다 posts/users/image_variants를
+# JOIN해 정렬하고 직렬화합니다. 정렬 방식(ranking)별 상위 FEED_SIZE(기본 200)개 게시글을 작성자 닉네임·좋아요 수·요약까지
+# JOIN한 JSON(payload)으로 home_feed 테이블에 저장해 두고, 목록 API는 이 JSON 텍스트를 그대로 이어 붙여 응답합니다.
+# (page()는 한 문장으로 페이지 + 전체 게시글 수를 읽으며, 비용은 게시글 테이블 크기와 무관)
+#
+# - 'recent': 최신순 (created_at, id) — 목록 API의 기본 정렬과 같음
+# - 'top': 좋아요 수순 (like_count, id)
+# - 'hot'(FEED_HOT=1일 때만): 최근 FEED_HOT_WINDOW_HOURS시간(기본 48) 동안 받은 좋아요 수순.
+#   피드에 있는 글이 전부이며(그 뒤 페이지 없음), 최근 좋아요가 없는 글은 넣지 않습니다.
+#
+# 갱신
+# - 증분: 쓰기 API는 바뀐 게시글/작성자/이미지를 mark()로 표시만 하고(요청의 쿼리 수는 그대로),
+#   워커별 갱신 스레드가 FEED_FLUSH_INTERVAL_MS(기본 200)마다 묶어서 반영합니다.
+#   1) 바뀐 글 중 피드에 있거나 N번째 글보다 앞서게 된 글의 payload/정렬 키를 다시 만들고
+#   2) (recent/top) 인덱스 순서로 상위 N개 후보를 읽어 빠진 글(삭제/좋아요 취소로 생긴 빈자리)을 채운 뒤
+#   3) N개를 넘는 꼬리를 잘라 냅니다.
+#   반영이 끝나면 on_refresh(태그 목록)로 바뀐 글/작성자와, 순서나 구성이 바뀐 ranking(posts:list:<ranking>)의
+#   목록 응답 캐시를 무효화합니다. 쓰기 후 최대 FEED_FLUSH_INTERVAL_MS 동안은 이전 목록이 보입니다.
+# - 주기: jobs-worker가 약 FEED_REFRESH_SECONDS(기본 60)마다 ranking별 상위 N개를 다시 계산해 맞추고
+#   (시간이 지나면 바뀌는 hot 점수 포함) home_feed_meta의 게시글 수를 정확한 값으로 맞춥니다.
+#   설정에서 뺀 ranking(예: FEED_HOT=0)의 행은 이때 지웁니다.
+#   `flask --app app rebuild-feed`도 같은 작업을 바로 실행합니다. (처음 채울 때)
+# - 여러 워커/프로세스의 갱신은 advisory lock으로 한 번에 하나씩 실행합니다.
+#
+# payload의 created_at은 갱신한 연결의 TimeZone 기준 ISO 8601 문자열입니다. (Neon 기본 UTC — 직접 조회 응답과 같은 형식)
+import atexit
+import logging
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+
+from sqlalchemy import text
+
+from query_plans import PLAN_CHECK_ALLOW_SEQ_SCAN
+
+logger = logging.getLogger(__name__)
+
+FEED_REFRESH = 'feed.refresh'  # jobs-worker 주기 작업 (payload 없음)
+FEED_LOCK_ID = 640_025  # pg_advisory_xact_lock 키 (임의의 고정값)
+
+# payload에 들어 있는 필드 (목록 API의 같은 이름 필드와 같은 값). liked_by_me는 조회할 때 더합니다.
+FEED_FIELDS = ('id', 'created_at', 'title', 'excerpt', 'user_id', 'image_url', 'image_thumb_url',
+               'author_nickname', 'author_avatar_url', 'like_count')
+FEED_PAYLOAD_SQL = """jsonb_build_object(
+        'id', p.id, 'created_at', p.created_at, 'title', p.title, 'excerpt', p.excerpt, 'user_id', p.user_id,
+        'image_url', p.image_url, 'image_thumb_url', COALESCE(iv.variants->>'thumb', p.image_url),
+        'author_nickname', u.nickname, 'author_avatar_url', u.avatar_url, 'like_count', p.like_count)"""
+FEED_SOURCE_SQL = """posts AS p
+    JOIN users AS u ON u.id = p.user_id
+    LEFT JOIN image_variants AS iv ON iv.original_url = p.image_url"""
+HOT_SCORE_SQL = """(SELECT COUNT(*) FROM likes AS l
+        WHERE l.post_id = p.id AND l.created_at > now() - make_interval(hours => :hot_hours))"""
+
+# name: ?sort= 값 / key_column: home_feed의 정렬 컬럼 / key_sql: 같은 값을 posts(p)에서 계산하는 식
+# sort_key_sql: sort_key 컬럼에 저장할 값 / candidates_sql: 상위 :size개 게시글 id (정렬 순서의 인덱스 사용)
+# cursor_type: 커서 값 변환 / repair: 증분 갱신마다 후보로 빈자리를 채움 / bounded: 피드가 곧 전체 목록
+Ranking = namedtuple('Ranking', ['name', 'key_column', 'key_sql', 'sort_key_sql', 'candidates_sql',
+                                 'cursor_type', 'repair', 'bounded'])
+RANKINGS = {
+    'recent': Ranking('recent', 'created_at', "p.created_at", "EXTRACT(EPOCH FROM p.created_at)",
+                      "SELECT c.id FROM posts AS c ORDER BY c.created_at DESC, c.id DESC LIMIT :size",
+                      datetime.fromisoformat, True, False),
+    'top': Ranking('top', 'sort_key', "p.like_count", "p.like_count",
+                   "SELECT c.id FROM posts AS c ORDER BY c.like_count DESC, c.id DESC LIMIT :size",
+                   int, True, False),
+    'hot': Ranking('hot', 'sort_key', HOT_SCORE_SQL, HOT_SCORE_SQL,
+                   """SELECT l.post_id FROM likes AS l
+                      WHERE l.created_at > now() - make_interval(hours => :hot_hours)
+                      GROUP BY l.post_id ORDER BY COUNT(*) DESC, l.post_id DESC LIMIT :size""",
+                   float, False, True),
+}
+
+FEED_INSERT_SQL = """
+    INSERT INTO home_feed (ranking, post_id, user_id, created_at, sort_key, payload)
+    SELECT :ranking, p.id, p.user_id, p.created_at, {sort_key_sql}, {payload_sql}
+    FROM {source_sql}
+"""
+FEED_UPSERT_SUFFIX = """
+    ON CONFLICT (ranking, post_id) DO UPDATE
+        SET user_id = EXCLUDED.user_id, sort_key = EXCLUDED.sort_key, payload = EXCLUDED.payload,
+            refreshed_at = now()
+"""
+# N번째 행 (정렬 키, post_id) — 행이 N개보다 적으면 없음
+FEED_BOUNDARY_SQL = """
+    SELECT {key_column} AS key, post_id FROM home_feed
+    WHERE ranking = :ranking
+    ORDER BY {key_column} DESC, post_id DESC
+    OFFSET :last_index LIMIT 1
+"""
+
+# 1) 바뀐 글(직접 표시한 글 + 표시한 작성자/이미지의 피드 안 글) 중 피드에 있거나 N번째 행보다 앞서는 글을 다시 만듭니다.
+UPDATE_CHANGED_SQL = """
+    WITH boundary AS (""" + FEED_BOUNDARY_SQL + """
+    ), changed AS (
+        SELECT unnest(CAST(:post_ids AS bigint[])) AS id
+        UNION
+        SELECT post_id FROM home_feed
+        WHERE ranking = :ranking
+          AND (user_id = ANY(CAST(:user_ids AS bigint[]))
+               OR payload->>'image_url' = ANY(CAST(:image_urls AS text[])))
+    )""" + FEED_INSERT_SQL + """
+    WHERE p.id IN (SELECT id FROM changed)
+      AND (EXISTS (SELECT 1 FROM home_feed AS m WHERE m.ranking = :ranking AND m.post_id = p.id)
+           OR NOT EXISTS (SELECT 1 FROM boundary)
+           OR ({key_sql}, p.id) > (SELECT key, post_id FROM boundary))
+""" + FEED_UPSERT_SUFFIX + """
+    RETURNING (xmax = 0) AS inserted
+"""
+
+# 2) 상위 N개 후보 중 피드에 없는 글을 넣습니다. (삭제/순위 하락으로 생긴 빈자리)
+REPAIR_SQL = FEED_INSERT_SQL + """
+    WHERE p.id IN ({candidates_sql})
+      AND NOT EXISTS (SELECT 1 FROM home_feed AS m WHERE m.ranking = :ranking AND m.post_id = p.id)
+    ON CONFLICT (ranking, post_id) DO NOTHING
+"""
+
+# 3) N번째 행보다 뒤의 행을 지웁니다. (bounded 정렬은 점수가 0이 된 행도)
+TRIM_SQL = """
+    DELETE FROM home_feed AS f
+    WHERE f.ranking = :ranking
+      AND ((f.{key_column}, f.post_id) < (""" + FEED_BOUNDARY_SQL + """) {trim_extra})
+"""
+
+# 주기 갱신: 상위 N개 후보를 모두 다시 만들고, 후보가 아닌 행은 지웁니다.
+REFRESH_SQL = """
+    WITH upserted AS (""" + FEED_INSERT_SQL + """
+        WHERE p.id IN ({candidates_sql})
+        """ + FEED_UPSERT_SUFFIX + """
+        RETURNING post_id
+    )
+    DELETE FROM home_feed AS f
+    WHERE f.ranking = :ranking AND f.post_id NOT IN (SELECT post_id FROM upserted)
+"""
+
+FEED_LOCK_SQL = text("SELECT pg_advisory_xact_lock(:lock_id)")
+DROP_DISABLED_SQL = text("DELETE FROM home_feed WHERE ranking <> ALL(CAST(:rankings AS text[]))")
+POST_COUNT_DELTA_SQL = text("""
+    UPDATE home_feed_meta SET value = value + :delta, updated_at = now() WHERE name = 'post_count'
+""")
+POST_COUNT_RESET_SQL = text(f"""
+    INSERT INTO home_feed_meta (name, value)
+    SELECT 'post_count', COUNT(*) FROM posts {PLAN_CHECK_ALLOW_SEQ_SCAN}
+    ON CONFLICT (name) DO UPDATE SET value = EXCLUDED.value, updated_at = now()
+""")
+
+# 한 페이지(+1행)와 피드 행 수/게시글 수를 한 문장으로 읽습니다. (피드가 비어 있어도 m 한 행은 반환)
+PAGE_SQL = """
+    SELECT m.feed_rows, m.post_count, page.post_id, page.user_id, page.key, page.payload
+    FROM (SELECT (SELECT COUNT(*) FROM home_feed WHERE ranking = :ranking) AS feed_rows,
+                 (SELECT value FROM home_feed_meta WHERE name = 'post_count') AS post_count) AS m
+    LEFT JOIN LATERAL (
+        SELECT f.post_id, f.user_id, f.{key_column} AS key,
+               CAST((f.payload - CAST(:drop_keys AS text[])){liked_sql} AS text) AS payload
+        FROM home_feed AS f
+        WHERE f.ranking = :ranking {cursor_condition}
+        ORDER BY f.{key_column} DESC, f.post_id DESC
+        LIMIT :limit OFFSET :offset
+    ) AS page ON TRUE
+    ORDER BY page.key DESC, page.post_id DESC
+"""
+LIKED_BY_ME_SQL = """ || jsonb_build_object('liked_by_me', (:viewer_id IS NOT NULL AND EXISTS (
+            SELECT 1 FROM likes AS lv WHERE lv.user_id = :viewer_id AND lv.post_id = f.post_id)))"""
+
+# payloads: 게시글 JSON 텍스트 목록 / post_ids, user_ids: 캐시 태그용
+# next_key: 다음 페이지가 있으면 (정렬 키, post_id), 없으면 None / post_count: 전체 게시글 수
+FeedPage = namedtuple('FeedPage', ['payloads', 'post_ids', 'user_ids', 'next_key', 'post_count'])
+
+
+class HomeFeed:
+    def __init__(self, engine, rankings=('recent', 'top'), size=200, hot_hours=48, flush_interval_ms=200,
+                 refresh_seconds=60, on_refresh=None):
+        self.engine = engine
+        self.rankings = [RANKINGS[name] for name in rankings]
+        self.size = size
+        self.hot_hours = hot_hours
+        self.flush_interval = flush_interval_ms / 1000
+        self.refresh_seconds = refresh_seconds
+        self.on_refresh = on_refresh  # on_refresh(태그 목록) — 목록 응답 캐시 무효화용
+        self._sql = {ranking.name: self._build_sql(ranking) for ranking in self.rankings}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._post_ids = set()
+        self._user_ids = set()
+        self._image_urls = set()
+        self._count_delta = 0
+        self._dirty = False
+        self._closed = False
+        self.marks = 0
+        self.flushes = 0
+        self.refreshes = 0
+        self.errors = 0
+        self.last_flush_ms = None
+        self.last_refresh_ms = None
+        self._thread = None
+        self._thread_lock = threading.Lock()
+
+    def _build_sql(self, ranking):
+        names = dict(ranking._asdict(), payload_sql=FEED_PAYLOAD_SQL, source_sql=FEED_SOURCE_SQL,
+                     trim_extra="OR f.sort_key <= 0" if ranking.bounded else "")
+        return {name: text(sql.format(**names)) for name, sql in (
+            ('update', UPDATE_CHANGED_SQL), ('repair', REPAIR_SQL), ('trim', TRIM_SQL), ('refresh', REFRESH_SQL))}
+
+    def ranking(self, name):
+        return next((ranking for ranking in self.rankings if ranking.name == name), None)
+
+    # 요청한 필드를 모두 피드에서 만들 수 있는지 (content 등은 직접 조회)
+    def serves(self, fields):
+        return all(field in FEED_FIELDS or field == 'liked_by_me' for field in fields)
+
+    # 갱신 스레드는 첫 mark() 때 시작합니다. (쓰기 API를 처리하지 않는 jobs-worker 등에서는 띄우지 않음)
+    def _ensure_thread(self):
+        if self._thread is None:
+            with self._thread_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='home-feed', daemon=True)
+                    self._thread.start()
+
+    # 쓰기 API가 커밋한 뒤 호출: 바뀐 게시글 / 닉네임·아바타가 바뀐 작성자 / 파생본이 생긴 이미지 URL / 게시글 수 증감
+    def mark(self, post_ids=(), user_ids=(), image_urls=(), count_delta=0):
+        self._ensure_thread()
+        with self._lock:
+            self._post_ids.update(post_ids)
+            self._user_ids.update(user_ids)
+            self._image_urls.update(image_urls)
+            self._count_delta += count_delta
+            self._dirty = True
+            self.marks += 1
+
+    # 표시된 변경을 한 트랜잭션으로 반영합니다. 반환값: 반영 여부
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                if not self._dirty:
+                    return False
+                post_ids, user_ids, image_urls = sorted(self._post_ids), sorted(self._user_ids), sorted(self._image_urls)
+                count_delta = self._count_delta
+                self._post_ids, self._user_ids, self._image_urls = set(), set(), set()
+                self._count_delta = 0
+                self._dirty = False
+            # 바뀐 글/작성자의 응답과, 구성(추가/삭제)이나 순서가 바뀐 ranking의 목록 응답을 무효화합니다.
+            # (recent는 좋아요 수가 바뀌어도 순서가 같으므로 글 태그만, 이미지 파생본/게시글 수는 모든 목록)
+            tags = {f"post:{post_id}" for post_id in post_ids} | {f"user:{user_id}" for user_id in user_ids}
+            if image_urls or count_delta:
+                tags.add('posts:list')
+            started = time.perf_counter()
+            try:
+                with self.engine.connect() as conn:
+                    conn.execute(FEED_LOCK_SQL, {"lock_id": FEED_LOCK_ID})
+                    for ranking in self.rankings:
+                        params = self._params(ranking, post_ids=post_ids, user_ids=user_ids, image_urls=image_urls)
+                        sql = self._sql[ranking.name]
+                        changed = False
+                        if post_ids or user_ids or image_urls:
+                            updated = conn.execute(sql['update'], params).fetchall()
+                            reordered = ranking.key_column != 'created_at'
+                            changed = any(row.inserted or reordered for row in updated)
+                        if ranking.repair:
+                            changed = conn.execute(sql['repair'], params).rowcount > 0 or changed
+                        changed = conn.execute(sql['trim'], params).rowcount > 0 or changed
+                        if changed:
+                            tags.add(f"posts:list:{ranking.name}")
+                    if count_delta:
+                        conn.execute(POST_COUNT_DELTA_SQL, {"delta": count_delta})
+                    conn.commit()
+            except Exception:
+                # 다음 주기에 다시 시도하도록 되돌려 놓습니다.
+                self.mark(post_ids, user_ids, image_urls, count_delta)
+                raise
+            with self._lock:
+                self.flushes += 1
+                self.last_flush_ms = round((time.perf_counter() - started) * 1000, 2)
+        if self.on_refresh is not None and tags:
+            self.on_refresh(sorted(tags))
+        return True
+
+    # 모든 ranking의 상위 N개와 게시글 수를 다시 맞춥니다. (주기 작업 / rebuild-feed)
+    def refresh(self):
+        started = time.perf_counter()
+        with self.engine.connect() as conn:
+            conn.execute(FEED_LOCK_SQL, {"lock_id": FEED_LOCK_ID})
+            conn.execute(DROP_DISABLED_SQL, {"rankings": [ranking.name for ranking in self.rankings]})
+            for ranking in self.rankings:
+                conn.execute(self._sql[ranking.name]['refresh'], self._params(ranking))
+            conn.execute(POST_COUNT_RESET_SQL)
+            conn.commit()
+        with self._lock:
+            self.refreshes += 1
+            self.last_refresh_ms = round((time.perf_counter() - started) * 1000, 2)
+        if self.on_refresh is not None:
+            self.on_refresh(['posts:list'])
+
+    # feed.refresh 작업 처리기 (같은 묶음에 여러 개가 있어도 한 번만 실행)
+    def handle(self, jobs):
+        self.refresh()
+
+    # 피드에서 한 페이지를 읽습니다. 피드 밖의 페이지이거나 아직 채워지지 않았으면 None (직접 조회로 대체)
+    # cursor: (정렬 키, post_id) / viewer_id: liked_by_me 계산용 (비로그인은 None)
+    def page(self, conn, ranking_name, fields, limit, offset=0, cursor=None, viewer_id=None):
+        ranking = self.ranking(ranking_name)
+        params = self._params(ranking, limit=limit + 1, offset=offset, viewer_id=viewer_id,
+                              drop_keys=[field for field in FEED_FIELDS if field not in fields and field != 'id'])
+        cursor_condition = ""
+        if cursor:
+            params["cursor_key"], params["cursor_id"] = cursor
+            cursor_condition = f"AND (f.{ranking.key_column}, f.post_id) < (:cursor_key, :cursor_id)"
+        sql = PAGE_SQL.format(key_column=ranking.key_column, cursor_condition=cursor_condition,
+                              liked_sql=LIKED_BY_ME_SQL if 'liked_by_me' in fields else "")
+        rows = conn.execute(text(sql), params).fetchall()
+        feed_rows, post_count = rows[0].feed_rows, rows[0].post_count
+        rows = [row for row in rows if row.post_id is not None]
+        if post_count is None:
+            return None
+        if len(rows) <= limit:
+            # 피드의 끝까지 읽었으면 피드가 전체 목록을 담고 있을 때만 마지막 페이지로 응답합니다.
+            if not (ranking.bounded or (feed_rows < self.size and feed_rows >= post_count)):
+                return None
+            next_key = None
+        else:
+            rows = rows[:limit]
+            key = rows[-1].key
+            next_key = (int(key) if ranking.cursor_type is int else key, rows[-1].post_id)
+        return FeedPage([row.payload for row in rows], [row.post_id for row in rows],
+                        [row.user_id for row in rows], next_key, post_count)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("home feed flush on close failed")
+
+    def stats(self):
+        with self._lock:
+            return {
+                'rankings': [ranking.name for ranking in self.rankings],
+                'size': self.size,
+                'hot_window_hours': self.hot_hours,
+                'flush_interval_ms': int(self.flush_interval * 1000),
+                'refresh_seconds': self.refresh_seconds,
+                'pending': {'post_ids': len(self._post_ids), 'user_ids': len(self._user_ids),
+                            'image_urls': len(self._image_urls), 'count_delta': self._count_delta},
+                'marks': self.marks,
+                'flushes': self.flushes,
+                'refreshes': self.refreshes,
+                'errors': self.errors,
+                'last_flush_ms': self.last_flush_ms,
+                'last_refresh_ms': self.last_refresh_ms,
+            }
+
+    def _params(self, ranking, **params):
+        return dict(params, ranking=ranking.name, size=self.size, last_index=self.size - 1, hot_hours=self.hot_hours,
+                    post_ids=params.get('post_ids', []), user_ids=params.get('user_ids', []),
+                    image_urls=params.get('image_urls', []))
+
+    def _run(self):
+        while not self._closed:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception:
+                with self._lock:
+                    self.errors += 1
+                logger.exception("home feed flush failed")
+
+
+# FEED_ENABLED=1일 때만 HomeFeed를 만듭니다. (그 외에는 None — 목록 API는 항상 직접 조회)
+def create_home_feed(engine, environ, on_refresh=None):
+    if environ.get("FEED_ENABLED", "0") != "1":
+        return None
+    rankings = ['recent', 'top'] + (['hot'] if environ.get("FEED_HOT", "0") == "1" else [])
+    feed = HomeFeed(
+        engine,
+        rankings=rankings,
+        size=int(environ.get("FEED_SIZE", 200)),
+        hot_hours=int(environ.get("FEED_HOT_WINDOW_HOURS", 48)),
+        flush_interval_ms=int(environ.get("FEED_FLUSH_INTERVAL_MS", 200)),
+        refresh_seconds=float(environ.get("FEED_REFRESH_SECONDS", 60)),
+        on_refresh=on_refresh,
+    )
+    atexit.register(feed.close)
+    return feed
@@ -0,0 +1,47 @@
+# gunicorn 설정: gunicorn -c gunicorn.conf.py app:app
+# - SERVING_MODE=sync(기본): 동기 워커, 워커 수 = 동시에 처리하는 요청 수
+# - SERVING_MODE=async: gevent 워커, 워커마다 WORKER_CONNECTIONS개 요청을 동시에 처리 (serving.py 참고)
+# 두 모드의 비교는 bench/bench_serving.py로 같은 WEB_CONCURRENCY(= 비슷한 메모리)에서 측정합니다.
+#
+# - PRELOAD_APP=1: 마스터에서 app을 한 번 임포트하고 워커는 fork로 물려받습니다. (워커 부팅 시간/메모리 절약)
+#   프로세스마다 따로 있어야 하는 자원(DB 연결 풀, Storage HTTP 클라이언트, 백그라운드 스레드, 실행기)은
+#   모든 모듈에서 임포트 시점이 아니라 처음 사용할 때 만듭니다. 스레드와 연결은 fork로 복제되지 않으므로,
+#   이렇게 해야 마스터에서 임포트해도 각 워커가 자기 것을 새로 만듭니다.
+#   혹시 마스터에서 만들어진 연결은 post_fork에서 버립니다. (app.reset_after_fork)
+#   gevent의 monkey patch는 워커에서 적용되므로 SERVING_MODE=async와는 함께 쓰지 않습니다.
+# - 읽기 복제본(DATABASE_REPLICA_URLS)을 쓰면서 워커가 2개 이상이면 REPLICA_STICKY_REDIS_URL이 필요합니다.
+#   (read-your-writes 기록이 워커 메모리에 있으면 다른 워커가 쓴 사용자의 조회가 지연된 복제본으로 갑니다 — replicas.py)
+# - STARTUP_WARM=1: 워커가 요청을 받기 전에 DB 연결을 하나 열어 둡니다. (app.warm_up, 첫 응답 지연 감소)
+# 시작 시간 비교는 bench/bench_startup.py로 측정합니다.
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 4000)}"
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+timeout = int(os.environ.get("WORKER_TIMEOUT", 60))
+async_mode = os.environ.get("SERVING_MODE") == 'async'
+preload_app = os.environ.get("PRELOAD_APP") == "1" and not async_mode
+startup_warm = os.environ.get("STARTUP_WARM") == "1"
+
+uses_replicas = bool(os.environ.get("DATABASE_REPLICA_URLS", "").strip())
+if workers > 1 and uses_replicas and not os.environ.get("REPLICA_STICKY_REDIS_URL"):
+    raise RuntimeError("DATABASE_REPLICA_URLS와 WEB_CONCURRENCY>1을 함께 쓰려면 REPLICA_STICKY_REDIS_URL이 필요합니다. "
+                       "(워커 메모리의 read-your-writes 기록은 다른 워커에 보이지 않음)")
+
+if async_mode:
+    worker_class = 'gevent'
+    worker_connections = int(os.environ.get("WORKER_CONNECTIONS", 100))
+
+
+def post_fork(server, worker):
+    if preload_app:
+        from app import reset_after_fork
+        reset_after_fork()
+
+
+def post_worker_init(worker):
+    if async_mode:
+        from serving import patch_for_gevent
+        patch_for_gevent()
+    if startup_warm:
+        from app import warm_up
+        warm_up()
@@ -0,0 +1,155 @@
+# --- 업로드 이미지 파생본(썸네일/WebP) 생성 워커 풀 ---
+# 업로드 API는 원본만 저장하고 바로 응답하며, 크기 조정/재인코딩은 이 풀에서 요청 스레드 밖에서 처리합니다.
+# 원본을 Storage에서 다시 내려받아 아래 VARIANT_SPECS의 파생본을 WebP로 만들고 같은 버킷에 올린 뒤,
+# on_complete(원본 URL, {이름: URL}) 콜백으로 결과를 알립니다. (app.py가 image_variants 테이블에 기록)
+# 대기열이 가득 차면 작업을 버리고 rejected로 집계합니다. (원본은 그대로 사용할 수 있으므로)
+#
+# 환경 변수
+# - IMAGE_WORKERS (기본 2): 동시에 처리할 이미지 수
+# - IMAGE_MAX_PENDING (기본 32): 실행 중 + 대기 중 작업의 최대 개수
+# - IMAGE_WEBP_QUALITY (기본 80)
+import io
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from serving import run_cpu_bound
+
+logger = logging.getLogger(__name__)
+
+# (이름, 최대 가로/세로 픽셀) — None이면 원본 크기 그대로 WebP로 재인코딩
+VARIANT_SPECS = (
+    ('thumb', 160),
+    ('medium', 800),
+    ('webp', None),
+)
+
+# 압축 폭탄 방지: 업로드 크기 제한(기본 5MB) 안에서 현실적인 최대 픽셀 수
+MAX_IMAGE_PIXELS = 40_000_000
+
+
+# Pillow는 파생본을 처음 만들 때 임포트합니다. (앱 임포트 시간 단축)
+def _pillow():
+    from PIL import Image, ImageOps
+
+    Image.MAX_IMAGE_PIXELS = MAX_IMAGE_PIXELS
+    return Image, ImageOps
+
+
+# 원본 경로(예: 12/uuid.png)에서 파생본 경로(12/uuid_thumb.webp)를 만듭니다.
+def variant_path(path, name):
+    stem = path.rsplit('.', 1)[0] if '.' in path.rsplit('/', 1)[-1] else path
+    return f"{stem}_{name}.webp"
+
+
+# variant_path로 만든 파생본 경로인지 확인합니다. (고아 객체 정리에서 원본만 확인하도록 — jobs.py)
+def is_variant_path(path):
+    return any(path.endswith(f"_{name}.webp") for name, _ in VARIANT_SPECS)
+
+
+# 원본 바이트로 파생본을 인코딩합니다. 반환값: [(이름, WebP 바이트)]
+def render_variants(data, quality=80, specs=VARIANT_SPECS):
+    Image, ImageOps = _pillow()
+    with Image.open(io.BytesIO(data)) as original:
+        image = ImageOps.exif_transpose(original)  # 휴대폰 사진의 회전 정보 반영
+        image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+    rendered = []
+    for name, max_size in specs:
+        variant = image.copy()
+        if max_size is not None:
+            variant.thumbnail((max_size, max_size), Image.LANCZOS)  # 원본보다 크게 만들지는 않음
+        buffer = io.BytesIO()
+        variant.save(buffer, format='WEBP', quality=quality, method=4)
+        rendered.append((name, buffer.getvalue()))
+    return rendered
+
+
+class ImageProcessor:
+    def __init__(self, storage, on_complete, workers=2, max_pending=32, quality=80):
+        self.storage = storage
+        self.on_complete = on_complete
+        self.workers = workers
+        self.max_pending = max_pending
+        self.quality = quality
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    # 파생본 실행기는 첫 업로드 때 만듭니다. (이미지를 받지 않는 워커는 스레드를 띄우지 않음)
+    def _get_executor(self):
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='image')
+        return self._executor
+
+    # 파생본 생성 작업을 예약합니다. 대기열이 가득 차면 False를 반환합니다. (요청 스레드는 기다리지 않음)
+    def submit(self, bucket, path, context=None):
+        if not self._slots.acquire(blocking=False):
+            with self._stats_lock:
+                self.rejected += 1
+            return False
+        with self._stats_lock:
+            self.pending += 1
+        try:
+            self._get_executor().submit(self._process, bucket, path, context)
+        except Exception:
+            self._finish(failed=True)
+            raise
+        return True
+
+    def _process(self, bucket, path, context):
+        failed = False
+        try:
+            original = self.storage.download(bucket, path)
+            variants = {}
+            for name, data in run_cpu_bound(render_variants, original, self.quality):
+                target = variant_path(path, name)
+                self.storage.upload(bucket, target, data, 'image/webp')
+                variants[name] = self.storage.get_public_url(bucket, target)
+            self.on_complete(self.storage.get_public_url(bucket, path), variants, context)
+        except Exception:
+            failed = True
+            logger.exception("Error in image variants (%s/%s)", bucket, path)
+        finally:
+            self._finish(failed)
+
+    def _finish(self, failed):
+        with self._stats_lock:
+            self.pending -= 1
+            if failed:
+                self.failed += 1
+            else:
+                self.completed += 1
+        self._slots.release()
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                'workers': self.workers,
+                'max_pending': self.max_pending,
+                'pending': self.pending,
+                'completed': self.completed,
+                'failed': self.failed,
+                'rejected': self.rejected,
+            }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+
+# 환경 변수 설정으로 ImageProcessor를 만듭니다.
+def create_image_processor(storage, on_complete, environ):
+    return ImageProcessor(
+        storage,
+        on_complete,
+        workers=int(environ.get("IMAGE_WORKERS", 2)),
+        max_pending=int(environ.get("IMAGE_MAX_PENDING", 32)),
+        quality=int(environ.get("IMAGE_WEBP_QUALITY", 80)),
+    )
@@ -0,0 +1,353 @@
+# --- 백그라운드 작업 대기열 (DB 기반, migrations/0007_jobs.sql) ---
+# Storage 삭제처럼 느리고 실패할 수 있는 부수 작업은 요청 안에서 실행하지 않고, DB 변경과 같은 트랜잭션에서
+# jobs 테이블에 넣은 뒤 바로 응답합니다. 별도 워커 프로세스가 실행합니다:
+#   flask --app app jobs-worker   (여러 개 실행 가능, 작업은 FOR UPDATE SKIP LOCKED로 나눠 가져감)
+#
+# - 실패한 작업은 지수 백오프(JOBS_BACKOFF_SECONDS × 2^(시도-1), 최대 JOBS_BACKOFF_MAX_SECONDS)로 다시 실행하고,
+#   max_attempts(기본 8)를 넘으면 dead로 남깁니다. (/internal/jobs에서 확인)
+# - 가져간 작업은 JOBS_LEASE_SECONDS(기본 300) 동안 잠기며, 그 안에 끝내지 못하면(워커 종료) 다른 워커가 다시 실행합니다.
+#   따라서 작업 처리기는 여러 번 실행되어도 안전해야 합니다. (Storage 삭제는 없는 객체를 지워도 성공)
+# - 같은 종류의 작업은 JOBS_BATCH(기본 20)개씩 묶어 처리기 한 번에 넘깁니다. (Storage 삭제 요청을 버킷별로 합침)
+#
+# 고아 객체 정리 (storage.sweep)
+#   워커가 ORPHAN_SWEEP_INTERVAL_MINUTES(기본 60)마다 avatars/post_images 버킷을 훑어, 올린 지
+#   ORPHAN_GRACE_HOURS(기본 72 — 글 작성 전 임시 저장된 이미지 보호)가 지났는데 posts.image_url/users.avatar_url 어디에서도
+#   쓰지 않는 원본을 파생본과 함께 삭제 작업으로 넣습니다. ORPHAN_SWEEP_BATCH(기본 500)개씩 확인합니다.
+#   파생본 파일은 image_variants 기록으로 원본과 함께 처리하므로 목록에서는 건너뜁니다.
+#
+# 홈 피드 주기 갱신 (feed.refresh, FEED_ENABLED=1일 때)
+#   FEED_REFRESH_SECONDS(기본 60)마다 ranking별 상위 게시글과 게시글 수를 다시 맞춥니다. (feed.py 참고)
+import json
+import random
+import logging
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+
+from feed import FEED_REFRESH
+
+logger = logging.getLogger(__name__)
+
+STORAGE_REMOVE = 'storage.remove'  # payload: {"bucket": ..., "urls": [공개 URL, ...]}
+STORAGE_SWEEP = 'storage.sweep'  # payload: {"bucket": ...}
+ORPHAN_BUCKETS = ('avatars', 'post_images')
+STORAGE_REMOVE_BATCH = 1000  # Storage 삭제 API 한 번에 보낼 경로 수
+
+Job = namedtuple('Job', ['id', 'kind', 'payload', 'attempts', 'max_attempts'])
+
+ENQUEUE_SQL = text("""
+    INSERT INTO jobs (kind, payload, dedupe_key, run_at, max_attempts)
+    VALUES (:kind, CAST(:payload AS jsonb), :dedupe_key, now() + make_interval(secs => :delay), :max_attempts)
+    ON CONFLICT (dedupe_key) WHERE dead_at IS NULL DO NOTHING
+    RETURNING id
+""")
+
+CLAIM_SQL = text("""
+    UPDATE jobs SET attempts = attempts + 1, locked_until = now() + make_interval(secs => :lease)
+    WHERE id IN (
+        SELECT id FROM jobs
+        WHERE dead_at IS NULL AND run_at <= now() AND (locked_until IS NULL OR locked_until < now())
+        ORDER BY run_at
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING id, kind, payload, attempts, max_attempts
+""")
+
+COMPLETE_SQL = text("DELETE FROM jobs WHERE id = ANY(CAST(:ids AS bigint[]))")
+
+FAIL_SQL = text("""
+    UPDATE jobs SET
+        locked_until = NULL,
+        last_error = :error,
+        run_at = CASE WHEN attempts >= max_attempts THEN run_at ELSE now() + make_interval(secs => :delay) END,
+        dead_at = CASE WHEN attempts >= max_attempts THEN now() END
+    WHERE id = :id
+""")
+
+STATS_SQL = text("""
+    SELECT kind,
+           COUNT(*) FILTER (WHERE dead_at IS NULL AND run_at <= now()
+                            AND (locked_until IS NULL OR locked_until < now())) AS ready,
+           COUNT(*) FILTER (WHERE dead_at IS NULL AND locked_until >= now()) AS running,
+           COUNT(*) FILTER (WHERE dead_at IS NULL AND run_at > now() AND locked_until IS NULL) AS scheduled,
+           COUNT(*) FILTER (WHERE dead_at IS NOT NULL) AS dead,
+           EXTRACT(EPOCH FROM now() - MIN(run_at) FILTER (WHERE dead_at IS NULL AND run_at <= now()))
+               AS oldest_ready_seconds
+    FROM jobs
+    GROUP BY kind
+    ORDER BY kind
+""")
+
+# 목록에서 가져온 URL 중 어디에서도 쓰지 않는 원본을 골라, 파생본 기록을 지우고 삭제 작업을 넣습니다. (한 문장)
+SWEEP_ORPHANS_SQL = text("""
+    WITH orphans AS (
+        SELECT t.url FROM unnest(CAST(:urls AS text[])) AS t (url)
+        WHERE NOT EXISTS (SELECT 1 FROM posts WHERE image_url = t.url)
+          AND NOT EXISTS (SELECT 1 FROM users WHERE avatar_url = t.url)
+    ), removed AS (
+        DELETE FROM image_variants WHERE original_url IN (SELECT url FROM orphans)
+        RETURNING variants
+    ), urls AS (
+        SELECT to_jsonb(url) AS url FROM orphans
+        UNION ALL
+        SELECT e.value FROM removed, jsonb_each(removed.variants) AS e
+    )
+    INSERT INTO jobs (kind, payload)
+    SELECT :kind, jsonb_build_object('bucket', CAST(:bucket AS text), 'urls', jsonb_agg(url))
+    FROM urls
+    HAVING COUNT(*) > 0
+    RETURNING jsonb_array_length(payload->'urls') AS url_count
+""")
+
+# 원본이 이미 지워졌거나 교체된 뒤 늦게 기록된 파생본(image_variants) 정리
+SWEEP_STALE_VARIANTS_SQL = text("""
+    WITH stale AS (
+        DELETE FROM image_variants AS iv
+        WHERE iv.original_url LIKE :url_prefix AND iv.created_at < :cutoff
+          AND NOT EXISTS (SELECT 1 FROM posts WHERE image_url = iv.original_url)
+          AND NOT EXISTS (SELECT 1 FROM users WHERE avatar_url = iv.original_url)
+        RETURNING iv.original_url, iv.variants
+    ), urls AS (
+        SELECT to_jsonb(original_url) AS url FROM stale
+        UNION ALL
+        SELECT e.value FROM stale, jsonb_each(stale.variants) AS e
+    )
+    INSERT INTO jobs (kind, payload)
+    SELECT :kind, jsonb_build_object('bucket', CAST(:bucket AS text), 'urls', jsonb_agg(url))
+    FROM urls
+    HAVING COUNT(*) > 0
+    RETURNING jsonb_array_length(payload->'urls') AS url_count
+""")
+
+
+class JobQueue:
+    def __init__(self, engine, lease_seconds=300, backoff_seconds=10, backoff_max_seconds=3600, max_attempts=8):
+        self.engine = engine
+        self.lease_seconds = lease_seconds
+        self.backoff_seconds = backoff_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.max_attempts = max_attempts
+
+    # 작업을 넣습니다. conn을 주면 호출하는 쪽 트랜잭션에 포함됩니다. (commit은 호출하는 쪽에서)
+    # dedupe_key가 같은 작업이 이미 있으면 넣지 않고 None을 반환합니다.
+    def enqueue(self, kind, payload, conn=None, delay_seconds=0, dedupe_key=None, max_attempts=None):
+        params = {"kind": kind, "payload": json.dumps(payload), "dedupe_key": dedupe_key,
+                  "delay": delay_seconds, "max_attempts": max_attempts or self.max_attempts}
+        if conn is not None:
+            return conn.execute(ENQUEUE_SQL, params).scalar()
+        with self.engine.connect() as own_conn:
+            job_id = own_conn.execute(ENQUEUE_SQL, params).scalar()
+            own_conn.commit()
+        return job_id
+
+    def claim(self, limit):
+        with self.engine.connect() as conn:
+            rows = conn.execute(CLAIM_SQL, {"lease": self.lease_seconds, "limit": limit}).fetchall()
+            conn.commit()
+        return [Job(row.id, row.kind, row.payload, row.attempts, row.max_attempts) for row in rows]
+
+    def complete(self, jobs):
+        with self.engine.connect() as conn:
+            conn.execute(COMPLETE_SQL, {"ids": [job.id for job in jobs]})
+            conn.commit()
+
+    def fail(self, jobs, error):
+        with self.engine.connect() as conn:
+            conn.execute(FAIL_SQL, [{"id": job.id, "error": error[:2000], "delay": self.backoff(job.attempts)}
+                                    for job in jobs])
+            conn.commit()
+
+    # 다음 시도까지 기다릴 시간(초): 지수 백오프 + 지터 (같은 시각에 실패한 작업이 한꺼번에 재시도되지 않도록)
+    def backoff(self, attempts):
+        delay = min(self.backoff_max_seconds, self.backoff_seconds * 2 ** max(attempts - 1, 0))
+        return delay * random.uniform(0.5, 1.0)
+
+    def stats(self):
+        with self.engine.connect() as conn:
+            rows = conn.execute(STATS_SQL).fetchall()
+        return {row.kind: {
+            'ready': row.ready,
+            'running': row.running,
+            'scheduled': row.scheduled,
+            'dead': row.dead,
+            'oldest_ready_seconds': float(row.oldest_ready_seconds) if row.oldest_ready_seconds is not None else None,
+        } for row in rows}
+
+
+class JobWorker:
+    # handlers: {kind: handler(jobs)} — 같은 종류의 작업 목록을 한 번에 처리하고, 예외가 나면 모두 재시도
+    # schedules: [(kind, payload, dedupe_key, 간격 초)] — 주기 작업 (이전 작업이 끝나면 다음 실행을 예약)
+    def __init__(self, queue, handlers, batch_size=20, poll_interval=2, schedules=(), log=logger.warning):
+        self.queue = queue
+        self.handlers = handlers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.schedules = list(schedules)
+        self.log = log
+        self.stopped = False
+        self._next_schedule_check = 0
+
+    def run(self):
+        while not self.stopped:
+            try:
+                self.schedule_periodic()
+                processed = self.run_once()
+            except Exception:
+                logger.exception("job worker error")
+                processed = 0
+            if not processed:
+                time.sleep(self.poll_interval)
+
+    def stop(self, *args):
+        self.stopped = True
+
+    # 준비된 작업을 한 묶음 가져와 처리합니다. 반환값: 처리한 작업 수
+    def run_once(self):
+        jobs = self.queue.claim(self.batch_size)
+        groups = {}
+        for job in jobs:
+            groups.setdefault(job.kind, []).append(job)
+        for kind, group in groups.items():
+            handler = self.handlers.get(kind)
+            try:
+                if handler is None:
+                    raise LookupError(f"처리기가 없는 작업 종류: {kind}")
+                handler(group)
+            except Exception as e:
+                self.log(f"{kind} job failed ({[job.id for job in group]}): {e}")
+                self.queue.fail(group, f"{type(e).__name__}: {e}")
+            else:
+                self.queue.complete(group)
+        return len(jobs)
+
+    # 주기 작업이 대기열에 없으면 간격만큼 뒤로 예약합니다. (dedupe_key로 워커가 여러 개여도 하나만 존재)
+    def schedule_periodic(self):
+        if not self.schedules or time.monotonic() < self._next_schedule_check:
+            return
+        self._next_schedule_check = time.monotonic() + 60
+        with self.queue.engine.connect() as conn:
+            for kind, payload, dedupe_key, interval in self.schedules:
+                self.queue.enqueue(kind, payload, conn=conn, delay_seconds=interval, dedupe_key=dedupe_key)
+            conn.commit()
+
+
+# storage.remove 처리기: 작업들의 URL을 버킷별로 모아 Storage 삭제 API를 묶어서 호출합니다.
+def remove_storage_objects(storage):
+    def handle(jobs):
+        by_bucket = {}
+        for job in jobs:
+            by_bucket.setdefault(job.payload['bucket'], []).extend(job.payload['urls'])
+        for bucket, urls in by_bucket.items():
+            paths = [storage.path_from_public_url(bucket, url) for url in urls]
+            for start in range(0, len(paths), STORAGE_REMOVE_BATCH):
+                storage.remove(bucket, paths[start:start + STORAGE_REMOVE_BATCH])
+    return handle
+
+
+class OrphanSweeper:
+    # is_variant_path(path): 파생본 파일이면 True (목록에서 건너뜀 — images.py 참고)
+    def __init__(self, engine, storage, grace_hours=72, batch_size=500, is_variant_path=None, log=logger.info):
+        self.engine = engine
+        self.storage = storage
+        self.grace = timedelta(hours=grace_hours)
+        self.batch_size = batch_size
+        self.is_variant_path = is_variant_path or (lambda path: False)
+        self.log = log
+
+    # storage.sweep 처리기
+    def handle(self, jobs):
+        for job in jobs:
+            self.sweep(job.payload['bucket'])
+
+    # 버킷 하나를 훑어 고아 객체 삭제 작업을 넣습니다. 반환값: (확인한 원본 수, 삭제 예약한 URL 수)
+    def sweep(self, bucket):
+        cutoff = datetime.now(timezone.utc) - self.grace
+        scanned = queued = 0
+        batch = []
+        for path, created_at in self.iter_objects(bucket):
+            if self.is_variant_path(path) or created_at is None or created_at >= cutoff:
+                continue
+            batch.append(self.storage.get_public_url(bucket, path))
+            if len(batch) >= self.batch_size:
+                scanned += len(batch)
+                queued += self._enqueue_orphans(bucket, batch)
+                batch = []
+        if batch:
+            scanned += len(batch)
+            queued += self._enqueue_orphans(bucket, batch)
+
+        with self.engine.connect() as conn:
+            stale = conn.execute(SWEEP_STALE_VARIANTS_SQL, {
+                "kind": STORAGE_REMOVE, "bucket": bucket, "cutoff": cutoff,
+                "url_prefix": self.storage.get_public_url(bucket, '') + '%',
+            }).scalar() or 0
+            conn.commit()
+        self.log(f"orphan sweep {bucket}: {scanned} objects checked, {queued + stale} urls queued for removal")
+        return scanned, queued + stale
+
+    # 버킷의 (경로, 업로드 시각)을 폴더(사용자 id)별로 페이지 단위 조회합니다.
+    def iter_objects(self, bucket, prefix=''):
+        offset = 0
+        while True:
+            items = self.storage.list(bucket, prefix, limit=STORAGE_REMOVE_BATCH, offset=offset)
+            for item in items:
+                path = f"{prefix}{item['name']}"
+                if item.get('id') is None:  # 폴더
+                    yield from self.iter_objects(bucket, path + '/')
+                else:
+                    created_at = item.get('created_at')
+                    yield path, datetime.fromisoformat(created_at.replace('Z', '+00:00')) if created_at else None
+            if len(items) < STORAGE_REMOVE_BATCH:
+                return
+            offset += STORAGE_REMOVE_BATCH
+
+    def _enqueue_orphans(self, bucket, urls):
+        with self.engine.connect() as conn:
+            queued = conn.execute(SWEEP_ORPHANS_SQL, {"kind": STORAGE_REMOVE, "bucket": bucket, "urls": urls}).scalar()
+            conn.commit()
+        return queued or 0
+
+
+def create_job_queue(engine, environ):
+    return JobQueue(
+        engine,
+        lease_seconds=int(environ.get("JOBS_LEASE_SECONDS", 300)),
+        backoff_seconds=float(environ.get("JOBS_BACKOFF_SECONDS", 10)),
+        backoff_max_seconds=float(environ.get("JOBS_BACKOFF_MAX_SECONDS", 3600)),
+        max_attempts=int(environ.get("JOBS_MAX_ATTEMPTS", 8)),
+    )
+
+
+def create_orphan_sweeper(engine, storage, environ, is_variant_path=None, log=logger.info):
+    return OrphanSweeper(
+        engine,
+        storage,
+        grace_hours=float(environ.get("ORPHAN_GRACE_HOURS", 72)),
+        batch_size=int(environ.get("ORPHAN_SWEEP_BATCH", 500)),
+        is_variant_path=is_variant_path,
+        log=log,
+    )
+
+
+# 워커 프로세스용: Storage 삭제/고아 객체 정리 처리기와 버킷별 정리 주기를 등록한 JobWorker
+# feed: 홈 피드(feed.py의 HomeFeed)를 주면 feed.refresh 주기 작업도 실행합니다. (FEED_ENABLED=1일 때)
+def create_job_worker(queue, storage, sweeper, environ, feed=None, log=logger.warning):
+    interval = float(environ.get("ORPHAN_SWEEP_INTERVAL_MINUTES", 60)) * 60
+    schedules = [(STORAGE_SWEEP, {'bucket': bucket}, f"{STORAGE_SWEEP}:{bucket}", interval)
+                 for bucket in ORPHAN_BUCKETS] if interval > 0 else []
+    handlers = {STORAGE_REMOVE: remove_storage_objects(storage), STORAGE_SWEEP: sweeper.handle}
+    if feed is not None:
+        handlers[FEED_REFRESH] = feed.handle
+        if feed.refresh_seconds > 0:
+            schedules.append((FEED_REFRESH, {}, FEED_REFRESH, feed.refresh_seconds))
+    return JobWorker(
+        queue,
+        handlers,
+        batch_size=int(environ.get("JOBS_BATCH", 20)),
+        poll_interval=float(environ.get("JOBS_POLL_INTERVAL", 2)),
+        schedules=schedules,
+        log=log,
+    )
@@ -0,0 +1,271 @@
+# --- 좋아요 쓰기 지연(write-behind) ---
+# 인기 글에 좋아요가 몰리면 요청마다 한 행짜리 INSERT/DELETE + like_count UPDATE 트랜잭션이 실행되어
+# 같은 posts 행과 likes 인덱스 페이지를 두고 경합합니다.
+# LIKE_WRITE_BEHIND=1이면 좋아요/취소를 메모리 대기열에 모아 두었다가 묶어서 반영합니다.
+#
+# - 응답 코드(201/409/404)는 그대로 유지: 요청 시점의 상태(대기 중인 이벤트 → 반영 중인 배치 → DB 순)를 확인해
+#   이미 누른 좋아요는 409, 없는 좋아요 취소는 404로 바로 응답합니다. (상태 확인은 인덱스만 읽는 SELECT 하나)
+# - 같은 (사용자, 게시글)의 반대 이벤트는 대기열 안에서 상쇄됩니다. (좋아요 후 바로 취소 → DB 쓰기 없음)
+# - LIKE_FLUSH_INTERVAL_MS(기본 200)마다 또는 대기 건수가 LIKE_FLUSH_BATCH(기본 500)에 이르면
+#   다중 행 INSERT ... ON CONFLICT DO NOTHING / DELETE ... USING과 게시글별 like_count 증감을 한 문장으로 반영합니다.
+# - 대기 건수가 LIKE_MAX_PENDING(기본 10000)에 이르면 요청 스레드에서 바로 반영한 뒤 받습니다. (메모리 상한)
+# - 종료 시(atexit, gunicorn의 정상 종료 포함) 남은 이벤트를 반영합니다. 프로세스가 강제 종료되면
+#   마지막 반영 이후 최대 LIKE_FLUSH_INTERVAL_MS 동안의 이벤트를 잃을 수 있습니다.
+#
+# 반영 전까지 목록 API의 like_count/liked_by_me는 이전 값입니다. 상세 API는 pending_like/pending_delta로 보정합니다.
+#
+# 응답 코드 규칙 (멱등)
+# - 409/404는 이 워커의 대기 상태나 DB가 "이미 그 상태"임을 확인했을 때만 반환합니다. 그 외에는 201/200으로 받습니다.
+# - 대기 상태는 워커마다 따로이므로, 다른 워커에 아직 반영되지 않은 이벤트가 있는 동안(최대 LIKE_FLUSH_INTERVAL_MS)
+#   같은 요청이 두 번 받아들여질 수 있습니다. 반영은 ON CONFLICT DO NOTHING / DELETE ... USING이라 중복은 무시되고,
+#   like_count는 실제로 바뀐 행만큼만 증감하므로 likes와 like_count는 항상 일치합니다.
+#   (같은 사용자가 반영 간격 안에 워커를 오가며 좋아요/취소를 반복하면 나중에 반영된 워커의 상태가 남습니다.)
+import atexit
+import logging
+import threading
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+LIKE_STATE_SQL = text("""
+    SELECT EXISTS (SELECT 1 FROM posts WHERE id = :post_id) AS post_exists,
+           EXISTS (SELECT 1 FROM likes WHERE user_id = :user_id AND post_id = :post_id) AS liked
+""")
+
+# 추가/삭제를 한 문장으로 반영하고, 실제로 바뀐 행만 like_count에 더합니다.
+# (같은 키가 추가와 삭제에 동시에 들어가지 않으므로 두 CTE는 서로 다른 행을 다룹니다.)
+FLUSH_SQL = text("""
+    WITH ins AS (
+        INSERT INTO likes (user_id, post_id)
+        SELECT t.user_id, t.post_id
+        FROM unnest(CAST(:add_users AS bigint[]), CAST(:add_posts AS bigint[])) AS t (user_id, post_id)
+        WHERE EXISTS (SELECT 1 FROM posts WHERE id = t.post_id)
+        ON CONFLICT (user_id, post_id) DO NOTHING
+        RETURNING post_id
+    ), del AS (
+        DELETE FROM likes AS l
+        USING unnest(CAST(:remove_users AS bigint[]), CAST(:remove_posts AS bigint[])) AS t (user_id, post_id)
+        WHERE l.user_id = t.user_id AND l.post_id = t.post_id
+        RETURNING l.post_id
+    ), delta AS (
+        SELECT post_id, SUM(change) AS change
+        FROM (SELECT post_id, 1 AS change FROM ins UNION ALL SELECT post_id, -1 FROM del) AS changes
+        GROUP BY post_id
+    )
+    UPDATE posts AS p SET like_count = p.like_count + delta.change
+    FROM delta
+    WHERE p.id = delta.post_id
+    RETURNING p.id
+""")
+
+
+class LikeWriter:
+    def __init__(self, engine, on_flush=None, flush_interval_ms=200, batch_size=500, max_pending=10000,
+                 log=logger.warning):
+        self.engine = engine
+        self.on_flush = on_flush  # on_flush(변경된 post_id 목록) — 캐시 무효화용
+        self.flush_interval = flush_interval_ms / 1000
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.log = log
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = {}  # {(user_id, post_id): [반영 전 DB 상태, 원하는 상태]} — 두 값이 같으면 항목 제거
+        self._flushing = {}  # {(user_id, post_id): 원하는 상태} — 반영 중인 배치
+        self._post_delta = {}  # {post_id: 대기/반영 중인 like_count 증감}
+        self._generation = 0  # 배치 반영이 끝날 때마다 증가
+        self._wake = threading.Event()
+        self._closed = False
+        self.accepted = 0
+        self.cancelled = 0
+        self.flushes = 0
+        self.sync_flushes = 0
+        self.written = 0
+        self.dropped = 0
+        self._thread = None
+        self._thread_lock = threading.Lock()
+
+    # 반영 스레드는 첫 이벤트 때 시작합니다. (대기열과 마찬가지로 워커마다 하나)
+    def _ensure_thread(self):
+        if self._thread is None:
+            with self._thread_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='like-writer', daemon=True)
+                    self._thread.start()
+
+    # 좋아요(like=True) 또는 취소(False)를 대기열에 넣습니다.
+    # 반환값: 'ok' | 'conflict'(이미 좋아요/게시글 없음) | 'not_found'(취소할 좋아요 없음)
+    def submit(self, user_id, post_id, like):
+        self._ensure_thread()
+        key = (user_id, post_id)
+        while True:
+            with self._lock:
+                known = self._known_state(key)
+                generation = self._generation
+                full = known is None and len(self._pending) >= self.max_pending
+                if full:
+                    self.sync_flushes += 1
+            if full:
+                self.flush()
+                continue
+            if known is None:
+                with self.engine.connect() as conn:
+                    state = conn.execute(LIKE_STATE_SQL, {"user_id": user_id, "post_id": post_id}).first()
+                post_exists, liked = state.post_exists, state.liked
+            else:
+                post_exists, liked = True, known
+
+            with self._lock:
+                # DB를 읽는 동안 같은 키가 대기열에 들어왔거나 배치가 반영되었으면 다시 확인합니다.
+                if known is None and (self._generation != generation or self._known_state(key) is not None):
+                    continue
+                if known is not None and self._known_state(key) != known:
+                    continue
+                if like and (not post_exists or liked):
+                    return 'conflict'
+                if not like and not liked:
+                    return 'not_found'
+                entry = self._pending.get(key)
+                if entry is None:
+                    self._pending[key] = [liked, like]
+                    self._add_delta(post_id, 1 if like else -1)
+                else:
+                    # 대기 중인 반대 이벤트와 상쇄 (원하는 상태가 반영 전 상태로 돌아옴)
+                    del self._pending[key]
+                    self._add_delta(post_id, 1 if like else -1)
+                    self.cancelled += 1
+                self.accepted += 1
+                if len(self._pending) >= self.batch_size:
+                    self._wake.set()
+                return 'ok'
+
+    # 대기/반영 중인 상태: 좋아요 여부(bool) 또는 없으면 None
+    def pending_like(self, user_id, post_id):
+        with self._lock:
+            return self._known_state((user_id, post_id))
+
+    # 아직 DB에 반영되지 않은 like_count 증감
+    def pending_delta(self, post_id):
+        with self._lock:
+            return self._post_delta.get(post_id, 0)
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                batch = self._pending
+                self._pending = {}
+                self._flushing = {key: desired for key, (_, desired) in batch.items()}
+            items = sorted(self._flushing.items())  # 워커 간 잠금 순서를 맞춰 교착을 피합니다.
+            changed = set()
+            try:
+                for start in range(0, len(items), self.batch_size):
+                    changed.update(self._write(items[start:start + self.batch_size]))
+            finally:
+                with self._lock:
+                    for (_, post_id), desired in items:
+                        self._add_delta(post_id, -1 if desired else 1)
+                    self._flushing = {}
+                    self._generation += 1
+                    self.flushes += 1
+            if changed and self.on_flush is not None:
+                self.on_flush(sorted(changed))
+            return len(items)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+        self.flush()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'pending': len(self._pending),
+                'flushing': len(self._flushing),
+                'max_pending': self.max_pending,
+                'flush_interval_ms': int(self.flush_interval * 1000),
+                'accepted': self.accepted,
+                'cancelled': self.cancelled,
+                'flushes': self.flushes,
+                'sync_flushes': self.sync_flushes,
+                'written': self.written,
+                'dropped': self.dropped,
+            }
+
+    # (lock을 잡은 상태에서만 호출)
+    def _known_state(self, key):
+        entry = self._pending.get(key)
+        if entry is not None:
+            return entry[1]
+        return self._flushing.get(key)
+
+    # (lock을 잡은 상태에서만 호출)
+    def _add_delta(self, post_id, change):
+        value = self._post_delta.get(post_id, 0) + change
+        if value:
+            self._post_delta[post_id] = value
+        else:
+            self._post_delta.pop(post_id, None)
+
+    def _execute(self, items):
+        adds = [key for key, desired in items if desired]
+        removes = [key for key, desired in items if not desired]
+        with self.engine.connect() as conn:
+            rows = conn.execute(FLUSH_SQL, {
+                "add_users": [u for u, _ in adds], "add_posts": [p for _, p in adds],
+                "remove_users": [u for u, _ in removes], "remove_posts": [p for _, p in removes],
+            }).fetchall()
+            conn.commit()
+        return [row.id for row in rows]
+
+    # 묶음 반영이 실패하면(예: 그 사이 사용자 삭제로 FK 위반) 한 건씩 다시 시도하고 실패한 이벤트는 버립니다.
+    def _write(self, items):
+        try:
+            changed = self._execute(items)
+            with self._lock:
+                self.written += len(items)
+            return changed
+        except Exception:
+            logger.exception("like batch failed, retrying %d events one by one", len(items))
+        changed = []
+        for item in items:
+            try:
+                changed.extend(self._execute([item]))
+                with self._lock:
+                    self.written += 1
+            except Exception as e:
+                with self._lock:
+                    self.dropped += 1
+                self.log(f"like event dropped {item}: {e}")
+        return changed
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("like writer flush failed")
+
+
+# LIKE_WRITE_BEHIND=1일 때만 LikeWriter를 만듭니다. (그 외에는 None — 요청마다 바로 반영)
+def create_like_writer(engine, environ, on_flush=None, log=logger.warning):
+    if environ.get("LIKE_WRITE_BEHIND", "0") != "1":
+        return None
+    writer = LikeWriter(
+        engine,
+        on_flush=on_flush,
+        flush_interval_ms=int(environ.get("LIKE_FLUSH_INTERVAL_MS", 200)),
+        batch_size=int(environ.get("LIKE_FLUSH_BATCH", 500)),
+        max_pending=int(environ.get("LIKE_MAX_PENDING", 10000)),
+        log=log,
+    )
+    atexit.register(writer.close)
+    return writer
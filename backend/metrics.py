@@ -0,0 +1,135 @@
+# --- 요청 성능 계측 ---
+# 요청마다 구간별 시간(db: SQL 실행, serialize: 행 변환/JSON 인코딩, storage: Storage API 호출)을
+# add_timing/timed로 g에 누적하고, 응답 시 Server-Timing 헤더로 내보냅니다. (app.py의 after_request)
+# 같은 값을 라우트별 히스토그램으로 집계해 /metrics에서 Prometheus 텍스트 형식으로 제공합니다.
+#
+# 집계는 워커 프로세스 단위이며 worker(pid) 라벨을 붙입니다. 여러 gunicorn 워커의 값은 Prometheus에서 합산합니다.
+# 요청 밖(이미지 워커 스레드 등)에서 호출된 add_timing은 무시됩니다.
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import g, has_request_context
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+TIMING_PHASES = ('db', 'serialize', 'storage')
+
+
+def add_timing(name, seconds):
+    if has_request_context():
+        timings = g.setdefault('timings', {})
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+@contextmanager
+def timed(name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_timing(name, time.perf_counter() - started)
+
+
+# Server-Timing 헤더 값: db;dur=12.3;desc="3 queries", serialize;dur=..., storage;dur=..., total;dur=...
+def server_timing_header(total, timings, query_count):
+    parts = []
+    for phase in TIMING_PHASES:
+        if phase in timings or (phase == 'db' and query_count):
+            entry = f"{phase};dur={timings.get(phase, 0.0) * 1000:.1f}"
+            if phase == 'db':
+                entry += f';desc="{query_count} queries"'
+            parts.append(entry)
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class RequestMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = {}  # {(route, method, status): 개수}
+        self.queries = {}  # {(route, method): 쿼리 수 합계}
+        self.durations = {}  # {(route, method, phase): Histogram}
+        self.slow_queries = 0
+
+    def observe_request(self, route, method, status, total, timings, query_count):
+        phases = [('total', total)] + [(phase, timings[phase]) for phase in TIMING_PHASES if phase in timings]
+        with self._lock:
+            key = (route, method, str(status))
+            self.requests[key] = self.requests.get(key, 0) + 1
+            self.queries[(route, method)] = self.queries.get((route, method), 0) + query_count
+            for phase, seconds in phases:
+                histogram = self.durations.get((route, method, phase))
+                if histogram is None:
+                    histogram = self.durations[(route, method, phase)] = Histogram()
+                histogram.observe(seconds)
+
+    def record_slow_query(self):
+        with self._lock:
+            self.slow_queries += 1
+
+    # Prometheus 텍스트 형식으로 변환합니다.
+    # extra: [(이름, 타입, 설명, 값)] — 커넥션 풀/캐시 같은 다른 모듈의 통계
+    def render(self, extra=()):
+        worker = os.getpid()  # fork 이후 워커의 pid (preload 시에도 정확하도록 매번 확인)
+        lines = [
+            "# HELP http_requests_total 처리한 요청 수",
+            "# TYPE http_requests_total counter",
+        ]
+        with self._lock:
+            for (route, method, status), count in sorted(self.requests.items()):
+                lines.append(f"http_requests_total{_labels(route=route, method=method, status=status, worker=worker)} {count}")
+
+            lines += [
+                "# HELP http_request_duration_seconds 요청 처리 시간 (phase=total|db|serialize|storage)",
+                "# TYPE http_request_duration_seconds histogram",
+            ]
+            for (route, method, phase), histogram in sorted(self.durations.items()):
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + ('+Inf',), histogram.counts):
+                    cumulative += count
+                    labels = _labels(route=route, method=method, phase=phase, worker=worker, le=bound)
+                    lines.append(f"http_request_duration_seconds_bucket{labels} {cumulative}")
+                labels = _labels(route=route, method=method, phase=phase, worker=worker)
+                lines.append(f"http_request_duration_seconds_sum{labels} {histogram.sum:.6f}")
+                lines.append(f"http_request_duration_seconds_count{labels} {histogram.count}")
+
+            lines += [
+                "# HELP db_queries_total 요청 처리 중 실행한 SQL 문 수",
+                "# TYPE db_queries_total counter",
+            ]
+            for (route, method), count in sorted(self.queries.items()):
+                lines.append(f"db_queries_total{_labels(route=route, method=method, worker=worker)} {count}")
+
+            lines += [
+                "# HELP db_slow_queries_total SLOW_QUERY_MS를 넘은 SQL 문 수",
+                "# TYPE db_slow_queries_total counter",
+                f"db_slow_queries_total{_labels(worker=worker)} {self.slow_queries}",
+            ]
+
+        for name, metric_type, help_text, value in extra:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}",
+                      f"{name}{_labels(worker=worker)} {value}"]
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,145 @@
+# --- 스키마 마이그레이션 ---
+# migrations/NNNN_이름.sql 파일을 번호 순서대로 한 번씩 적용하고 schema_migrations 테이블에 기록합니다.
+# (사용법: flask --app app migrate [--status] [--fake] [--target N])
+#
+# - 파일은 autocommit 연결에서 문장 단위로 실행합니다. CREATE INDEX CONCURRENTLY는 트랜잭션 밖에서만
+#   실행되므로, 여러 문장을 원자적으로 적용해야 하는 파일은 파일 안에 BEGIN; ... COMMIT;을 적습니다. (0001, 0004 참고)
+# - 모든 파일은 IF NOT EXISTS 등으로 다시 실행해도 안전하게 작성합니다.
+#   psql로 직접 적용해 온 DB도 그대로 migrate를 실행하면 되고, --fake는 실행 없이 적용 기록만 남깁니다.
+# - 적용 후 파일 내용이 바뀌면(checksum 불일치) status에 표시합니다. 이미 적용한 파일은 고치지 말고 새 파일을 추가합니다.
+# - 동시에 여러 곳에서 실행하지 않도록 advisory lock을 잡습니다.
+import hashlib
+import logging
+import os
+import re
+from collections import namedtuple
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+MIGRATION_LOCK_ID = 640_019  # pg_advisory_lock 키 (임의의 고정값)
+_FILENAME_RE = re.compile(r'^(\d{4})_(\w+)\.sql$')
+
+Migration = namedtuple('Migration', ['version', 'name', 'path', 'sql', 'checksum'])
+MigrationStatus = namedtuple('MigrationStatus', ['version', 'name', 'applied_at', 'checksum_changed'])
+
+
+def discover_migrations(directory=MIGRATIONS_DIR):
+    migrations = []
+    for filename in sorted(os.listdir(directory)):
+        match = _FILENAME_RE.match(filename)
+        if not match:
+            continue
+        path = os.path.join(directory, filename)
+        with open(path, encoding='utf-8') as f:
+            sql = f.read()
+        migrations.append(Migration(int(match.group(1)), match.group(2), path, sql,
+                                    hashlib.sha256(sql.encode('utf-8')).hexdigest()))
+    versions = [m.version for m in migrations]
+    if len(versions) != len(set(versions)):
+        raise ValueError(f"마이그레이션 번호가 중복되었습니다: {versions}")
+    return migrations
+
+
+# SQL을 문장 단위로 나눕니다. 주석(--, /* */)은 제거하고, 문자열('...')과 $태그$ 본문 안의 ';'는 구분자로 보지 않습니다.
+def split_statements(sql):
+    statements = []
+    current = []
+    i = 0
+    while i < len(sql):
+        ch = sql[i]
+        if sql.startswith('--', i):
+            end = sql.find('\n', i)
+            i = len(sql) if end == -1 else end
+            continue
+        if sql.startswith('/*', i):
+            end = sql.find('*/', i + 2)
+            i = len(sql) if end == -1 else end + 2
+            continue
+        if ch == "'":
+            end = i + 1
+            while True:
+                end = sql.find("'", end)
+                if end == -1 or not sql.startswith("''", end):
+                    break
+                end += 2
+            end = len(sql) if end == -1 else end + 1
+            current.append(sql[i:end])
+            i = end
+            continue
+        dollar = re.match(r'\$\w*\$', sql[i:])
+        if dollar:
+            tag = dollar.group(0)
+            end = sql.find(tag, i + len(tag))
+            end = len(sql) if end == -1 else end + len(tag)
+            current.append(sql[i:end])
+            i = end
+            continue
+        if ch == ';':
+            statement = ''.join(current).strip()
+            if statement:
+                statements.append(statement)
+            current = []
+        else:
+            current.append(ch)
+        i += 1
+    statement = ''.join(current).strip()
+    if statement:
+        statements.append(statement)
+    return statements
+
+
+def _ensure_table(conn):
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version integer PRIMARY KEY,
+            name text NOT NULL,
+            checksum text NOT NULL,
+            applied_at timestamptz NOT NULL DEFAULT now()
+        )
+    """))
+
+
+def _applied(conn):
+    rows = conn.execute(text("SELECT version, checksum, applied_at FROM schema_migrations")).fetchall()
+    return {row.version: row for row in rows}
+
+
+def status(engine, directory=MIGRATIONS_DIR):
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        _ensure_table(conn)
+        applied = _applied(conn)
+    result = []
+    for migration in discover_migrations(directory):
+        row = applied.get(migration.version)
+        result.append(MigrationStatus(migration.version, migration.name, row.applied_at if row else None,
+                                      bool(row) and row.checksum != migration.checksum))
+    return result
+
+
+# 적용되지 않은 마이그레이션을 target 번호까지 순서대로 적용하고 적용한 Migration 목록을 반환합니다.
+# fake=True면 SQL을 실행하지 않고 적용 기록만 남깁니다.
+def migrate(engine, directory=MIGRATIONS_DIR, target=None, fake=False, log=logger.info):
+    applied_now = []
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+        try:
+            _ensure_table(conn)
+            applied = _applied(conn)
+            for migration in discover_migrations(directory):
+                if migration.version in applied or (target is not None and migration.version > target):
+                    continue
+                if not fake:
+                    for statement in split_statements(migration.sql):
+                        conn.exec_driver_sql(statement)
+                conn.execute(text("""
+                    INSERT INTO schema_migrations (version, name, checksum)
+                    VALUES (:version, :name, :checksum)
+                """), {"version": migration.version, "name": migration.name, "checksum": migration.checksum})
+                applied_now.append(migration)
+                log(f"{'기록' if fake else '적용'}: {os.path.basename(migration.path)}")
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+    return applied_now
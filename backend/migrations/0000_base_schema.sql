@@ -0,0 +1,38 @@
+-- 기본 스키마: app.py가 사용하는 users / posts / comments / likes 테이블
+-- 운영 DB는 Supabase에서 직접 만든 테이블을 사용하므로 IF NOT EXISTS로 아무 것도 바꾸지 않고,
+-- 빈 DB(벤치마크/로컬 개발)에서는 이 파일부터 순서대로 적용해 같은 스키마를 만듭니다.
+-- 이후 컬럼은 0001~, 인덱스는 0006_hot_path_indexes.sql에서 추가합니다.
+-- 적용: flask --app app migrate (migrate.py 참고)
+
+CREATE TABLE IF NOT EXISTS users (
+    id bigserial PRIMARY KEY,
+    created_at timestamptz NOT NULL DEFAULT now(),
+    email text NOT NULL,
+    password_hash text NOT NULL,
+    nickname text NOT NULL,
+    avatar_url text
+);
+
+CREATE TABLE IF NOT EXISTS posts (
+    id bigserial PRIMARY KEY,
+    created_at timestamptz NOT NULL DEFAULT now(),
+    title text,
+    content text,
+    user_id bigint NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+    image_url text
+);
+
+CREATE TABLE IF NOT EXISTS comments (
+    id bigserial PRIMARY KEY,
+    created_at timestamptz NOT NULL DEFAULT now(),
+    content text NOT NULL,
+    user_id bigint NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+    post_id bigint NOT NULL REFERENCES posts (id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS likes (
+    id bigserial PRIMARY KEY,
+    created_at timestamptz NOT NULL DEFAULT now(),
+    user_id bigint NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+    post_id bigint NOT NULL REFERENCES posts (id) ON DELETE CASCADE
+);
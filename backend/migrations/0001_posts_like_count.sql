@@ -0,0 +1,13 @@
+-- posts.like_count: add_like / remove_like가 같은 트랜잭션에서 갱신하는 비정규화 좋아요 수
+-- 적용: psql "$DATABASE_URL" -f migrations/0001_posts_like_count.sql
+-- 이후 어긋난 값은 `flask --app app reconcile-like-counts`로 보정합니다.
+
+BEGIN;
+
+ALTER TABLE posts ADD COLUMN IF NOT EXISTS like_count integer NOT NULL DEFAULT 0;
+
+UPDATE posts AS p SET like_count = l.cnt
+FROM (SELECT post_id, COUNT(*) AS cnt FROM likes GROUP BY post_id) AS l
+WHERE p.id = l.post_id;
+
+COMMIT;
@@ -0,0 +1,8 @@
+-- posts.search_tsv: 제목(A)/본문(B) n-gram 전문 검색 색인 (search.py 참고)
+-- 값은 애플리케이션이 create_post / update_post에서 함께 기록합니다.
+-- 적용 후 기존 게시글 백필: flask --app app rebuild-search-index
+
+ALTER TABLE posts ADD COLUMN IF NOT EXISTS search_tsv tsvector;
+
+-- 운영 중인 테이블 잠금을 피하기 위해 CONCURRENTLY로 생성 (트랜잭션 블록 밖에서 실행)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS posts_search_tsv_idx ON posts USING GIN (search_tsv);
@@ -0,0 +1,7 @@
+-- register는 이메일/닉네임 중복 확인 SELECT 없이 INSERT만 실행하고,
+-- 아래 UNIQUE 인덱스 위반(IntegrityError)의 이름으로 어떤 값이 중복인지 판단합니다.
+-- 인덱스 이름에 'email' / 'nickname'이 포함되어 있어야 합니다.
+-- (이미 같은 이름의 UNIQUE 제약조건이 있는 DB에서는 아무 것도 하지 않습니다.)
+
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS users_email_key ON users (email);
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS users_nickname_key ON users (nickname);
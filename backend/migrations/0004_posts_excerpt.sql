@@ -0,0 +1,18 @@
+-- posts.excerpt: 목록 화면용 본문 미리보기 (app.build_excerpt와 같은 규칙: 태그 제거 후 앞 100자)
+-- create_post / update_post가 함께 기록하며, 목록 API는 ?fields=...,excerpt로 content 대신 사용합니다.
+
+BEGIN;
+
+ALTER TABLE posts ADD COLUMN IF NOT EXISTS excerpt text;
+
+UPDATE posts AS p SET excerpt = CASE
+        WHEN char_length(t.plain) > 100 THEN left(t.plain, 100) || '...'
+        ELSE t.plain
+    END
+FROM (
+    SELECT id, btrim(regexp_replace(regexp_replace(coalesce(content, ''), '<[^>]+>', ' ', 'g'), '\s+', ' ', 'g')) AS plain
+    FROM posts
+) AS t
+WHERE p.id = t.id AND p.excerpt IS NULL;
+
+COMMIT;
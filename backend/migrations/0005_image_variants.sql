@@ -0,0 +1,10 @@
+-- image_variants: 업로드 이미지의 파생본(썸네일/중간 크기/WebP) 공개 URL
+-- 게시글 이미지는 글 작성 전에 업로드되므로 posts/users 행 대신 원본 공개 URL(image_url/avatar_url)을 키로 기록합니다.
+-- images.py 워커가 파생본을 만든 뒤 채우며, 목록 API는 원본 URL로 조회해 작은 파생본을 반환합니다.
+-- variants 예: {"thumb": "...", "medium": "...", "webp": "..."}
+
+CREATE TABLE IF NOT EXISTS image_variants (
+    original_url text PRIMARY KEY,
+    variants jsonb NOT NULL,
+    created_at timestamptz NOT NULL DEFAULT now()
+);
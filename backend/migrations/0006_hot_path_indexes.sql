@@ -0,0 +1,19 @@
+-- 자주 실행되는 조회 조건/정렬에 맞춘 인덱스 (DB마다 수동 설정에 따라 있거나 없던 인덱스를 명시적으로 정의)
+-- - posts (created_at DESC, id DESC): 게시글 목록 최신순 정렬 + keyset 커서 (created_at, id) < (...)
+-- - posts (user_id, created_at DESC, id DESC): 내가 쓴 글 목록
+-- - comments (post_id, created_at DESC, id DESC): 게시글별 댓글 목록/상세 페이지
+-- - comments (user_id, created_at DESC, id DESC): 내가 쓴 댓글 목록
+-- - likes (user_id, post_id) UNIQUE: add_like의 중복 방지, liked_by_me EXISTS, 내 좋아요 목록(user_id 선두 컬럼)
+-- - likes (post_id): 게시글 삭제 시 CASCADE, like_count 보정
+-- users.email / users.nickname은 0003_users_unique_constraints.sql에서 만듭니다.
+--
+-- 운영 중인 테이블 잠금을 피하기 위해 CONCURRENTLY로 생성합니다. (트랜잭션 블록 밖에서 실행)
+-- likes에 중복 (user_id, post_id)가 이미 있으면 UNIQUE 인덱스 생성이 실패하고 INVALID 인덱스가 남습니다.
+-- 그 경우 중복 행을 지우고 `DROP INDEX CONCURRENTLY likes_user_id_post_id_key;` 후 다시 적용합니다.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS posts_created_at_id_idx ON posts (created_at DESC, id DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS posts_user_id_created_at_idx ON posts (user_id, created_at DESC, id DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS comments_post_id_created_at_idx ON comments (post_id, created_at DESC, id DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS comments_user_id_created_at_idx ON comments (user_id, created_at DESC, id DESC);
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS likes_user_id_post_id_key ON likes (user_id, post_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS likes_post_id_idx ON likes (post_id);
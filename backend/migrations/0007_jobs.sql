@@ -0,0 +1,28 @@
+-- jobs: 요청 처리와 분리해 워커 프로세스(flask --app app jobs-worker)가 실행하는 작업 대기열 (jobs.py 참고)
+-- - Storage 객체 삭제(storage.remove)는 DB 변경과 같은 트랜잭션에서 넣으므로 DB만 바뀌고 작업이 사라지는 일이 없습니다.
+-- - 워커는 run_at이 지난 작업을 FOR UPDATE SKIP LOCKED로 나눠 가져가고, locked_until까지 실행하지 못하면
+--   (워커 비정상 종료) 다른 워커가 다시 가져갑니다.
+-- - 성공한 작업은 삭제하고, 실패하면 지수 백오프로 run_at을 미룹니다. max_attempts를 넘으면 dead_at을 기록하고 보관합니다.
+-- - dedupe_key: 같은 키의 (dead가 아닌) 작업은 하나만 존재 (주기적인 고아 객체 정리 예약용)
+--
+-- 고아 객체 정리는 Storage 목록의 URL이 posts.image_url / users.avatar_url에 있는지 확인하므로 두 컬럼에 인덱스를 만듭니다.
+
+CREATE TABLE IF NOT EXISTS jobs (
+    id bigserial PRIMARY KEY,
+    kind text NOT NULL,
+    payload jsonb NOT NULL DEFAULT '{}',
+    dedupe_key text,
+    attempts integer NOT NULL DEFAULT 0,
+    max_attempts integer NOT NULL DEFAULT 8,
+    run_at timestamptz NOT NULL DEFAULT now(),
+    locked_until timestamptz,
+    last_error text,
+    dead_at timestamptz,
+    created_at timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS jobs_run_at_idx ON jobs (run_at) WHERE dead_at IS NULL;
+CREATE UNIQUE INDEX IF NOT EXISTS jobs_dedupe_key_idx ON jobs (dedupe_key) WHERE dead_at IS NULL;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS posts_image_url_idx ON posts (image_url) WHERE image_url IS NOT NULL;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS users_avatar_url_idx ON users (avatar_url) WHERE avatar_url IS NOT NULL;
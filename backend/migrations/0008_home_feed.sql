@@ -0,0 +1,32 @@
+-- home_feed: 목록 API 첫 페이지들(검색 없음)을 정렬 방식(ranking)별로 미리 계산해 둔 테이블 (feed.py 참고)
+-- - ranking별 상위 FEED_SIZE개 게시글을 작성자 닉네임/좋아요 수/요약까지 JOIN한 JSON(payload)으로 저장합니다.
+-- - 정렬: recent는 (created_at, post_id), top/hot은 (sort_key, post_id) 내림차순
+-- - 게시글이 삭제되면 CASCADE로 함께 지워지고, 빈자리는 다음 갱신에서 채웁니다.
+-- home_feed_meta: 목록 API의 total_count로 쓰는 게시글 수 (갱신 때 증감, 주기 갱신에서 정확한 값으로 맞춤)
+--
+-- 적용 후 `flask --app app rebuild-feed`로 처음 채운 뒤 FEED_ENABLED=1로 실행합니다.
+-- top 정렬(좋아요 수순)과 hot 정렬(최근 좋아요 수)의 후보 조회에 쓰는 인덱스도 함께 만듭니다.
+
+CREATE TABLE IF NOT EXISTS home_feed (
+    ranking text NOT NULL,
+    post_id bigint NOT NULL REFERENCES posts (id) ON DELETE CASCADE,
+    user_id bigint NOT NULL,
+    created_at timestamptz NOT NULL,
+    sort_key double precision NOT NULL,
+    payload jsonb NOT NULL,
+    refreshed_at timestamptz NOT NULL DEFAULT now(),
+    PRIMARY KEY (ranking, post_id)
+);
+
+CREATE INDEX IF NOT EXISTS home_feed_recent_idx ON home_feed (ranking, created_at DESC, post_id DESC);
+CREATE INDEX IF NOT EXISTS home_feed_sort_key_idx ON home_feed (ranking, sort_key DESC, post_id DESC);
+CREATE INDEX IF NOT EXISTS home_feed_user_id_idx ON home_feed (user_id);
+
+CREATE TABLE IF NOT EXISTS home_feed_meta (
+    name text PRIMARY KEY,
+    value bigint NOT NULL,
+    updated_at timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS posts_like_count_id_idx ON posts (like_count DESC, id DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS likes_created_at_idx ON likes (created_at);
@@ -0,0 +1,154 @@
+# --- 비밀번호 해시/검증 워커 풀 ---
+# bcrypt는 요청 하나에 수백 ms의 CPU를 사용하므로, 로그인이 몰리면 다른 API까지 느려집니다.
+# 해시/검증을 크기가 제한된 전용 풀에서 실행하고, 대기열이 가득 차면 PasswordHasherBusy를 발생시켜
+# 호출 측(app.py)이 503으로 빠르게 거절할 수 있게 합니다. 풀이 밀려 결과를 timeout(기본 30초) 안에 받지 못해도
+# 같은 예외로 바꿔 503이 되도록 합니다. 시간 초과된 작업도 풀에서는 계속 실행되므로, 대기열 자리는
+# 작업이 실제로 끝날 때(future의 done 콜백) 반납합니다. 그래서 실행 중 + 대기 중 작업은 max_pending을 넘지 않습니다.
+#
+# 환경 변수
+# - BCRYPT_LOG_ROUNDS (기본 12): 해시 비용. 바꾸면 다음 로그인 시 기존 해시를 자동으로 재해시합니다.
+# - PASSWORD_WORKERS (기본 2): 동시에 실행할 해시/검증 수
+# - PASSWORD_MAX_PENDING (기본 16): 실행 중 + 대기 중 작업의 최대 개수
+# - PASSWORD_QUEUE_WAIT (초, 기본 0.5): 대기열 자리가 날 때까지 기다리는 최대 시간
+# - PASSWORD_EXECUTOR (기본 thread): thread | process
+#   (bcrypt는 해시 중 GIL을 놓으므로 보통 thread로 충분합니다.)
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+
+import bcrypt
+
+from serving import run_cpu_bound
+
+BCRYPT_MAX_PASSWORD_BYTES = 72
+
+
+class PasswordHasherBusy(Exception):
+    pass
+
+
+# bcrypt는 앞 72바이트만 사용합니다. (bcrypt 5부터는 초과 시 ValueError이므로 기존 동작대로 잘라서 사용)
+def _password_bytes(password):
+    return password.encode('utf-8')[:BCRYPT_MAX_PASSWORD_BYTES]
+
+
+# 프로세스 풀에서도 실행할 수 있도록 모듈 최상위 함수로 둡니다.
+def _hash(password, rounds):
+    return bcrypt.hashpw(_password_bytes(password), bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _verify(password_hash, password):
+    try:
+        return bcrypt.checkpw(_password_bytes(password), password_hash.encode('utf-8'))
+    except ValueError:
+        return False  # 잘못된 형식의 해시
+
+
+class PasswordHasher:
+    def __init__(self, rounds=12, workers=2, max_pending=16, queue_wait=0.5, executor='thread', timeout=30):
+        self.rounds = rounds
+        self.workers = workers
+        self.max_pending = max_pending
+        self.queue_wait = queue_wait
+        self.executor_kind = executor
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.rehashed = 0
+
+    # 실행기는 첫 해시/검증 때 만듭니다. (preload 시 워커별로 생성 — gunicorn.conf.py 참고)
+    def _get_executor(self):
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    if self.executor_kind == 'process':
+                        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                    else:
+                        self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                            thread_name_prefix='password')
+        return self._executor
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(timeout=self.queue_wait):
+            with self._stats_lock:
+                self.rejected += 1
+            raise PasswordHasherBusy()
+        with self._stats_lock:
+            self.pending += 1
+        if self.executor_kind != 'process':
+            args = (fn,) + args
+            fn = run_cpu_bound  # async(gevent) 모드에서도 실제 OS 스레드에서 실행되도록 (serving.py 참고)
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        try:
+            result = future.result(timeout=self.timeout)
+        except FuturesTimeoutError:
+            future.cancel()  # 아직 시작하지 않았으면 실행하지 않음 (취소돼도 done 콜백은 호출됩니다)
+            with self._stats_lock:
+                self.timeouts += 1
+            raise PasswordHasherBusy()
+        with self._stats_lock:
+            self.completed += 1
+        return result
+
+    # 작업이 끝나거나 취소될 때 대기열 자리를 반납합니다. (시간 초과 후에도 실행이 끝날 때까지 자리를 차지)
+    def _release(self, future=None):
+        with self._stats_lock:
+            self.pending -= 1
+        self._slots.release()
+
+    def hash(self, password):
+        return self._run(_hash, password, self.rounds)
+
+    def verify(self, password_hash, password):
+        return self._run(_verify, password_hash, password)
+
+    # 저장된 해시의 비용($2b$<rounds>$...)이 현재 설정과 다르면 재해시가 필요합니다.
+    def needs_rehash(self, password_hash):
+        try:
+            return int(password_hash.split('$')[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    def record_rehash(self):
+        with self._stats_lock:
+            self.rehashed += 1
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                'rounds': self.rounds,
+                'workers': self.workers,
+                'executor': self.executor_kind,
+                'max_pending': self.max_pending,
+                'pending': self.pending,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'timeouts': self.timeouts,
+                'rehashed': self.rehashed,
+            }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+
+# 환경 변수 설정으로 PasswordHasher를 만듭니다.
+def create_password_hasher(environ):
+    return PasswordHasher(
+        rounds=int(environ.get("BCRYPT_LOG_ROUNDS", 12)),
+        workers=int(environ.get("PASSWORD_WORKERS", 2)),
+        max_pending=int(environ.get("PASSWORD_MAX_PENDING", 16)),
+        queue_wait=float(environ.get("PASSWORD_QUEUE_WAIT", 0.5)),
+        executor=environ.get("PASSWORD_EXECUTOR", "thread"),
+    )
@@ -0,0 +1,107 @@
+# --- 쿼리 계획 검사 (벤치마크/테스트 전용) ---
+# PLAN_CHECK=1이면 엔진이 실행하는 SQL 문마다(문장 텍스트 기준 처음 한 번) 같은 파라미터로 EXPLAIN을 실행하고,
+# 행 수가 PLAN_CHECK_MIN_ROWS(기본 10000) 이상인 테이블에 Seq Scan이 있으면 위반으로 기록합니다.
+# 시드 데이터(bench/seed.py)가 있는 DB에서 bench/run_suite.py --plan-check로 모든 API를 호출한 뒤
+# /internal/query-plans 결과에 위반이 있으면 실패 처리합니다.
+#
+# 의도적으로 전체를 읽는 쿼리(예: ILIKE 검색, 캐시되는 전체 개수)는 SQL에 PLAN_CHECK_ALLOW_SEQ_SCAN 주석을 넣어 제외합니다.
+# 운영에서는 켜지 마세요. (문장마다 EXPLAIN 왕복이 한 번 더 생깁니다.)
+import json
+import threading
+
+from flask import has_request_context, request
+
+from db import listen
+
+PLAN_CHECK_ALLOW_SEQ_SCAN = "/* plan-check: allow-seq-scan */"
+_EXPLAINABLE = ('select', 'with', 'insert', 'update', 'delete')
+
+
+# EXPLAIN (FORMAT JSON) 결과 트리에서 Seq Scan 노드의 테이블 이름을 모읍니다.
+def seq_scan_relations(plan):
+    relations = []
+    if plan.get('Node Type') in ('Seq Scan', 'Parallel Seq Scan') and plan.get('Relation Name'):
+        relations.append(plan['Relation Name'])
+    for child in plan.get('Plans', ()):
+        relations.extend(seq_scan_relations(child))
+    return relations
+
+
+class PlanChecker:
+    def __init__(self, min_rows=10000):
+        self.min_rows = min_rows
+        self._lock = threading.Lock()
+        self._table_rows = None  # {테이블 이름: pg_class.reltuples}
+        self.checked = {}  # {문장: 처음 실행한 라우트}
+        self.violations = []
+        self.errors = []
+
+    def attach(self, engine):
+        def _explain(conn, cursor, statement, parameters, context, executemany):
+            if executemany or not statement.lstrip().lower().startswith(_EXPLAINABLE):
+                return
+            with self._lock:
+                if statement in self.checked:
+                    return
+                route = request.url_rule.rule if has_request_context() and request.url_rule else '-'
+                self.checked[statement] = route
+            # 실행 중인 커서(서버 측 커서일 수 있음) 대신 같은 연결의 새 커서로 EXPLAIN합니다.
+            explain_cursor = conn.connection.cursor()
+            try:
+                self.check(explain_cursor, statement, parameters, route)
+            finally:
+                explain_cursor.close()
+
+        listen(engine, "before_cursor_execute", _explain)
+
+    def _large_tables(self, cursor):
+        if self._table_rows is None:
+            cursor.execute("SELECT relname, reltuples FROM pg_class WHERE relkind = 'r' "
+                           "AND relnamespace = 'public'::regnamespace")
+            self._table_rows = {name: rows for name, rows in cursor.fetchall()}
+        return {name for name, rows in self._table_rows.items() if rows >= self.min_rows}
+
+    # 요청의 트랜잭션 안에서 실행되므로 SAVEPOINT로 감싸, EXPLAIN이 실패해도 트랜잭션이 중단(aborted)되지 않게
+    # 되돌린 뒤 원래 문장이 이어서 실행되도록 합니다. (autocommit 연결은 실패가 다음 문장에 영향을 주지 않음)
+    def check(self, cursor, statement, parameters, route):
+        savepoint = not getattr(cursor.connection, 'autocommit', False)
+        if savepoint:
+            cursor.execute("SAVEPOINT plan_check")
+        try:
+            cursor.execute("EXPLAIN (FORMAT JSON) " + statement, parameters)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):  # 드라이버가 json을 파싱하지 않은 경우
+                plan = json.loads(plan)
+            large = self._large_tables(cursor)
+        except Exception as e:
+            if savepoint:
+                cursor.execute("ROLLBACK TO SAVEPOINT plan_check")
+            with self._lock:
+                self.errors.append({'route': route, 'statement': " ".join(statement.split()), 'error': str(e)})
+            return
+        if savepoint:
+            cursor.execute("RELEASE SAVEPOINT plan_check")
+        if PLAN_CHECK_ALLOW_SEQ_SCAN in statement:
+            return
+        scanned = sorted(set(seq_scan_relations(plan[0]['Plan'])) & large)
+        if scanned:
+            with self._lock:
+                self.violations.append({'route': route, 'tables': scanned,
+                                        'statement': " ".join(statement.split()), 'plan': plan[0]['Plan']})
+
+    def report(self):
+        with self._lock:
+            return {
+                'min_rows': self.min_rows,
+                'checked_statements': len(self.checked),
+                'routes': sorted(set(self.checked.values())),
+                'violations': list(self.violations),
+                'errors': list(self.errors),
+            }
+
+
+# PLAN_CHECK=1일 때만 PlanChecker를 만듭니다. (그 외에는 None)
+def create_plan_checker(environ):
+    if environ.get("PLAN_CHECK", "0") != "1":
+        return None
+    return PlanChecker(min_rows=int(environ.get("PLAN_CHECK_MIN_ROWS", 10000)))
@@ -0,0 +1,214 @@
+# --- 읽기 복제본 라우팅 ---
+# DATABASE_REPLICA_URLS(쉼표로 구분)에 복제본을 지정하면 조회 API는 건강한 복제본으로, 쓰기는 주 DB로 보냅니다.
+# (app.py의 read_engine()을 쓰는 GET 핸들러만 복제본을 사용하고, 나머지는 모두 주 DB engine을 사용)
+#
+# - read-your-writes: 사용자의 쓰기 요청(POST/PUT/DELETE)이 성공하면 REPLICA_STICKY_SECONDS(기본 5) 동안
+#   그 사용자의 조회를 주 DB로 보냅니다. 기록은 워커 메모리(기본)에 두며, 워커/서버가 여러 개면
+#   REPLICA_STICKY_REDIS_URL로 Redis에 두어 공유합니다. (redis 패키지 필요)
+#   메모리 기록은 다른 워커에 보이지 않으므로, 복제본을 쓰면서 워커가 2개 이상이면 gunicorn.conf.py가 시작을 거부합니다.
+#   Redis 오류 시에는 기록을 건너뛰고(경고 로그) 조회는 주 DB로 보냅니다. (안전한 쪽)
+#   쓰기 API가 무효화한 캐시 태그도 같은 시간 동안 주 DB에서 읽습니다. 다른 사용자의 조회가 아직 반영되지 않은
+#   복제본에서 읽은 결과를 응답 캐시/single-flight에 다시 채우지 않도록 하기 위해서입니다.
+# - 지연 확인: REPLICA_CHECK_INTERVAL초(기본 2)마다 복제본의 재생 지연을 확인해 REPLICA_MAX_LAG_SECONDS(기본 5)를
+#   넘거나 연결에 실패하면 제외합니다. 건강한 복제본이 없으면(첫 확인 전 포함) 주 DB로 읽습니다.
+# - 요청 중 연결이 끊기는 오류가 나면 다음 확인을 기다리지 않고 바로 제외합니다.
+# - 확인 스레드는 첫 조회 때 시작합니다. (복제본이 없으면 띄우지 않음)
+#
+# 복제본 엔진의 풀 설정은 주 DB와 같은 DB_POOL_* 값을 사용하며, 주 DB처럼 처음 사용할 때 만듭니다. (db.py의 LazyEngine)
+import itertools
+import logging
+import threading
+import time
+
+from sqlalchemy import text
+
+from db import create_lazy_engine, listen
+
+logger = logging.getLogger(__name__)
+
+# 재생할 WAL이 없으면(수신 = 재생) 지연 0, 아니면 마지막으로 재생한 트랜잭션 이후 경과 시간
+REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class Replica:
+    def __init__(self, name, engine, pool_stats):
+        self.name = name
+        self.engine = engine
+        self.pool_stats = pool_stats
+        self.healthy = False
+        self.lag = None
+        self.last_error = None
+        self.checked_at = None
+
+        def _on_error(context):
+            if context.is_disconnect:
+                self.healthy = False
+                self.last_error = str(context.original_exception)
+
+        listen(engine, "handle_error", _on_error)
+
+
+class MemoryStickyStore:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._until = {}  # {user_id 또는 'tag:<태그>': 주 DB로 읽을 마감 시각}
+
+    def mark(self, user_id, seconds):
+        now = time.monotonic()
+        with self._lock:
+            self._until[user_id] = now + seconds
+            if len(self._until) > 10000:  # 만료된 항목 정리
+                self._until = {k: v for k, v in self._until.items() if v > now}
+
+    def is_sticky(self, user_id):
+        with self._lock:
+            until = self._until.get(user_id)
+        return until is not None and until > time.monotonic()
+
+
+class RedisStickyStore:
+    def __init__(self, url, prefix='sticky:'):
+        try:
+            import redis  # REPLICA_STICKY_REDIS_URL을 설정했을 때만 임포트 (requirements.txt에 포함)
+        except ImportError as e:
+            raise RuntimeError("REPLICA_STICKY_REDIS_URL에는 redis 패키지가 필요합니다. "
+                               "(pip install -r requirements.txt)") from e
+
+        self.client = redis.Redis.from_url(url)
+        self._redis_error = redis.RedisError
+        self.prefix = prefix
+
+    def mark(self, user_id, seconds):
+        try:
+            self.client.set(f"{self.prefix}{user_id}", b"1", px=int(seconds * 1000))
+        except self._redis_error as e:
+            logger.warning("redis sticky mark failed: %s", e)
+
+    # 확인할 수 없으면 최근에 쓴 것으로 보고 주 DB에서 읽습니다.
+    def is_sticky(self, user_id):
+        try:
+            return self.client.exists(f"{self.prefix}{user_id}") > 0
+        except self._redis_error as e:
+            logger.warning("redis sticky check failed: %s", e)
+            return True
+
+
+class DbRouter:
+    def __init__(self, primary, replicas=(), sticky_store=None, sticky_seconds=5, max_lag=5, check_interval=2):
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.sticky_store = sticky_store or MemoryStickyStore()
+        self.sticky_seconds = sticky_seconds
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._next = itertools.count()
+        self._checker = None
+        self._checker_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.primary_reads = 0
+        self.replica_reads = 0
+        self.sticky_reads = 0
+
+    def engines(self):
+        return [self.primary] + [replica.engine for replica in self.replicas]
+
+    # 조회에 사용할 엔진: 최근에 쓰기를 한 사용자/태그이거나 건강한 복제본이 없으면 주 DB
+    def read_engine(self, user_id=None, tags=()):
+        if not self.replicas:
+            return self.primary
+        self._start_checker()
+        if (user_id is not None and self.sticky_store.is_sticky(user_id)) or self.recently_written(tags):
+            with self._stats_lock:
+                self.sticky_reads += 1
+            return self.primary
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            with self._stats_lock:
+                self.primary_reads += 1
+            return self.primary
+        with self._stats_lock:
+            self.replica_reads += 1
+            index = next(self._next)
+        return healthy[index % len(healthy)].engine
+
+    def mark_write(self, user_id=None, tags=()):
+        if not self.replicas:
+            return
+        if user_id is not None:
+            self.sticky_store.mark(user_id, self.sticky_seconds)
+        for tag in tags:
+            self.sticky_store.mark(f"tag:{tag}", self.sticky_seconds)
+
+    def recently_written(self, tags):
+        return bool(self.replicas) and any(self.sticky_store.is_sticky(f"tag:{tag}") for tag in tags)
+
+    def is_primary(self, target):
+        return target is self.primary
+
+    def check_replicas(self):
+        for replica in self.replicas:
+            try:
+                with replica.engine.connect() as conn:
+                    lag = float(conn.execute(REPLICA_LAG_SQL).scalar())
+                replica.lag = lag
+                replica.healthy = lag <= self.max_lag
+                replica.last_error = None if replica.healthy else f"replication lag {lag:.1f}s"
+            except Exception as e:
+                replica.healthy = False
+                replica.last_error = str(e)
+            replica.checked_at = time.time()
+
+    def stats(self):
+        with self._stats_lock:
+            reads = {'primary_reads': self.primary_reads, 'replica_reads': self.replica_reads,
+                     'sticky_reads': self.sticky_reads}
+        return {
+            'sticky_seconds': self.sticky_seconds,
+            'sticky_store': 'redis' if isinstance(self.sticky_store, RedisStickyStore) else 'memory',
+            'max_lag_seconds': self.max_lag,
+            **reads,
+            'replicas': [{
+                'name': replica.name,
+                'healthy': replica.healthy,
+                'lag_seconds': replica.lag,
+                'last_error': replica.last_error,
+                'checked_at': replica.checked_at,
+                'pool': replica.pool_stats.snapshot(replica.engine.pool),
+            } for replica in self.replicas],
+        }
+
+    def _start_checker(self):
+        if self._checker is not None:
+            return
+        with self._checker_lock:
+            if self._checker is None:
+                self._checker = threading.Thread(target=self._run_checker, name='replica-checker', daemon=True)
+                self._checker.start()
+
+    def _run_checker(self):
+        while True:
+            self.check_replicas()
+            time.sleep(self.check_interval)
+
+
+def create_db_router(primary, environ):
+    urls = [url.strip() for url in environ.get("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+    replicas = []
+    for index, url in enumerate(urls):
+        replica_engine = create_lazy_engine(url, environ)
+        replicas.append(Replica(f"replica{index + 1}", replica_engine, replica_engine.pool_stats))
+    sticky_url = environ.get("REPLICA_STICKY_REDIS_URL")
+    return DbRouter(
+        primary,
+        replicas,
+        sticky_store=RedisStickyStore(sticky_url) if sticky_url else MemoryStickyStore(),
+        sticky_seconds=float(environ.get("REPLICA_STICKY_SECONDS", 5)),
+        max_lag=float(environ.get("REPLICA_MAX_LAG_SECONDS", 5)),
+        check_interval=float(environ.get("REPLICA_CHECK_INTERVAL", 2)),
+    )
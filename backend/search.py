@@ -0,0 +1,67 @@
+# --- 게시글 검색용 n-gram 토크나이저 ---
+# 한국어는 띄어쓰기 단위(어절)에 조사/어미가 붙기 때문에 형태소 분석 없이 단어 단위로 색인하면
+# "게시글을" 같은 어절이 "게시글" 검색에 걸리지 않습니다. 그래서 한글이 포함된 단어는 2-gram으로
+# 쪼개어 색인하고, 영문/숫자 단어는 단어 그대로 색인한 뒤 검색 시 접두어(:*) 매칭을 사용합니다.
+#
+# PostgreSQL의 텍스트 파서(to_tsvector)는 DB 로캘에 따라 한글을 공백으로 취급할 수 있으므로,
+# tsvector / tsquery 리터럴을 여기서 직접 만들어 ::tsvector, ::tsquery로 캐스팅합니다.
+import html
+import re
+
+NGRAM_SIZE = 2
+MAX_DOCUMENT_TOKENS = 5000  # tsvector 크기(1MB) 제한을 넘지 않도록 본문 토큰 수 제한
+MAX_POSITIONS_PER_LEXEME = 256  # PostgreSQL의 lexeme당 최대 position 개수
+MAX_POSITION = 16383  # PostgreSQL tsvector position 최대값
+
+_TAG_RE = re.compile(r'<[^>]+>')
+_WORD_RE = re.compile(r'[^\W_]+')
+_HANGUL_RE = re.compile(r'[\u1100-\u11ff\u3131-\u318e\uac00-\ud7a3]')
+
+
+# HTML 태그/엔티티를 제거하고 소문자 단어 목록으로 분리합니다.
+def _words(text):
+    plain = html.unescape(_TAG_RE.sub(' ', text or ''))
+    return _WORD_RE.findall(plain.lower())
+
+
+# 한글 단어는 n-gram으로, 나머지는 단어 그대로 토큰화합니다.
+def tokenize(text):
+    tokens = []
+    for word in _words(text):
+        if _HANGUL_RE.search(word) and len(word) > NGRAM_SIZE:
+            tokens.extend(word[i:i + NGRAM_SIZE] for i in range(len(word) - NGRAM_SIZE + 1))
+        else:
+            tokens.append(word)
+    return tokens
+
+
+# 제목(가중치 A)과 본문(가중치 B)으로 tsvector 리터럴 문자열을 만듭니다.
+# 예: "'게시':1A,3B 'flask':2A"
+def build_document(title, content):
+    positions = {}
+    position = 1
+    for weight, text in (('A', title), ('B', content)):
+        for token in tokenize(text)[:MAX_DOCUMENT_TOKENS]:
+            entries = positions.setdefault(token, [])
+            if len(entries) < MAX_POSITIONS_PER_LEXEME:
+                entries.append(f"{min(position, MAX_POSITION)}{weight}")
+            position += 1
+    return ' '.join(f"'{token}':{','.join(entries)}" for token, entries in positions.items())
+
+
+# 검색어를 tsquery 리터럴로 변환합니다. 단어끼리는 AND(&)로 묶습니다.
+# 검색할 토큰이 없으면(기호만 입력 등) 빈 문자열을 반환합니다.
+def build_query(search_term):
+    terms = []
+    for word in _words(search_term):
+        if _HANGUL_RE.search(word):
+            if len(word) < NGRAM_SIZE:
+                terms.append(f"'{word}':*")
+            else:
+                # 같은 단어의 n-gram은 연속된 position에 색인되므로 <-> (바로 뒤) 연산자로 묶습니다.
+                grams = [f"'{word[i:i + NGRAM_SIZE]}'" for i in range(len(word) - NGRAM_SIZE + 1)]
+                terms.append(grams[0] if len(grams) == 1 else f"({' <-> '.join(grams)})")
+        else:
+            terms.append(f"'{word}':*")
+    # 같은 단어가 반복되어도 결과는 같으므로 순서를 유지한 채 중복 제거
+    return ' & '.join(dict.fromkeys(terms))
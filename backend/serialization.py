@@ -0,0 +1,92 @@
+# --- 응답 직렬화 ---
+# 1) JSON 인코딩: orjson이 있으면 사용하고(datetime/date/UUID를 직접 인코딩), 없으면 표준 json으로 대체합니다.
+#    app.json = FastJSONProvider(app)로 등록하면 jsonify를 포함한 모든 JSON 응답이 이 인코더를 사용합니다.
+#    datetime은 ISO 8601(예: 2024-05-01T12:30:00.123456+00:00) 문자열로 인코딩됩니다.
+#    API 형식 변경: Flask 기본 인코더는 RFC 1123 HTTP-date(예: Wed, 01 May 2024 12:30:00 GMT, 초 단위)를 쓰고
+#    키를 정렬(sort_keys)했지만, 이 인코더는 ISO 8601(마이크로초, 시간대 포함)을 쓰고 키는 dict 순서대로 둡니다.
+#    (홈 피드 payload와 NDJSON 응답도 같은 형식) 프론트엔드는 날짜를 모두 new Date(문자열)로만 읽으므로
+#    (PostList, PostDetailPage, CommentItem, MyCommentsPage) 두 형식을 모두 받으며, 키 순서에 의존하는 곳은 없습니다.
+#    다른 클라이언트가 날짜 문자열을 직접 파싱한다면 ISO 8601을 받도록 맞춰야 합니다.
+# 2) 행 변환: 조회 결과의 컬럼 목록마다 "행 튜플 → dict" 변환 함수를 한 번 만들어(캐시) 모든 행에 재사용합니다.
+#    row._asdict() 후 pop/중첩 dict 재구성을 하는 대신, 중첩 객체(예: 댓글의 users)와 제외할 컬럼을
+#    변환 함수에 미리 반영해 행마다 dict를 한 번만 만듭니다.
+import datetime
+import decimal
+import json
+from functools import lru_cache
+
+from flask.json.provider import JSONProvider
+
+from metrics import timed
+
+try:
+    import orjson
+except ImportError:  # 선택적 의존성: 없으면 표준 json 사용
+    orjson = None
+
+
+def _default(obj):
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    def dumps(obj):
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+    loads = orjson.loads
+else:
+    def dumps(obj):
+        return json.dumps(obj, default=_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    loads = json.loads
+
+
+class FastJSONProvider(JSONProvider):
+    def dumps(self, obj, **kwargs):
+        return dumps(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        with timed('serialize'):
+            body = dumps(obj)
+        return self._app.response_class(body, mimetype='application/json')
+
+
+# 컬럼 이름 목록으로 행 변환 함수를 만듭니다.
+# - nested: (('users', ('nickname', 'avatar_url')), ...) — 해당 컬럼을 중첩 객체로 묶음
+# - drop: 응답에서 제외할 컬럼 이름
+@lru_cache(maxsize=512)
+def row_mapper(keys, nested=(), drop=()):
+    index = {key: i for i, key in enumerate(keys)}
+    nested_keys = {key for _, columns in nested for key in columns}
+    flat = [(key, i) for i, key in enumerate(keys) if key not in nested_keys and key not in drop]
+    groups = [(name, [(key, index[key]) for key in columns]) for name, columns in nested]
+
+    def convert(r):
+        item = {key: r[i] for key, i in flat}
+        for name, columns in groups:
+            item[name] = {key: r[i] for key, i in columns}
+        return item
+    return convert
+
+
+def serialize_row(row, nested=(), drop=()):
+    with timed('serialize'):
+        return row_mapper(row._fields, nested, tuple(drop))(row)
+
+
+def serialize_rows(rows, nested=(), drop=()):
+    if not rows:
+        return []
+    with timed('serialize'):
+        convert = row_mapper(rows[0]._fields, nested, tuple(drop))
+        return [convert(row) for row in rows]
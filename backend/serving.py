@@ -0,0 +1,39 @@
+# --- 서빙 모드 (sync / async) ---
+# SERVING_MODE=sync(기본): gunicorn 동기 워커. 워커 하나가 한 번에 요청 하나를 처리합니다.
+# SERVING_MODE=async: gunicorn gevent 워커(gunicorn.conf.py). 워커 하나가 DB/Storage I/O를 기다리는 동안
+#   다른 요청을 처리하므로 같은 워커 수(= 비슷한 메모리)로 더 많은 동시 요청을 받을 수 있습니다.
+#   라우트와 응답 형태는 sync 모드와 완전히 같습니다.
+#   - psycopg2: psycogreen으로 gevent용 wait 콜백을 등록해 쿼리를 기다리는 동안 다른 요청으로 양보
+#   - Storage(httpx)/커넥션 풀 대기: monkey patch된 socket/threading으로 협력적으로 동작
+#   - bcrypt/Pillow 같은 CPU 작업: run_cpu_bound로 실제 OS 스레드에서 실행 (이벤트 루프가 멈추지 않도록)
+#   gevent, psycogreen 패키지가 필요합니다. (requirements.txt에 포함)
+#
+# async 모드에서는 한 워커의 동시 요청들이 DB 커넥션 풀을 나눠 쓰므로 DB_POOL_SIZE/DB_MAX_OVERFLOW도 함께 조정합니다.
+import os
+
+
+def serving_mode(environ=os.environ):
+    return 'async' if environ.get("SERVING_MODE") == 'async' else 'sync'
+
+
+def _gevent_patched():
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return monkey.is_module_patched('threading')
+
+
+# CPU를 오래 쓰는 함수를 실행합니다.
+# gevent 워커에서는 threading이 greenlet으로 바뀌어 있으므로 hub의 네이티브 스레드 풀에서 실행하고 결과를 기다립니다.
+def run_cpu_bound(fn, *args):
+    if _gevent_patched():
+        import gevent
+        return gevent.get_hub().threadpool.apply(fn, args)
+    return fn(*args)
+
+
+# gevent 워커가 초기화된 뒤(gunicorn post_worker_init) 호출합니다.
+def patch_for_gevent():
+    from psycogreen.gevent import patch_psycopg  # SERVING_MODE=async일 때만 임포트
+    patch_psycopg()
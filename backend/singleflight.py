@@ -0,0 +1,148 @@
+# --- 동시 동일 조회 합치기 (single-flight) ---
+# 인기 글에 요청이 몰리면 같은 post_id의 상세/댓글 조회가 동시에 수백 번, 각자 다른 풀 연결에서 실행됩니다.
+# SingleFlight.do(key, fn)는 워커 프로세스 안에서 같은 key로 진행 중인 호출이 있으면 fn을 다시 실행하지 않고
+# 그 호출의 결과(또는 예외)를 함께 받습니다. 동시 독자가 늘어도 DB 조회는 key당 동시에 1개입니다.
+#
+# stale-while-revalidate (SINGLEFLIGHT_STALE_MS, 기본 0 = 끔)
+#   완료된 결과를 지정한 시간 동안 보관하고, 그 사이의 요청에는 보관한 결과를 바로 반환하면서
+#   진행 중인 갱신이 없으면 백그라운드 스레드에서 한 번 다시 조회합니다.
+#
+# 쓰기 API는 invalidate_tags로 해당 태그의 보관 결과를 지우고, 진행 중인 호출을 분리해
+# 이후 요청이 쓰기 이전에 시작된 조회에 합류하지 않도록 합니다.
+# 결과 객체는 여러 요청이 공유하므로 호출하는 쪽에서 수정하지 않습니다. (필요하면 복사)
+import threading
+import time
+from collections import OrderedDict
+
+
+class _Call:
+    __slots__ = ('event', 'value', 'error', 'detached')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+        self.detached = False  # invalidate_tags로 분리됨 (결과를 보관하지 않음)
+
+
+class SingleFlight:
+    def __init__(self, enabled=True, stale_ms=0, max_entries=1024):
+        self.enabled = enabled
+        self.stale = stale_ms / 1000
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._calls = {}  # {key: 진행 중인 _Call}
+        self._results = OrderedDict()  # {key: (보관 만료 시각, 값)} — stale-while-revalidate용
+        self._key_tags = {}  # {key: 태그 목록}
+        self._tags = {}  # {tag: set(key)}
+        self.leaders = 0  # 실제로 fn을 실행한 횟수
+        self.shared = 0  # 진행 중인 호출에 합류한 횟수
+        self.stale_hits = 0
+        self.refreshes = 0
+        self.errors = 0
+
+    def do(self, key, fn, tags=()):
+        if not self.enabled:
+            return fn()
+        refresh = None
+        with self._lock:
+            entry = self._results.get(key) if self.stale else None
+            if entry is not None and entry[0] > time.monotonic():
+                self.stale_hits += 1
+                if key not in self._calls:
+                    refresh = self._start(key, tags)
+                    self.refreshes += 1
+            else:
+                entry = None
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._start(key, tags)
+                    self.leaders += 1
+                else:
+                    self.shared += 1
+
+        if entry is not None:
+            if refresh is not None:
+                threading.Thread(target=self._run, args=(key, refresh, fn), daemon=True).start()
+            return entry[1]
+        if leader:
+            self._run(key, call, fn)
+        else:
+            call.event.wait()
+        if call.error is not None:
+            raise call.error
+        return call.value
+
+    def invalidate_tags(self, *tags):
+        if not self.enabled:
+            return
+        with self._lock:
+            for tag in tags:
+                for key in self._tags.pop(tag, ()):
+                    call = self._calls.pop(key, None)
+                    if call is not None:
+                        call.detached = True
+                    self._results.pop(key, None)
+                    self._forget(key)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'stale_ms': int(self.stale * 1000),
+                'in_flight': len(self._calls),
+                'stored': len(self._results),
+                'leaders': self.leaders,
+                'shared': self.shared,
+                'stale_hits': self.stale_hits,
+                'refreshes': self.refreshes,
+                'errors': self.errors,
+            }
+
+    # (lock을 잡은 상태에서만 호출)
+    def _start(self, key, tags):
+        call = self._calls[key] = _Call()
+        self._key_tags[key] = tuple(tags)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        return call
+
+    # (lock을 잡은 상태에서만 호출) 진행 중인 호출도 보관 결과도 없는 key의 태그 인덱스를 정리합니다.
+    def _forget(self, key):
+        if key in self._calls or key in self._results:
+            return
+        for tag in self._key_tags.pop(key, ()):
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def _run(self, key, call, fn):
+        try:
+            call.value = fn()
+        except Exception as e:
+            call.error = e
+        finally:
+            with self._lock:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+                if call.error is not None:
+                    self.errors += 1
+                elif self.stale and not call.detached:
+                    self._results.pop(key, None)
+                    self._results[key] = (time.monotonic() + self.stale, call.value)
+                    while len(self._results) > self.max_entries:
+                        oldest, _ = self._results.popitem(last=False)
+                        self._forget(oldest)
+                self._forget(key)
+            call.event.set()
+
+
+def create_single_flight(environ):
+    return SingleFlight(
+        enabled=environ.get("SINGLEFLIGHT_ENABLED", "1") == "1",
+        stale_ms=int(environ.get("SINGLEFLIGHT_STALE_MS", 0)),
+        max_entries=int(environ.get("SINGLEFLIGHT_MAX_ENTRIES", 1024)),
+    )
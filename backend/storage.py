@@ -0,0 +1,162 @@
+# --- Supabase Storage 클라이언트 (스트리밍 업로드) ---
+# supabase-py 전체 스택 대신 Storage REST API만 httpx로 직접 호출합니다.
+# - 연결은 keep-alive 풀(httpx.Client)로 재사용합니다.
+# - 업로드는 요청 파일을 청크 단위로 읽어 그대로 전송(chunked)하므로 파일 전체를 메모리에 올리지 않습니다.
+# - 앞부분 몇 바이트(magic bytes)로 이미지 형식을 판별하고, 읽는 도중 크기 제한을 넘으면 중단합니다.
+#
+# - httpx 임포트와 연결 풀 생성은 처음 Storage를 호출할 때 합니다. (앱 임포트/워커 부팅 시간 단축, fork 안전)
+#
+# 환경 변수: UPLOAD_MAX_BYTES (기본 5MB), STORAGE_TIMEOUT (초, 기본 30), STORAGE_MAX_CONNECTIONS (기본 10)
+import threading
+
+from metrics import timed
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+SNIFF_BYTES = 12  # WebP 판별에 12바이트 필요
+
+# (시그니처, content-type, 확장자)
+IMAGE_SIGNATURES = (
+    (b'\xff\xd8\xff', 'image/jpeg', '.jpg'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png', '.png'),
+    (b'GIF87a', 'image/gif', '.gif'),
+    (b'GIF89a', 'image/gif', '.gif'),
+)
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class UnsupportedFileType(Exception):
+    pass
+
+
+# 파일 앞부분으로 이미지 형식을 판별합니다. 반환값: (content-type, 확장자) 또는 None
+def sniff_image_type(head):
+    for signature, content_type, ext in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return content_type, ext
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'image/webp', '.webp'
+    return None
+
+
+# 요청 파일 스트림을 청크 단위로 내보내는 iterable
+# 전송 중 크기 제한을 넘으면 UploadTooLarge를 발생시키고 exceeded를 True로 표시합니다.
+# (HTTP 클라이언트가 예외를 감싸더라도 호출 측에서 exceeded로 원인을 확인할 수 있습니다.)
+class UploadStream:
+    def __init__(self, stream, max_bytes, chunk_size=UPLOAD_CHUNK_SIZE):
+        self.stream = stream
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.bytes_read = 0
+        self.exceeded = False
+        self.head = self._read_head()
+        detected = sniff_image_type(self.head)
+        if detected is None:
+            raise UnsupportedFileType()
+        self.content_type, self.extension = detected
+
+    def _read_head(self):
+        head = b''
+        while len(head) < SNIFF_BYTES:
+            chunk = self.stream.read(SNIFF_BYTES - len(head))
+            if not chunk:
+                break
+            head += chunk
+        self.bytes_read = len(head)
+        return head
+
+    def __iter__(self):
+        yield self.head
+        while True:
+            chunk = self.stream.read(self.chunk_size)
+            if not chunk:
+                return
+            self.bytes_read += len(chunk)
+            if self.bytes_read > self.max_bytes:
+                self.exceeded = True
+                raise UploadTooLarge()
+            yield chunk
+
+
+class StorageClient:
+    def __init__(self, supabase_url, key, timeout=30, max_connections=10):
+        self.base_url = f"{(supabase_url or '').rstrip('/')}/storage/v1"
+        self.key = key or ''
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self._http = None
+        self._http_lock = threading.Lock()
+
+    # HTTP 클라이언트(연결 풀)는 첫 Storage 호출 때 만듭니다. (reset_after_fork 참고)
+    @property
+    def _client(self):
+        if self._http is None:
+            with self._http_lock:
+                if self._http is None:
+                    import httpx
+
+                    self._http = httpx.Client(
+                        base_url=self.base_url,
+                        headers={'Authorization': f"Bearer {self.key}", 'apikey': self.key},
+                        timeout=self.timeout,
+                        limits=httpx.Limits(max_connections=self.max_connections,
+                                            max_keepalive_connections=self.max_connections),
+                    )
+        return self._http
+
+    def upload(self, bucket, path, content, content_type):
+        with timed('storage'):
+            response = self._client.post(f"/object/{bucket}/{path}", content=content,
+                                         headers={'Content-Type': content_type, 'x-upsert': 'false'})
+            response.raise_for_status()
+
+    # 업로드된 객체를 내려받습니다. (파생본 생성 등 서버 측 후처리용)
+    def download(self, bucket, path):
+        with timed('storage'):
+            response = self._client.get(f"/object/{bucket}/{path}")
+            response.raise_for_status()
+        return response.content
+
+    def get_public_url(self, bucket, path):
+        return f"{self.base_url}/object/public/{bucket}/{path}"
+
+    # 공개 URL에서 버킷 내 경로를 추출합니다. (쿼리 문자열 제외)
+    def path_from_public_url(self, bucket, public_url):
+        return public_url.split(f"/{bucket}/", 1)[-1].split('?', 1)[0]
+
+    def remove(self, bucket, paths):
+        with timed('storage'):
+            response = self._client.request("DELETE", f"/object/{bucket}", json={'prefixes': list(paths)})
+            response.raise_for_status()
+
+    # 버킷의 prefix(폴더) 바로 아래 항목을 이름순으로 조회합니다. 폴더 항목은 id가 None입니다.
+    def list(self, bucket, prefix='', limit=1000, offset=0):
+        with timed('storage'):
+            response = self._client.post(f"/object/list/{bucket}", json={
+                'prefix': prefix, 'limit': limit, 'offset': offset,
+                'sortBy': {'column': 'name', 'order': 'asc'},
+            })
+            response.raise_for_status()
+        return response.json()
+
+    def close(self):
+        if self._http is not None:
+            self._http.close()
+            self._http = None
+
+    # gunicorn preload 모드: 부모 프로세스에서 만든 연결을 쓰지 않고 워커에서 새로 만듭니다.
+    def reset_after_fork(self):
+        self._http = None
+        self._http_lock = threading.Lock()
+
+
+# 환경 변수 설정으로 StorageClient를 만듭니다.
+def create_storage_client(environ):
+    return StorageClient(
+        environ.get("SUPABASE_URL"),
+        environ.get("SUPABASE_KEY"),
+        timeout=float(environ.get("STORAGE_TIMEOUT", 30)),
+        max_connections=int(environ.get("STORAGE_MAX_CONNECTIONS", 10)),
+    )
@@ -0,0 +1,6 @@
+# backend 디렉터리의 모듈(app.py, likes.py 등)을 테스트에서 바로 임포트할 수 있도록 경로에 추가합니다.
+# 사용법 (backend 디렉터리에서): python -m pytest tests
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,142 @@
+# likes.LikeWriter: 대기열 상쇄/상태 판정과 묶음 반영 문장의 형태를 DB 없이 확인합니다.
+# (엔진 대신 실행한 문장과 파라미터를 기록하는 FakeEngine 사용)
+from types import SimpleNamespace
+
+import pytest
+
+from likes import FLUSH_SQL, LIKE_STATE_SQL, LikeWriter
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def first(self):
+        return self.rows[0] if self.rows else None
+
+    def fetchall(self):
+        return self.rows
+
+
+class FakeConnection:
+    def __init__(self, engine):
+        self.engine = engine
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, statement, params):
+        self.engine.calls.append((statement, params))
+        if statement is LIKE_STATE_SQL:
+            key = (params['user_id'], params['post_id'])
+            return FakeResult([SimpleNamespace(post_exists=params['post_id'] in self.engine.posts,
+                                               liked=key in self.engine.likes)])
+        assert statement is FLUSH_SQL
+        changed = []
+        for user_id, post_id in zip(params['add_users'], params['add_posts']):
+            if post_id in self.engine.posts and (user_id, post_id) not in self.engine.likes:
+                self.engine.likes.add((user_id, post_id))
+                changed.append(post_id)
+        for user_id, post_id in zip(params['remove_users'], params['remove_posts']):
+            if (user_id, post_id) in self.engine.likes:
+                self.engine.likes.discard((user_id, post_id))
+                changed.append(post_id)
+        return FakeResult([SimpleNamespace(id=post_id) for post_id in sorted(set(changed))])
+
+    def commit(self):
+        pass
+
+
+class FakeEngine:
+    def __init__(self, posts=(), likes=()):
+        self.posts = set(posts)
+        self.likes = set(likes)
+        self.calls = []
+
+    def connect(self):
+        return FakeConnection(self)
+
+    def flush_calls(self):
+        return [params for statement, params in self.calls if statement is FLUSH_SQL]
+
+
+@pytest.fixture
+def make_writer():
+    writers = []
+
+    def make(engine, **kwargs):
+        kwargs.setdefault('flush_interval_ms', 60_000)  # 반영 스레드가 테스트 도중 끼어들지 않도록
+        writer = LikeWriter(engine, **kwargs)
+        writers.append(writer)
+        return writer
+
+    yield make
+    for writer in writers:
+        writer.close()
+
+
+def test_opposite_events_cancel_before_flush(make_writer):
+    engine = FakeEngine(posts={1})
+    writer = make_writer(engine)
+
+    assert writer.submit(10, 1, True) == 'ok'
+    assert writer.submit(10, 1, False) == 'ok'
+
+    assert writer.pending_like(10, 1) is None
+    assert writer.pending_delta(1) == 0
+    assert writer.flush() == 0
+    assert engine.flush_calls() == []
+    stats = writer.stats()
+    assert (stats['accepted'], stats['cancelled'], stats['pending']) == (2, 1, 0)
+
+
+def test_status_comes_from_pending_state_then_db(make_writer):
+    engine = FakeEngine(posts={1, 2}, likes={(10, 2)})
+    writer = make_writer(engine)
+
+    assert writer.submit(10, 1, True) == 'ok'
+    assert writer.submit(10, 1, True) == 'conflict'  # 대기 중인 좋아요 (DB를 읽지 않음)
+    assert writer.submit(10, 2, True) == 'conflict'  # DB에 이미 있음
+    assert writer.submit(10, 3, True) == 'conflict'  # 없는 게시글
+    assert writer.submit(11, 1, False) == 'not_found'
+    state_reads = [params for statement, params in engine.calls if statement is LIKE_STATE_SQL]
+    assert len(state_reads) == 4
+    assert writer.pending_like(10, 1) is True
+    assert writer.pending_delta(1) == 1
+
+
+def test_flush_writes_one_multi_row_statement(make_writer):
+    engine = FakeEngine(posts={1, 2}, likes={(12, 2)})
+    flushed = []
+    writer = make_writer(engine, on_flush=flushed.append)
+
+    writer.submit(11, 2, True)
+    writer.submit(10, 1, True)
+    writer.submit(12, 2, False)
+
+    assert writer.flush() == 3
+    (params,) = engine.flush_calls()
+    assert params == {'add_users': [10, 11], 'add_posts': [1, 2], 'remove_users': [12], 'remove_posts': [2]}
+    assert engine.likes == {(10, 1), (11, 2)}
+    assert flushed == [[1, 2]]
+    assert writer.pending_delta(1) == 0 and writer.pending_delta(2) == 0
+    assert writer.pending_like(10, 1) is None
+    assert writer.stats()['written'] == 3
+
+
+def test_flush_splits_batches_and_sync_flushes_when_full(make_writer):
+    engine = FakeEngine(posts={1, 2, 3})
+    writer = make_writer(engine, batch_size=2, max_pending=2)
+
+    writer.submit(10, 1, True)
+    writer.submit(10, 2, True)
+    writer.submit(10, 3, True)  # 대기열이 가득 차 요청 스레드에서 먼저 반영
+
+    assert writer.stats()['sync_flushes'] == 1
+    assert [params['add_posts'] for params in engine.flush_calls()] == [[1, 2]]
+    writer.flush()
+    assert [params['add_posts'] for params in engine.flush_calls()] == [[1, 2], [3]]
+    assert engine.likes == {(10, 1), (10, 2), (10, 3)}
@@ -0,0 +1,19 @@
+# migrate.split_statements: 주석 제거와 문자열/$태그$ 본문 안의 ';' 처리
+from migrate import split_statements
+
+
+def test_split_statements_ignores_comments_and_quoted_semicolons():
+    sql = """-- 주석; 무시
+CREATE TABLE a (x text DEFAULT 'a;b''c'); /* 블록; 주석 */
+CREATE FUNCTION f() RETURNS int AS $$ SELECT 1; $$ LANGUAGE sql;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS a_x_idx ON a (x)
+"""
+    assert split_statements(sql) == [
+        "CREATE TABLE a (x text DEFAULT 'a;b''c')",
+        "CREATE FUNCTION f() RETURNS int AS $$ SELECT 1; $$ LANGUAGE sql",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS a_x_idx ON a (x)",
+    ]
+
+
+def test_split_statements_skips_empty_statements():
+    assert split_statements(";\n  ;\n-- 끝\n") == []
@@ -0,0 +1,50 @@
+# passwords.PasswordHasher: 대기열 자리 반납 시점과 stats() 카운터를 bcrypt 대신 가벼운 함수로 확인합니다.
+import threading
+
+import pytest
+
+from passwords import PasswordHasher, PasswordHasherBusy
+
+
+def _echo(value):
+    return value
+
+
+def _boom():
+    raise ValueError("boom")
+
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(workers=1, max_pending=1, queue_wait=0.05, timeout=0.05)
+    yield hasher
+    hasher.shutdown()
+
+
+def test_completed_counts_only_successes(hasher):
+    assert hasher._run(_echo, 'ok') == 'ok'
+    with pytest.raises(ValueError):
+        hasher._run(_boom)
+    stats = hasher.stats()
+    assert stats['completed'] == 1
+    assert stats['pending'] == 0
+    assert stats['rejected'] == 0
+    assert stats['timeouts'] == 0
+
+
+def test_timed_out_job_keeps_its_slot_until_it_finishes(hasher):
+    release = threading.Event()
+    with pytest.raises(PasswordHasherBusy):
+        hasher._run(release.wait)
+    # 시간 초과 후에도 작업은 실행 중이므로 자리가 반납되지 않아 다음 요청은 거절됩니다.
+    with pytest.raises(PasswordHasherBusy):
+        hasher._run(_echo, 'blocked')
+    stats = hasher.stats()
+    assert stats == dict(stats, pending=1, completed=0, timeouts=1, rejected=1)
+
+    release.set()
+    hasher._executor.shutdown(wait=True)  # done 콜백까지 실행되도록 대기
+    hasher._executor = None
+    assert hasher.stats()['pending'] == 0
+    assert hasher._run(_echo, 'ok') == 'ok'
+    assert hasher.stats()['completed'] == 1
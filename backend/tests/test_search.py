@@ -0,0 +1,22 @@
+# search: 한글 n-gram 토큰화와 tsquery/tsvector 리터럴 생성
+import search
+
+
+def test_tokenize_splits_hangul_words_into_bigrams():
+    assert search.tokenize('<p>게시글을 Flask</p> &amp; 3.1') == ['게시', '시글', '글을', 'flask', '3', '1']
+
+
+def test_tokenize_keeps_short_hangul_words():
+    assert search.tokenize('글 a') == ['글', 'a']
+
+
+def test_build_query_chains_bigrams_and_prefix_matches_words():
+    assert search.build_query('게시글 Flask 글 flask') == "('게시' <-> '시글') & 'flask':* & '글':*"
+
+
+def test_build_query_without_searchable_tokens_is_empty():
+    assert search.build_query('!!! ???') == ''
+
+
+def test_build_document_weights_title_and_content():
+    assert search.build_document('게시글', 'Flask 게시') == "'게시':1A,4B '시글':2A 'flask':3B"
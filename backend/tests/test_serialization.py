@@ -0,0 +1,29 @@
+# serialization: API 응답의 JSON 형식(날짜 ISO 8601, 키는 dict 순서)과 행 변환 함수를 확인합니다.
+import datetime
+from collections import namedtuple
+
+from serialization import dumps, loads, serialize_rows
+
+Row = namedtuple('Row', ['id', 'created_at', 'content', 'nickname', 'avatar_url', 'user_id'])
+
+
+def test_datetimes_are_iso_8601():
+    created_at = datetime.datetime(2024, 5, 1, 12, 30, 0, 123456, tzinfo=datetime.timezone.utc)
+    body = loads(dumps({'created_at': created_at, 'day': created_at.date()}))
+    assert datetime.datetime.fromisoformat(body['created_at']) == created_at
+    assert body['day'] == '2024-05-01'
+
+
+def test_keys_keep_insertion_order():
+    assert dumps({'b': 1, 'a': 2}) == b'{"b":1,"a":2}'
+
+
+def test_serialize_rows_nests_and_drops_columns():
+    created_at = datetime.datetime(2024, 5, 1, tzinfo=datetime.timezone.utc)
+    rows = [Row(1, created_at, 'hi', 'kim', None, 7), Row(2, created_at, 'yo', 'lee', 'a.png', 8)]
+    converted = serialize_rows(rows, nested=(('users', ('nickname', 'avatar_url')),), drop=('user_id',))
+    assert converted == [
+        {'id': 1, 'created_at': created_at, 'content': 'hi', 'users': {'nickname': 'kim', 'avatar_url': None}},
+        {'id': 2, 'created_at': created_at, 'content': 'yo', 'users': {'nickname': 'lee', 'avatar_url': 'a.png'}},
+    ]
+    assert serialize_rows([]) == []
@@ -0,0 +1,41 @@
+# storage.UploadStream: magic bytes로 형식 판별, 스트리밍 중 크기 제한
+import io
+
+import pytest
+
+from storage import UnsupportedFileType, UploadStream, UploadTooLarge
+
+PNG = b'\x89PNG\r\n\x1a\n'
+WEBP = b'RIFF\x00\x00\x00\x00WEBP'
+
+
+@pytest.mark.parametrize('head, content_type, extension', [
+    (b'\xff\xd8\xff\xe0', 'image/jpeg', '.jpg'),
+    (PNG, 'image/png', '.png'),
+    (b'GIF89a', 'image/gif', '.gif'),
+    (WEBP, 'image/webp', '.webp'),
+])
+def test_detects_image_type_from_magic_bytes(head, content_type, extension):
+    stream = UploadStream(io.BytesIO(head + b'\x00' * 100), max_bytes=1024)
+    assert (stream.content_type, stream.extension) == (content_type, extension)
+
+
+def test_rejects_non_image_regardless_of_name():
+    with pytest.raises(UnsupportedFileType):
+        UploadStream(io.BytesIO(b'<html>not an image</html>'), max_bytes=1024)
+
+
+def test_streams_whole_file_within_limit():
+    data = PNG + b'x' * 300
+    stream = UploadStream(io.BytesIO(data), max_bytes=len(data), chunk_size=64)
+    assert b''.join(stream) == data
+    assert not stream.exceeded
+
+
+def test_stops_when_limit_exceeded():
+    stream = UploadStream(io.BytesIO(PNG + b'x' * 300), max_bytes=100, chunk_size=64)
+    with pytest.raises(UploadTooLarge):
+        for _ in stream:
+            pass
+    assert stream.exceeded
+    assert stream.bytes_read <= 100 + 64
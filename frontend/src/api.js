@@ -7,4 +7,7 @@ const api = axios.create({
   baseURL: API_BASE_URL,
 });
 
+// 목록 화면에서 사용하는 필드만 요청합니다. (본문 대신 서버가 만든 excerpt 사용)
+export const POST_LIST_FIELDS = 'id,created_at,title,excerpt,user_id,image_url,author_nickname,like_count,liked_by_me';
+
 export default api;
\ No newline at end of file
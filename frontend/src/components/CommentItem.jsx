@@ -56,7 +56,7 @@ const CommentItem = ({ user, comment, onCommentDeleted, onCommentUpdated }) => {
     <div className="comment-item">
       {comment.users.avatar_url && comment.users.avatar_url !== 'null' ? (
         <img
-          src={comment.users.avatar_url}
+          src={comment.users.avatar_thumb_url || comment.users.avatar_url}
           alt={comment.users.nickname}
           className="comment-avatar"
         />
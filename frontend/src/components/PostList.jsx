@@ -30,7 +30,7 @@ const PostList = ({ posts, userLikes, onLikeToggle }) => {
                 <Link to={`/post/${post.id}`} className="post-title-link">
                   <h3 className="post-title">{post.title}</h3>
                   {/* 👇 2. 수정한 함수를 여기서 사용합니다. */}
-                  <p className="post-preview">{stripHtmlAndTruncate(post.content)}</p>
+                  <p className="post-preview">{post.excerpt ?? stripHtmlAndTruncate(post.content)}</p>
                 </Link>
                 <div className="post-actions">
                   <button 
@@ -1,5 +1,5 @@
 import { useState, useEffect } from 'react';
-import api from '../api';
+import api, { POST_LIST_FIELDS } from '../api';
 import toast from 'react-hot-toast';
 import PostList from '../components/PostList';
 import LoadingSpinner from '../components/LoadingSpinner';
@@ -12,19 +12,14 @@ const MyLikesPage = ({ user }) => {
   const fetchMyLikedPosts = async () => {
     setIsLoading(true);
     try {
-      // 1. '내가 쓴 글' API 대신 '내가 좋아요 누른 글' API 호출
-      const postsPromise = api.get('/api/user/my-likes-posts', {
+      // '내가 좋아요 누른 글' API 호출 (각 글의 liked_by_me로 좋아요 상태를 설정)
+      const postsRes = await api.get('/api/user/my-likes-posts', {
+        params: { fields: POST_LIST_FIELDS },
         headers: { Authorization: `Bearer ${user.token}` }
       });
-      // 2. '좋아요' 목록은 여전히 필요함 (실시간 토글을 위해)
-      const likesPromise = api.get('/api/user/my-likes', {
-        headers: { Authorization: `Bearer ${user.token}` }
-      });
-
-      const [postsRes, likesRes] = await Promise.all([postsPromise, likesPromise]);
 
       setPosts(postsRes.data.posts);
-      setUserLikes(new Set(likesRes.data));
+      setUserLikes(new Set(postsRes.data.posts.filter(p => p.liked_by_me).map(p => p.id)));
       
     } catch (error) {
       toast.error("데이터를 불러오는데 실패했습니다.");
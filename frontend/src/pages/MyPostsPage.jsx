@@ -1,5 +1,5 @@
 import { useState, useEffect } from 'react';
-import api from '../api';
+import api, { POST_LIST_FIELDS } from '../api';
 import toast from 'react-hot-toast';
 import PostList from '../components/PostList';
 import LoadingSpinner from '../components/LoadingSpinner';
@@ -9,23 +9,17 @@ const MyPostsPage = ({ user }) => {
   const [isLoading, setIsLoading] = useState(true);
   const [userLikes, setUserLikes] = useState(new Set());
 
-  // '내가 쓴 글' 목록과 '내 좋아요' 목록을 불러오는 함수
+  // '내가 쓴 글' 목록을 불러오는 함수 (각 글의 liked_by_me로 좋아요 상태를 설정)
   const fetchMyPostsAndLikes = async () => {
     setIsLoading(true);
     try {
-      // 1. '내가 쓴 글' API 호출
-      const postsPromise = api.get('/api/user/my-posts', {
+      const postsRes = await api.get('/api/user/my-posts', {
+        params: { fields: POST_LIST_FIELDS },
         headers: { Authorization: `Bearer ${user.token}` }
       });
-      // 2. '좋아요' 토글 기능을 위해 '내 좋아요' 목록도 함께 호출
-      const likesPromise = api.get('/api/user/my-likes', {
-        headers: { Authorization: `Bearer ${user.token}` }
-      });
-
-      const [postsRes, likesRes] = await Promise.all([postsPromise, likesPromise]);
 
       setPosts(postsRes.data.posts);
-      setUserLikes(new Set(likesRes.data));
+      setUserLikes(new Set(postsRes.data.posts.filter(p => p.liked_by_me).map(p => p.id)));
       
     } catch (error) {
       toast.error("데이터를 불러오는데 실패했습니다.");
@@ -13,25 +13,13 @@ const PostDetailPage = ({ user }) => {
   const [editTitle, setEditTitle] = useState('');
   const [editContent, setEditContent] = useState('');
   const [comments, setComments] = useState([]);
+  const [commentsCursor, setCommentsCursor] = useState(null);
   const [isLiked, setIsLiked] = useState(false);
   const [likeCount, setLikeCount] = useState(0);
 
   const { id } = useParams();
   const navigate = useNavigate();
 
-  useEffect(() => {
-    const fetchPost = async () => {
-      try {
-        const response = await api.get(`/api/posts/${id}`);
-        setPost(response.data);
-        // ...
-      } catch (error) {
-        toast.error("게시글을 불러오지 못했습니다.");
-      }
-    };
-    fetchPost();
-  }, [id]);
-
   // 삭제 버튼 클릭 시 실행될 함수
   const handleDelete = async () => {
     if (window.confirm("정말로 이 게시글을 삭제하시겠습니까?")) {
@@ -67,27 +55,23 @@ const PostDetailPage = ({ user }) => {
   useEffect(() => {
     const fetchPostData = async () => {
       try {
-        // 3개의 요청을 동시에 보냅니다.
-        const postPromise = api.get(`/api/posts/${id}`);
-        const commentsPromise = api.get(`/api/posts/${id}/comments`);
-        const likesPromise = user
-          ? api.get('/api/user/my-likes', { headers: { Authorization: `Bearer ${user.token}` } })
-          : Promise.resolve({ data: [] }); // 로그인 안했으면 빈 배열
-
-        const [postRes, commentsRes, likesRes] = await Promise.all([postPromise, commentsPromise, likesPromise]);
+        // 게시글, 댓글 첫 페이지, 좋아요 상태를 통합 API 한 번으로 요청합니다.
+        const { data } = await api.get(`/api/posts/${id}/page`, {
+          headers: user ? { Authorization: `Bearer ${user.token}` } : {}
+        });
 
         // 게시글 정보 설정
-        setPost(postRes.data);
-        setEditTitle(postRes.data.title);
-        setEditContent(postRes.data.content);
+        setPost(data.post);
+        setEditTitle(data.post.title);
+        setEditContent(data.post.content);
 
         // 댓글 정보 설정
-        setComments(commentsRes.data);
+        setComments(data.comments);
+        setCommentsCursor(data.comments_next_cursor);
 
         // '좋아요' 정보 설정
-        setLikeCount(postRes.data.like_count || 0);
-        const userLikes = new Set(likesRes.data);
-        setIsLiked(userLikes.has(postRes.data.id));
+        setLikeCount(data.post.like_count || 0);
+        setIsLiked(Boolean(data.viewer.liked_by_me));
 
       } catch (error) {
         toast.error("데이터를 불러오지 못했습니다.");
@@ -97,6 +81,19 @@ const PostDetailPage = ({ user }) => {
     fetchPostData();
   }, [id, navigate, user]);
   
+  // 댓글 더 보기: 마지막으로 받은 댓글 다음부터 이어서 불러옵니다.
+  const handleLoadMoreComments = async () => {
+    try {
+      const { data } = await api.get(`/api/posts/${id}/comments`, {
+        params: { cursor: commentsCursor }
+      });
+      setComments(prevComments => [...prevComments, ...data.comments]);
+      setCommentsCursor(data.next_cursor);
+    } catch (error) {
+      toast.error("댓글을 불러오지 못했습니다.");
+    }
+  };
+
   const handleCommentCreated = (newComment) => {
     setComments([newComment, ...comments]);
   };
@@ -209,6 +206,9 @@ const PostDetailPage = ({ user }) => {
         onCommentDeleted={handleCommentDeleted}
         onCommentUpdated={handleCommentUpdated}
       />
+      {commentsCursor && (
+        <button onClick={handleLoadMoreComments}>댓글 더 보기</button>
+      )}
     </div>
   );
 };
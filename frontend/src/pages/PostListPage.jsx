@@ -1,6 +1,6 @@
 import { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
-import api from '../api';
+import api, { POST_LIST_FIELDS } from '../api';
 import toast from 'react-hot-toast';
 import PostList from '../components/PostList';
 import LoadingSpinner from '../components/LoadingSpinner';
@@ -14,18 +14,22 @@ const PostListPage = ({ user }) => {
   const [totalPages, setTotalPages] = useState(0);
   const [userLikes, setUserLikes] = useState(new Set());
 
+  // 로그인 상태면 토큰을 함께 보내 각 게시글의 liked_by_me를 받아옵니다.
   const fetchPosts = async (page = 1) => {
     setIsLoading(true);
     try {
       const response = await api.get(`/api/posts`, {
         params: { 
           search: searchTerm,
-          page: page
-        }
+          page: page,
+          fields: POST_LIST_FIELDS
+        },
+        headers: user ? { Authorization: `Bearer ${user.token}` } : {}
       });
       setPosts(response.data.posts);
       setTotalPages(Math.ceil(response.data.total_count / response.data.limit));
       setCurrentPage(response.data.page);
+      setUserLikes(new Set(response.data.posts.filter(p => p.liked_by_me).map(p => p.id)));
     } catch (error) {
       toast.error("게시글 목록을 불러오는데 실패했습니다.");
     } finally {
@@ -33,34 +37,8 @@ const PostListPage = ({ user }) => {
     }
   };
 
-  const fetchPostsAndLikes = async (page = 1) => {
-    setIsLoading(true);
-    try {
-      // 3. 게시글 목록과 좋아요 목록을 '동시에' 요청합니다.
-      const postsPromise = api.get(`/api/posts`, {
-        params: { search: searchTerm, page: page }
-      });
-      
-      const likesPromise = user 
-        ? api.get('/api/user/my-likes', { headers: { Authorization: `Bearer ${user.token}` } })
-        : Promise.resolve({ data: [] }); // 로그인 안했으면 빈 배열
-
-      const [postsRes, likesRes] = await Promise.all([postsPromise, likesPromise]);
-
-      setPosts(postsRes.data.posts);
-      setTotalPages(Math.ceil(postsRes.data.total_count / postsRes.data.limit));
-      setCurrentPage(postsRes.data.page);
-      setUserLikes(new Set(likesRes.data)); // 4. Set에 좋아요 ID 목록 저장
-      
-    } catch (error) {
-      toast.error("데이터를 불러오는데 실패했습니다.");
-    } finally {
-      setIsLoading(false);
-    }
-  };
-
   useEffect(() => {
-    fetchPostsAndLikes(1);
+    fetchPosts(1);
   }, [user]); 
 
   const handleSearch = (e) => {